@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, status
+
+from app.schemas.background_job_schema import ResimulateInput
+from app.services.background_jobs import get_job, get_scenario_jobs, job_to_dict
+from app.services.resimulation import start_resimulation
+from app.services.scenarios import SCENARIOS
+from app.services.simulation_logic import ENGINE_VERSION
+from app.services.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.post("/jobs/resimulate")
+def resimulate_scenarios(data: ResimulateInput):
+    # Runs in the background, one table at a time; poll /jobs/{job_id} for progress
+    jobs = {scenario_type: start_resimulation(scenario_type, data.force) for scenario_type in dict.fromkeys(data.scenario_types)}
+
+    return {
+        "status": "success",
+        "data": {
+            "engine_version": ENGINE_VERSION,
+            "jobs": jobs
+        }
+    }
+
+
+@router.get("/jobs/{job_id}")
+def get_job_status(job_id: int):
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return {
+        "status": "success",
+        "data": job_to_dict(job)
+    }
+
+
+@router.get("/{scenario_type}/{scenario_id}/jobs")
+def get_scenario_job_statuses(scenario_type: str, scenario_id: int):
+    if scenario_type not in SCENARIOS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown scenario type")
+    jobs = get_scenario_jobs(scenario_type, scenario_id)
+    if not jobs:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No jobs found for this scenario")
+
+    return {
+        "status": "success",
+        "data": {
+            "scenario_type": scenario_type,
+            "scenario_id": scenario_id,
+            "ready": all(job.status == "completed" for job in jobs),
+            "jobs": [job_to_dict(job) for job in jobs]
+        }
+    }
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
+
+from app.schemas.compare_schema import CompareInput
+from app.services.comparison import VariantError, compare_scenarios
+from app.services.scenarios import SCENARIOS
+from app.services.tracing import TracedRoute
+
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.post("/compare/{scenario_type}")
+def compare_scenario_variants(scenario_type: str, data: CompareInput):
+    if scenario_type not in SCENARIOS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown scenario type")
+
+    try:
+        result = compare_scenarios(
+            scenario_type,
+            data.base,
+            [(override.label, override.changes) for override in data.overrides]
+        )
+    except VariantError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"variant": e.label, "errors": e.errors}
+        )
+
+    return ORJSONResponse({
+        "status": "success",
+        "data": result
+    })
@@ -0,0 +1,62 @@
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+
+from app.schemas.export_schema import BulkExportInput
+from app.services.report_export import (
+    REPORT_FORMATS,
+    load_report,
+    render_report,
+    report_filename,
+    stream_reports_zip
+)
+from app.services.http_cache import make_etag, etag_matches, cache_headers, not_modified
+from app.services.scenarios import SCENARIOS
+from app.services.tracing import TracedRoute
+
+
+router = APIRouter(route_class=TracedRoute)
+
+
+def _check_scenario_type(scenario_type: str):
+    if scenario_type not in SCENARIOS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown scenario type")
+
+
+@router.get("/export/{scenario_type}/{scenario_id:int}")
+def export_report(request: Request, scenario_type: str, scenario_id: int, format: Literal["pdf", "csv", "xlsx"] = Query(
+    "pdf", description="Report format"
+)):
+    _check_scenario_type(scenario_type)
+    report = load_report(scenario_type, scenario_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
+
+    # The report version covers the scenario revision, its AI text and the layout
+    etag = make_etag(report["version"], format)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return Response(
+        content=render_report(report, format),
+        media_type=REPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{report_filename(scenario_type, scenario_id, format)}"',
+            **cache_headers(etag)
+        }
+    )
+
+
+@router.post("/export/{scenario_type}/bulk")
+def export_reports_zip(scenario_type: str, data: BulkExportInput):
+    _check_scenario_type(scenario_type)
+
+    # Reports are rendered and sent one at a time, so the ZIP is never held in memory
+    return StreamingResponse(
+        stream_reports_zip(scenario_type, data.scenario_ids, data.format),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{scenario_type}-reports.zip"',
+            "Cache-Control": "no-store"
+        }
+    )
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Query
+
+from app.services.ai_explainer import cache_stats
+from app.services.semantic_cache import semantic_cache
+from app.services.single_flight import simulation_flight, llm_flight
+from app.services.admission import ai_admission_controller
+from app.services.simulation_pool import pool_stats
+from app.services.report_export import report_cache
+from app.services.llm_usage import usage_summary
+from app.services.factor_tables import factor_table
+from app.services.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get("/metrics/ai-cache")
+def get_ai_cache_metrics():
+    return {
+        "status": "success",
+        "data": {
+            "exact": cache_stats(),
+            "semantic": semantic_cache.stats()
+        }
+    }
+
+
+@router.get("/metrics/single-flight")
+def get_single_flight_metrics():
+    return {
+        "status": "success",
+        "data": {
+            "simulation": simulation_flight.stats(),
+            "llm": llm_flight.stats()
+        }
+    }
+
+
+@router.get("/metrics/ai-admission")
+def get_ai_admission_metrics():
+    return {
+        "status": "success",
+        "data": ai_admission_controller.stats()
+    }
+
+
+@router.get("/metrics/simulation-pool")
+def get_simulation_pool_metrics():
+    return {
+        "status": "success",
+        "data": pool_stats()
+    }
+
+
+@router.get("/metrics/factor-tables")
+def get_factor_table_metrics():
+    # Counts of this process; simulation pool workers keep their own tables
+    return {
+        "status": "success",
+        "data": factor_table.stats()
+    }
+
+
+@router.get("/metrics/report-cache")
+def get_report_cache_metrics():
+    return {
+        "status": "success",
+        "data": report_cache.stats()
+    }
+
+
+@router.get("/metrics/llm-usage")
+def get_llm_usage_metrics(hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window in hours")):
+    # Routes and prompt versions that burn the most tokens come first
+    return {
+        "status": "success",
+        "data": {
+            "hours": hours,
+            "routes": usage_summary(hours)
+        }
+    }
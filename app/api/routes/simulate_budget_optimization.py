@@ -1,63 +1,128 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Request, Response, HTTPException, status, Query
 
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select, delete
 
 from app.db.session import get_session
 from app.models.budgeting_optimization_model import BudgetOptimizationModel
-from app.schemas.budget_optimization_schema import BudgetOptimizationInput
-from app.services.simulation_logic import simulate_budget_optimization
-from app.services.ai_explainer import generate_response
-
-router = APIRouter()
-
-
-@router.post("/simulate/budget-optimization")
-def simulate_and_save_route(data: BudgetOptimizationInput):
-    result = simulate_budget_optimization(
-        scenario_type=data.scenario_type,
-        user_type=data.user_type,
-        projection_months=data.projection_months,
-        income=data.income.model_dump(),
-        expenses=data.expenses.model_dump(),
-        savings_goals=data.savings_goals.model_dump(),
-        what_if_factors=data.what_if_factors.model_dump()
+from app.schemas.budget_optimization_schema import BudgetOptimizationInput, BudgetOptimizationResponse
+from app.services.simulation_logic import simulate_budget_optimization, ENGINE_VERSION
+from app.services.cashflow_engine import projection_start
+from app.services.ai_explainer import generate_response_within, response_deadline
+from app.services.ai_fallback import budget_explanation, budget_suggestions
+from app.services.admission import ai_slot
+from app.services.simulation_pool import run_simulation, estimate_cost
+from app.services.simulation_result import serialize_result, chart_rows
+from app.services.downsampling import downsample_result, downsample_chart_data, MIN_CHART_POINTS
+from app.services.single_flight import simulation_flight, request_key
+from app.services.http_cache import make_etag, scenario_version, etag_matches, cache_headers, not_modified
+from app.services.background_jobs import register_generator, enqueue_ai_jobs, get_completed_result
+from app.services.semantic_cache import semantic_cache, feature_vector
+from app.services.llm_usage import llm_usage
+from app.services.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
+
+SCENARIO_TYPE = "budget-optimization"
+# Bump when the AI prompts change, so clients refetch AI text they already hold
+PROMPT_VERSION = "v1.0.0"
+
+
+@router.post("/simulate/budget-optimization", response_model=BudgetOptimizationResponse)
+def simulate_and_save_route(request: Request, data: BudgetOptimizationInput, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    # Dump the input once and reuse it for the cache key and the simulator
+    payload = data.model_dump()
+    # A daily projection without a start date runs from the current month: pin it, so
+    # the ETag and the single-flight key change when the month does
+    if payload["resolution"] == "daily":
+        payload["start_date"] = projection_start(payload["start_date"])
+
+    # The response depends only on the inputs and the engine, so their hash is its ETag
+    etag = make_etag("/simulate/budget-optimization", payload, max_points, ENGINE_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Identical payloads already being simulated share one computation
+    key = request_key("/simulate/budget-optimization", payload)
+    # Long projections run in the process pool so they don't hold this worker's GIL
+    result = simulation_flight.do(
+        key,
+        run_simulation,
+        simulate_budget_optimization,
+        estimate_cost(payload["projection_months"]),
+        scenario_type=payload["scenario_type"],
+        user_type=payload["user_type"],
+        projection_months=payload["projection_months"],
+        income=payload["income"],
+        expenses=payload["expenses"],
+        savings_goals=payload["savings_goals"],
+        what_if_factors=payload["what_if_factors"],
+        resolution=payload["resolution"],
+        start_date=payload["start_date"],
+        opening_balance=payload["opening_balance"],
+        include_daily_series=payload["include_daily_series"]
     )
-    return result
+    # Rows are built only here, after downsampling; the result is then JSON-shaped,
+    # so skip response validation and jsonable_encoder
+    return ORJSONResponse(serialize_result(downsample_result(SCENARIO_TYPE, result, max_points)), headers=cache_headers(etag))
 
 
 @router.post("/budget-optimization/save")
 def save_budget_optimization_to_db(data: BudgetOptimizationInput):
+    # Dump the input once and reuse it for the simulator and the DB row
+    payload = data.model_dump()
+    what_if_factors = payload["what_if_factors"] or {}
+    # Store the month the projection started, so re-simulation reproduces its calendar
+    if payload["resolution"] == "daily":
+        payload["start_date"] = projection_start(payload["start_date"])
+
     # run simulation to get results
-    sim_result = simulate_budget_optimization(
-        scenario_type=data.scenario_type,
-        user_type=data.user_type,
-        projection_months=data.projection_months,
-        income=data.income.model_dump(),
-        expenses=data.expenses.model_dump(),
-        savings_goals=data.savings_goals.model_dump(),
-        what_if_factors=data.what_if_factors.model_dump()
+    sim_result = run_simulation(
+        simulate_budget_optimization,
+        estimate_cost(payload["projection_months"]),
+        scenario_type=payload["scenario_type"],
+        user_type=payload["user_type"],
+        projection_months=payload["projection_months"],
+        income=payload["income"],
+        expenses=payload["expenses"],
+        savings_goals=payload["savings_goals"],
+        what_if_factors=what_if_factors,
+        resolution=payload["resolution"],
+        start_date=payload["start_date"],
+        opening_balance=payload["opening_balance"]
     )
     sim_data = sim_result["data"]
 
     with get_session() as session:
         scenario = BudgetOptimizationModel(
-            scenario_type=data.scenario_type,
-            user_type=data.user_type,
-            projection_months=data.projection_months,
-            income=data.income.model_dump(),
-            expenses=data.expenses.model_dump(),
-            savings_goals=data.savings_goals.model_dump(),
-            what_if_factors=data.what_if_factors.model_dump(),
-            chart_data=sim_data.get("chart_data"),
+            scenario_type=payload["scenario_type"],
+            user_type=payload["user_type"],
+            projection_months=payload["projection_months"],
+            income=payload["income"],
+            expenses=payload["expenses"],
+            savings_goals=payload["savings_goals"],
+            what_if_factors=what_if_factors,
+            resolution=payload["resolution"],
+            start_date=payload["start_date"],
+            opening_balance=payload["opening_balance"],
+            chart_data=chart_rows(sim_data.get("chart_data")),
             key_metrics=sim_data.get("key_metrics"),
-            insight=sim_data.get("insight")
+            insight=sim_data.get("insight"),
+            engine_version=ENGINE_VERSION
         )
 
         session.add(scenario)
         session.commit()
         session.refresh(scenario)
 
-    return {"id": scenario.id}
+    # Pre-generate the AI explanation and suggestions off the interactive path
+    job_ids = enqueue_ai_jobs(SCENARIO_TYPE, scenario.id)
+
+    return {"id": scenario.id, "ai_jobs": job_ids}
 
 
 # @router.delete("/budget-optimization/{scenario_id}")
@@ -72,6 +137,27 @@ def save_budget_optimization_to_db(data: BudgetOptimizationInput):
 #         return {"message": "Scenario deleted"}
 
 
+@router.get("/budget-optimization/{scenario_id:int}")
+def get_budget_optimization(request: Request, response: Response, scenario_id: int, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    with get_session() as session:
+        scenario = session.get(BudgetOptimizationModel, scenario_id)
+        if not scenario:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
+        etag = make_etag(SCENARIO_TYPE, scenario_version(scenario), max_points)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        data = scenario.model_dump()
+
+    data["chart_data"] = downsample_chart_data(SCENARIO_TYPE, data["chart_data"] or [], max_points)
+    response.headers.update(cache_headers(etag))
+    return {
+        "status": "success",
+        "data": data
+    }
+
+
 @router.delete("/budget-optimization/delete-all")
 def delete_all_budget_optimizations():
     with get_session() as session:
@@ -80,153 +166,272 @@ def delete_all_budget_optimizations():
         return {"message": f"{result.rowcount} scenarios deleted"}
 
 
-@router.get("/budget-optimization/ai-explanation")
-def get_ai_explanation():
-    with get_session() as session:
-        scenario = session.exec(
-            select(BudgetOptimizationModel).order_by(BudgetOptimizationModel.created_at.desc())
-        ).first()
-        if not scenario:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No budget optimization scenario found.")
-
-        # Extract key stats for prompt context
-        income = scenario.income
-        expenses = scenario.expenses
-        savings_goals = scenario.savings_goals
-        what_if_factors = scenario.what_if_factors
-
-        total_monthly_income = income.get("monthly_gross_income", 0) + income.get("other_monthly_income", 0)
-        fixed = expenses.get("fixed_needs", {})
-        variable = expenses.get("variable_needs", {})
-        wants = expenses.get("wants_discretionary", {})
-        fixed_total = sum(fixed.values())
-        variable_total = sum(variable.values())
-        wants_total = sum(wants.values())
-        total_monthly_expenses = fixed_total + variable_total + wants_total
-        avg_net_cash_flow = total_monthly_income - total_monthly_expenses - savings_goals.get("target_monthly_savings", 0)
-        discretionary_spending_percent = (wants_total / total_monthly_income) if total_monthly_income else 0
-        highest_discretionary_category = max(wants, key=wants.get) if wants else "N/A"
-        highest_discretionary_value = wants.get(highest_discretionary_category, 0)
-        emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
-        emergency_fund_months_current = (
-            emergency_fund_target / savings_goals.get("target_monthly_savings", 1)
-            if savings_goals.get("target_monthly_savings", 0) else "N/A"
-        )
-
-        # What-if factors context
-        income_growth_rate = what_if_factors.get("income_growth_rate", 0)
-        wants_reduction_rate = what_if_factors.get("wants_reduction_rate", 0)
-        savings_increase_rate = what_if_factors.get("savings_increase_rate", 0)
-
-        explanation_prompt = (
-            f'''As a financial advisor specializing in helping Filipino families, analyze the following monthly cash flow data.  
-
-            **Output format (IMPORTANT):**  
-            Return ONLY one short paragraph of plain text.  
-            Do not include JSON, Markdown, bullet points, or extra formatting.  
-
-            Guidelines:
-            - Speak directly to the user using "you" and "your," not "this family."
-            - Maximum 3–5 sentences (under 120 words).
-            - Use a warm, conversational tone.
-            - Focus on insights, not repeating the numbers.
-            - Mention their overall financial health, the biggest discretionary spending issue, and one clear recommendation.
-
-            [Data provided below]
-            • Income: ₱{total_monthly_income:,.2f}
-            • Expenses: ₱{total_monthly_expenses:,.2f}
-            • Net Cash Flow: ₱{avg_net_cash_flow:,.2f}
-            • Discretionary spending: ₱{wants_total:,.2f} ({discretionary_spending_percent:.2%})
-            • Highest discretionary category: {highest_discretionary_category} at ₱{highest_discretionary_value:,.2f}
-            • Emergency fund target: ₱{emergency_fund_target:,.2f}, current path {emergency_fund_months_current} months
-            • What-if factors: Income growth {income_growth_rate:.2%}, Wants reduction {wants_reduction_rate:.2%}, Savings increase {savings_increase_rate:.2%}
-            '''
-        )
+def _ai_cache_features(scenario: BudgetOptimizationModel):
+    """
+    Quantizable features behind the budget AI prompts, for reusing text across near-identical scenarios.
+
+    Returns the categorical partition, the numeric feature vector and the values to re-template.
+    """
+    income = scenario.income
+    expenses = scenario.expenses
+    savings_goals = scenario.savings_goals
+    what_if_factors = scenario.what_if_factors or {}
+
+    total_monthly_income = income.get("monthly_gross_income", 0) + income.get("other_monthly_income", 0)
+    wants = expenses.get("wants_discretionary", {})
+    wants_total = sum(wants.values())
+    total_monthly_expenses = sum(expenses.get("fixed_needs", {}).values()) + sum(expenses.get("variable_needs", {}).values()) + wants_total
+    target_monthly_savings = savings_goals.get("target_monthly_savings", 0)
+    avg_net_cash_flow = total_monthly_income - total_monthly_expenses - target_monthly_savings
+    discretionary_share = (wants_total / total_monthly_income) if total_monthly_income else 0
+    highest_discretionary_category = max(wants, key=wants.get) if wants else "N/A"
+    highest_discretionary_value = wants.get(highest_discretionary_category, 0)
+    emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
+    emergency_fund_months = emergency_fund_target / target_monthly_savings if target_monthly_savings else None
+
+    category = (highest_discretionary_category, emergency_fund_months is None)
+    vector = feature_vector(
+        amounts=[
+            total_monthly_income, total_monthly_expenses, avg_net_cash_flow, wants_total,
+            highest_discretionary_value, target_monthly_savings, emergency_fund_target, emergency_fund_months or 0
+        ],
+        rates=[
+            discretionary_share,
+            what_if_factors.get("income_growth_rate", 0),
+            what_if_factors.get("wants_reduction_rate", 0),
+            what_if_factors.get("savings_increase_rate", 0)
+        ]
+    )
+    values = {
+        "income": ("peso", total_monthly_income),
+        "expenses": ("peso", total_monthly_expenses),
+        "net_cash_flow": ("peso", avg_net_cash_flow),
+        "discretionary_total": ("peso", wants_total),
+        "discretionary_share": ("percent", discretionary_share),
+        "top_category_value": ("peso", highest_discretionary_value),
+        "top_category_savings": ("peso", highest_discretionary_value * 0.2),
+        "target_monthly_savings": ("peso", target_monthly_savings),
+        "emergency_fund_target": ("peso", emergency_fund_target),
+        "emergency_fund_months": ("months", emergency_fund_months)
+    }
+    return category, vector, values
+
+
+def _build_ai_explanation(scenario: BudgetOptimizationModel, deadline: float = None) -> dict:
+    # Extract key stats for prompt context
+    income = scenario.income
+    expenses = scenario.expenses
+    savings_goals = scenario.savings_goals
+    what_if_factors = scenario.what_if_factors
+
+    total_monthly_income = income.get("monthly_gross_income", 0) + income.get("other_monthly_income", 0)
+    fixed = expenses.get("fixed_needs", {})
+    variable = expenses.get("variable_needs", {})
+    wants = expenses.get("wants_discretionary", {})
+    fixed_total = sum(fixed.values())
+    variable_total = sum(variable.values())
+    wants_total = sum(wants.values())
+    total_monthly_expenses = fixed_total + variable_total + wants_total
+    avg_net_cash_flow = total_monthly_income - total_monthly_expenses - savings_goals.get("target_monthly_savings", 0)
+    discretionary_spending_percent = (wants_total / total_monthly_income) if total_monthly_income else 0
+    highest_discretionary_category = max(wants, key=wants.get) if wants else "N/A"
+    highest_discretionary_value = wants.get(highest_discretionary_category, 0)
+    emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
+    emergency_fund_months_current = (
+        emergency_fund_target / savings_goals.get("target_monthly_savings", 1)
+        if savings_goals.get("target_monthly_savings", 0) else "N/A"
+    )
 
-        explanation_text = generate_response(explanation_prompt)
+    # What-if factors context
+    income_growth_rate = what_if_factors.get("income_growth_rate", 0)
+    wants_reduction_rate = what_if_factors.get("wants_reduction_rate", 0)
+    savings_increase_rate = what_if_factors.get("savings_increase_rate", 0)
+
+    explanation_prompt = (
+        f'''As a financial advisor specializing in helping Filipino families, analyze the following monthly cash flow data.  
+
+        **Output format (IMPORTANT):**  
+        Return ONLY one short paragraph of plain text.  
+        Do not include JSON, Markdown, bullet points, or extra formatting.  
+
+        Guidelines:
+        - Speak directly to the user using "you" and "your," not "this family."
+        - Maximum 3–5 sentences (under 120 words).
+        - Use a warm, conversational tone.
+        - Focus on insights, not repeating the numbers.
+        - Mention their overall financial health, the biggest discretionary spending issue, and one clear recommendation.
+
+        [Data provided below]
+        • Income: ₱{total_monthly_income:,.2f}
+        • Expenses: ₱{total_monthly_expenses:,.2f}
+        • Net Cash Flow: ₱{avg_net_cash_flow:,.2f}
+        • Discretionary spending: ₱{wants_total:,.2f} ({discretionary_spending_percent:.2%})
+        • Highest discretionary category: {highest_discretionary_category} at ₱{highest_discretionary_value:,.2f}
+        • Emergency fund target: ₱{emergency_fund_target:,.2f}, current path {emergency_fund_months_current} months
+        • What-if factors: Income growth {income_growth_rate:.2%}, Wants reduction {wants_reduction_rate:.2%}, Savings increase {savings_increase_rate:.2%}
+        '''
+    )
 
+    # Near-identical scenarios reuse an earlier explanation with their own numbers
+    category, vector, values = _ai_cache_features(scenario)
+    cached_text = semantic_cache.lookup(f"{SCENARIO_TYPE}:ai_explanation", category, vector, values)
+    if cached_text is not None:
+        llm_usage.record_call("/budget-optimization/ai-explanation", PROMPT_VERSION, 0, cache_hit=True)
         return {
-            "status": "success",
-            "data": {
-                "explanation_text": explanation_text,
-                "model_info": {
-                    "model_name": "gemini-1.5-flash"
-                }
+            "explanation_text": cached_text,
+            "semantic_cache_hit": True,
+            "model_info": {
+                "model_name": "gemini-1.5-flash"
             }
         }
-    
 
-@router.get("/budget-optimization/ai-suggestions")
-def get_ai_suggestions():
+    explanation_text = generate_response_within(explanation_prompt, deadline, route="/budget-optimization/ai-explanation", prompt_version=PROMPT_VERSION)
+    if explanation_text is None:
+        return budget_explanation(scenario)
+    semantic_cache.store(f"{SCENARIO_TYPE}:ai_explanation", category, vector, values, explanation_text)
+
+    return {
+        "explanation_text": explanation_text,
+        "model_info": {
+            "model_name": "gemini-1.5-flash"
+        }
+    }
+
+
+def _latest_scenario() -> BudgetOptimizationModel:
     with get_session() as session:
         scenario = session.exec(
             select(BudgetOptimizationModel).order_by(BudgetOptimizationModel.created_at.desc())
         ).first()
         if not scenario:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No budget optimization scenario found.")
+        # A detached copy, so no connection is held while the LLM answers
+        return BudgetOptimizationModel(**scenario.model_dump())
 
-        # Extract key stats for prompt context
-        income = scenario.income
-        expenses = scenario.expenses
-        savings_goals = scenario.savings_goals
-        what_if_factors = scenario.what_if_factors
-
-        total_monthly_income = income.get("monthly_gross_income", 0) + income.get("other_monthly_income", 0)
-        wants = expenses.get("wants_discretionary", {})
-        highest_discretionary_category = max(wants, key=wants.get) if wants else "N/A"
-        highest_discretionary_value = wants.get(highest_discretionary_category, 0)
-        emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
-        target_monthly_savings = savings_goals.get("target_monthly_savings", 0)
-        emergency_fund_months_current = (
-            emergency_fund_target / target_monthly_savings if target_monthly_savings else "N/A"
-        )
 
-        # What-if factors context
-        income_growth_rate = what_if_factors.get("income_growth_rate", 0)
-        wants_reduction_rate = what_if_factors.get("wants_reduction_rate", 0)
-        savings_increase_rate = what_if_factors.get("savings_increase_rate", 0)
+def _ai_data(scenario: BudgetOptimizationModel, job_type: str, build, deadline: float) -> dict:
+    # Serve the result pre-generated on save when it's ready
+    precomputed = get_completed_result(SCENARIO_TYPE, scenario.id, job_type, scenario_version(scenario))
+    return precomputed if precomputed else build(scenario, deadline)
 
-        # Simulate a 20% reduction in highest discretionary category
-        potential_increase_in_savings = highest_discretionary_value * 0.2 if highest_discretionary_value else 0
-        optimized_monthly_savings = target_monthly_savings + potential_increase_in_savings
-        emergency_fund_months_optimized = (
-            emergency_fund_target / optimized_monthly_savings if optimized_monthly_savings else "N/A"
-        )
 
-        # Build suggestion prompt, instructing the AI to return JSON
-        suggestion_prompt = (
-            f'''As a financial expert, generate 3 to 5 actionable next steps for a Filipino family in Lucena City
-            to improve their budget and accelerate their savings.
-
-            **Output format (IMPORTANT):**
-            - Return a numbered list of practical suggestions.
-            - Each item should be a complete sentence or two, without any special formatting like bolding.
-            - Do not include any JSON, markdown, or other special formatting.
-
-            **Example Output:**
-            1. Reduce Dining Out: Given your high spending on restaurants, consider packing baon (packed lunch) to work at least three times a week. This could save you up to ₱500 per week.
-            2. Explore Palengke for Groceries: Shop for your produce at the local palengke (wet market) instead of the supermarket. This can reduce your food expenses by 15-20% monthly.
-
-            **Inputs:**
-            • Highest discretionary category: {highest_discretionary_category} at ₱{highest_discretionary_value:,.2f}
-            • Emergency Fund Goal: ₱{emergency_fund_target:,.2f}
-            • Current path to goal: {emergency_fund_months_current} months
-            • Optimized path to goal (20% reduction): {emergency_fund_months_optimized} months
-            • Potential increase in monthly savings: ₱{potential_increase_in_savings:,.2f}
-            '''
-        )
+@router.get("/budget-optimization/ai-explanation")
+async def get_ai_explanation(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
+
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_explanation", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_explanation", _build_ai_explanation, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
+
+    return {
+        "status": "success",
+        "data": data
+    }
+    
+
+def _build_ai_suggestions(scenario: BudgetOptimizationModel, deadline: float = None) -> dict:
+    # Extract key stats for prompt context
+    income = scenario.income
+    expenses = scenario.expenses
+    savings_goals = scenario.savings_goals
+    what_if_factors = scenario.what_if_factors
+
+    total_monthly_income = income.get("monthly_gross_income", 0) + income.get("other_monthly_income", 0)
+    wants = expenses.get("wants_discretionary", {})
+    highest_discretionary_category = max(wants, key=wants.get) if wants else "N/A"
+    highest_discretionary_value = wants.get(highest_discretionary_category, 0)
+    emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
+    target_monthly_savings = savings_goals.get("target_monthly_savings", 0)
+    emergency_fund_months_current = (
+        emergency_fund_target / target_monthly_savings if target_monthly_savings else "N/A"
+    )
 
-        raw_suggestions = generate_response(suggestion_prompt)
+    # What-if factors context
+    income_growth_rate = what_if_factors.get("income_growth_rate", 0)
+    wants_reduction_rate = what_if_factors.get("wants_reduction_rate", 0)
+    savings_increase_rate = what_if_factors.get("savings_increase_rate", 0)
 
-        print('RAW SUGGESTIONS: ', raw_suggestions)
+    # Simulate a 20% reduction in highest discretionary category
+    potential_increase_in_savings = highest_discretionary_value * 0.2 if highest_discretionary_value else 0
+    optimized_monthly_savings = target_monthly_savings + potential_increase_in_savings
+    emergency_fund_months_optimized = (
+        emergency_fund_target / optimized_monthly_savings if optimized_monthly_savings else "N/A"
+    )
+
+    # Build suggestion prompt, instructing the AI to return JSON
+    suggestion_prompt = (
+        f'''As a financial expert, generate 3 to 5 actionable next steps for a Filipino family in Lucena City
+        to improve their budget and accelerate their savings.
+
+        **Output format (IMPORTANT):**
+        - Return a numbered list of practical suggestions.
+        - Each item should be a complete sentence or two, without any special formatting like bolding.
+        - Do not include any JSON, markdown, or other special formatting.
+
+        **Example Output:**
+        1. Reduce Dining Out: Given your high spending on restaurants, consider packing baon (packed lunch) to work at least three times a week. This could save you up to ₱500 per week.
+        2. Explore Palengke for Groceries: Shop for your produce at the local palengke (wet market) instead of the supermarket. This can reduce your food expenses by 15-20% monthly.
+
+        **Inputs:**
+        • Highest discretionary category: {highest_discretionary_category} at ₱{highest_discretionary_value:,.2f}
+        • Emergency Fund Goal: ₱{emergency_fund_target:,.2f}
+        • Current path to goal: {emergency_fund_months_current} months
+        • Optimized path to goal (20% reduction): {emergency_fund_months_optimized} months
+        • Potential increase in monthly savings: ₱{potential_increase_in_savings:,.2f}
+        '''
+    )
 
+    # Near-identical scenarios reuse earlier suggestions with their own numbers
+    category, vector, values = _ai_cache_features(scenario)
+    cached_text = semantic_cache.lookup(f"{SCENARIO_TYPE}:ai_suggestions", category, vector, values)
+    if cached_text is not None:
+        llm_usage.record_call("/budget-optimization/ai-suggestions", PROMPT_VERSION, 0, cache_hit=True)
         return {
-            "status": "success",
-            "data": {
-                "suggestions_text": raw_suggestions,
-                "model_info": {
-                    "model_name": "gemini-1.5-flash"
-                }
+            "suggestions_text": cached_text,
+            "semantic_cache_hit": True,
+            "model_info": {
+                "model_name": "gemini-1.5-flash"
             }
         }
-    
\ No newline at end of file
+
+    raw_suggestions = generate_response_within(suggestion_prompt, deadline, route="/budget-optimization/ai-suggestions", prompt_version=PROMPT_VERSION)
+    if raw_suggestions is None:
+        return budget_suggestions(scenario)
+    semantic_cache.store(f"{SCENARIO_TYPE}:ai_suggestions", category, vector, values, raw_suggestions)
+
+    print('RAW SUGGESTIONS: ', raw_suggestions)
+
+    return {
+        "suggestions_text": raw_suggestions,
+        "model_info": {
+            "model_name": "gemini-1.5-flash"
+        }
+    }
+
+
+@router.get("/budget-optimization/ai-suggestions")
+async def get_ai_suggestions(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
+
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_suggestions", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_suggestions", _build_ai_suggestions, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
+
+    return {
+        "status": "success",
+        "data": data
+    }
+
+
+register_generator(SCENARIO_TYPE, "ai_explanation", BudgetOptimizationModel, _build_ai_explanation)
+register_generator(SCENARIO_TYPE, "ai_suggestions", BudgetOptimizationModel, _build_ai_suggestions)
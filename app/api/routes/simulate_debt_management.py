@@ -1,49 +1,168 @@
-from fastapi import APIRouter, status, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Request, Response, status, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select
 import json
 
-from app.schemas.debt_management_schema import DebtManagementInput
-from app.services.simulation_logic import simulate_debt_management
+from app.schemas.debt_management_schema import DebtManagementInput, DebtManagementResponse, DebtStressTestInput
+from app.services.simulation_logic import simulate_debt_management, ENGINE_VERSION
+from app.services.stress_test import stress_test_debt_management, stress_test_slot, STRESS_TEST_MAX_CELLS
 from app.models.debt_management_model import DebtManagementModel
-from app.services.ai_explainer import generate_response
+from app.services.ai_explainer import generate_response_within, response_deadline
+from app.services.ai_fallback import debt_explanation, debt_suggestions
+from app.services.admission import ai_slot
+from app.services.simulation_pool import run_simulation, estimate_cost
+from app.services.simulation_result import serialize_result, chart_rows
+from app.services.downsampling import downsample_result, downsample_chart_data, MIN_CHART_POINTS
+from app.services.single_flight import simulation_flight, request_key
+from app.services.http_cache import make_etag, scenario_version, etag_matches, cache_headers, not_modified
+from app.services.background_jobs import register_generator, enqueue_ai_jobs, get_completed_result
 from app.db.session import get_session
+from app.services.tracing import TracedRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
+SCENARIO_TYPE = "debt-management"
+# Bump when the AI prompts change, so clients refetch AI text they already hold
+PROMPT_VERSION = "v1.0.0"
+# How the prompts name a chart_data period, by granularity
+PERIOD_NAMES = {"monthly": "Month", "quarterly": "Quarter", "annual": "Year"}
 
-@router.post("/simulate/debt-management")
-def simulate_debt_management_route(data: DebtManagementInput):
-    result = simulate_debt_management(
-        scenario_type=data.scenario_type,
-        user_type=data.user_type,
-        projection_period=data.projection_period,
-        loans=[loan.model_dump() for loan in data.loans],
-        business_financials=data.business_financials.model_dump(),
-        growth_needs=data.growth_needs.model_dump(),
-        proposed_financing=data.proposed_financing.model_dump(),
-        reinvestment_rate=data.reinvestment_rate
+
+@router.post("/simulate/debt-management", response_model=DebtManagementResponse)
+def simulate_debt_management_route(request: Request, data: DebtManagementInput, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    # Dump the input once and reuse it for the cache key and the simulator
+    payload = data.model_dump()
+
+    # The response depends only on the inputs and the engine, so their hash is its ETag
+    etag = make_etag("/simulate/debt-management", payload, max_points, ENGINE_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Identical payloads already being simulated share one computation
+    key = request_key("/simulate/debt-management", payload)
+    # Long projections run in the process pool so they don't hold this worker's GIL
+    result = simulation_flight.do(
+        key,
+        run_simulation,
+        simulate_debt_management,
+        estimate_cost(payload["projection_period"] * (len(payload["loans"]) + 1)),
+        scenario_type=payload["scenario_type"],
+        user_type=payload["user_type"],
+        projection_period=payload["projection_period"],
+        loans=payload["loans"],
+        business_financials=payload["business_financials"],
+        growth_needs=payload["growth_needs"],
+        proposed_financing=payload["proposed_financing"],
+        reinvestment_rate=payload["reinvestment_rate"],
+        granularity=payload["granularity"]
     )
-    return result
+    # Rows are built only here, after downsampling; the result is then JSON-shaped,
+    # so skip response validation and jsonable_encoder
+    return ORJSONResponse(serialize_result(downsample_result(SCENARIO_TYPE, result, max_points)), headers=cache_headers(etag))
+
+
+def _run_stress_test(stress: dict, payload: dict) -> dict:
+    with stress_test_slot():
+        # Thousands of paths usually cost enough to run in the process pool
+        return run_simulation(
+            stress_test_debt_management,
+            estimate_cost(payload["projection_period"], stress["paths"]),
+            stress=stress,
+            **payload
+        )
+
+
+@router.post("/simulate/debt-management/stress-test")
+def stress_test_debt_management_route(data: DebtStressTestInput, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    payload = data.model_dump()
+    stress = payload.pop("stress")
+
+    cells = stress["paths"] * payload["projection_period"]
+    if cells > STRESS_TEST_MAX_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"paths x projection_period must not exceed {STRESS_TEST_MAX_CELLS:,} (got {cells:,})"
+        )
+
+    # Identical requests share one run, and so one slot
+    key = request_key("/simulate/debt-management/stress-test", {**payload, "stress": stress})
+    result = simulation_flight.do(key, _run_stress_test, stress, payload)
+    return ORJSONResponse(serialize_result(downsample_result("debt-stress-test", result, max_points)))
 
 
 @router.post("/debt-management/save")
 def save_debt_management_to_db(data: DebtManagementInput):
+    # Dump the input once and reuse it for the simulator and the DB row
+    payload = data.model_dump()
+
+    # run simulation so the AI routes and their fallback have results to work from
+    sim_result = run_simulation(
+        simulate_debt_management,
+        estimate_cost(payload["projection_period"] * (len(payload["loans"]) + 1)),
+        scenario_type=payload["scenario_type"],
+        user_type=payload["user_type"],
+        projection_period=payload["projection_period"],
+        loans=payload["loans"],
+        business_financials=payload["business_financials"],
+        growth_needs=payload["growth_needs"],
+        proposed_financing=payload["proposed_financing"],
+        reinvestment_rate=payload["reinvestment_rate"],
+        granularity=payload["granularity"]
+    )
+    sim_data = sim_result["data"]
+
     with get_session() as session:
         scenario = DebtManagementModel(
-            scenario_type=data.scenario_type,
-            user_type=data.user_type,
-            projection_period=data.projection_period,
-            loans=[loan.model_dump() for loan in data.loans],
-            business_financials=data.business_financials.model_dump(),
-            growth_needs=data.growth_needs.model_dump(),
-            proposed_financing=data.proposed_financing.model_dump(),
-            reinvestment_rate=data.reinvestment_rate
+            scenario_type=payload["scenario_type"],
+            user_type=payload["user_type"],
+            projection_period=payload["projection_period"],
+            loans=payload["loans"],
+            business_financials=payload["business_financials"],
+            growth_needs=payload["growth_needs"],
+            proposed_financing=payload["proposed_financing"],
+            reinvestment_rate=payload["reinvestment_rate"],
+            granularity=payload["granularity"],
+            chart_data=chart_rows(sim_data.get("chart_data")),
+            key_metrics=sim_data.get("key_metrics"),
+            insight=sim_data.get("insight"),
+            engine_version=ENGINE_VERSION
         )
         session.add(scenario)
         session.commit()
         session.refresh(scenario)
-    return {"id": scenario.id}
+
+    # Pre-generate the AI explanation and suggestions off the interactive path
+    job_ids = enqueue_ai_jobs(SCENARIO_TYPE, scenario.id)
+
+    return {"id": scenario.id, "ai_jobs": job_ids}
+
+
+@router.get("/debt-management/{scenario_id:int}")
+def get_debt_management(request: Request, response: Response, scenario_id: int, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    with get_session() as session:
+        scenario = session.get(DebtManagementModel, scenario_id)
+        if not scenario:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
+        etag = make_etag(SCENARIO_TYPE, scenario_version(scenario), max_points)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        data = scenario.model_dump()
+
+    data["chart_data"] = downsample_chart_data(SCENARIO_TYPE, data["chart_data"] or [], max_points)
+    response.headers.update(cache_headers(etag))
+    return {
+        "status": "success",
+        "data": data
+    }
 
 
 @router.delete("/debt-management/{scenario_id}")
@@ -59,136 +178,181 @@ def delete_debt_management(scenario_id: int):
     
 
 
-@router.get("/debt-management/ai-explanation")
-def get_ai_explanation():
+def _build_ai_explanation(scenario: DebtManagementModel, deadline: float = None) -> dict:
+    # Extract key stats for prompt context
+    business_financials = scenario.business_financials
+    growth_needs = scenario.growth_needs
+    chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
+
+    avg_monthly_revenue = business_financials.get("avg_monthly_revenue", 0)
+    industry = business_financials.get("industry", "N/A")
+    capital_required = growth_needs.get("capital_required", 0)
+    expected_roi = growth_needs.get("expected_roi", "N/A")
+
+    # Calculate summary stats from chart_data
+    total_net_cash_flow_period = sum([c.get("net_operating_cash_flow", 0) for c in chart_data])
+    lowest_cash_value = min([c.get("net_cash_position", 0) for c in chart_data]) if chart_data else 0
+    lowest_cash_month_idx = (
+        [c.get("period", 0) for c in chart_data if c.get("net_cash_position", 0) == lowest_cash_value][0]
+        if chart_data and lowest_cash_value else "N/A"
+    )
+    period_name = PERIOD_NAMES[scenario.granularity or "monthly"]
+    # Identify primary cash outflow
+    significant_drain_name = "operating_expenses"
+    max_outflow = 0
+    for c in chart_data:
+        for key in ["operating_expenses", "loan_principal_payments", "loan_interest_payments"]:
+            if c.get(key, 0) > max_outflow:
+                max_outflow = c.get(key, 0)
+                significant_drain_name = key
+
+    prompt = (
+        "As an expert financial advisor for Filipino MSMEs, analyze the provided business cash flow projection. "
+        "Focus on how revenues, operating expenses, and debt payments impact the net cash position. "
+        "Identify the most critical period for cash flow and the primary factor causing it. "
+        "Explain the insights clearly, using business-relevant language, directly from the provided data.\n\n"
+        f"Inputs:\n"
+        f"Business profile: Avg monthly revenue: ₱{avg_monthly_revenue:,.2f}, Industry: {industry}\n"
+        f"Projected data: Total projected net cash flow over the period: ₱{total_net_cash_flow_period:,.2f}. "
+        f"Lowest projected cash balance: ₱{lowest_cash_value:,.2f} in {period_name} {lowest_cash_month_idx}. "
+        f"Primary cash outflow identified: {significant_drain_name.replace('_', ' ').title()}.\n"
+        f"Growth plan: Capital required: ₱{capital_required:,.2f}, Expected ROI: {expected_roi}."
+    )
+
+    explanation_text = generate_response_within(prompt, deadline, route="/debt-management/ai-explanation", prompt_version=PROMPT_VERSION)
+    if explanation_text is None:
+        return debt_explanation(scenario)
+
+    return {
+        "explanation_text": explanation_text,
+        "model_info": {
+            "model_name": "cohere-command",
+            "prompt_version": PROMPT_VERSION
+        }
+    }
+
+
+def _latest_scenario() -> DebtManagementModel:
     with get_session() as session:
         scenario = session.exec(
             select(DebtManagementModel).order_by(DebtManagementModel.created_at.desc())
         ).first()
         if not scenario:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No debt management scenario found.")
+        # A detached copy, so no connection is held while the LLM answers
+        return DebtManagementModel(**scenario.model_dump())
 
-        # Extract key stats for prompt context
-        business_financials = scenario.business_financials
-        growth_needs = scenario.growth_needs
-        chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
-
-        avg_monthly_revenue = business_financials.get("avg_monthly_revenue", 0)
-        industry = business_financials.get("industry", "N/A")
-        capital_required = growth_needs.get("capital_required", 0)
-        expected_roi = growth_needs.get("expected_roi", "N/A")
-
-        # Calculate summary stats from chart_data
-        total_net_cash_flow_period = sum([c.get("net_operating_cash_flow", 0) for c in chart_data])
-        lowest_cash_value = min([c.get("net_cash_position", 0) for c in chart_data]) if chart_data else 0
-        lowest_cash_month_idx = (
-            [c.get("period", 0) for c in chart_data if c.get("net_cash_position", 0) == lowest_cash_value][0]
-            if chart_data and lowest_cash_value else "N/A"
-        )
-        # Identify primary cash outflow
-        significant_drain_name = "operating_expenses"
-        max_outflow = 0
-        for c in chart_data:
-            for key in ["operating_expenses", "loan_principal_payments", "loan_interest_payments"]:
-                if c.get(key, 0) > max_outflow:
-                    max_outflow = c.get(key, 0)
-                    significant_drain_name = key
-
-        prompt = (
-            "As an expert financial advisor for Filipino MSMEs, analyze the provided business cash flow projection. "
-            "Focus on how revenues, operating expenses, and debt payments impact the net cash position. "
-            "Identify the most critical period for cash flow and the primary factor causing it. "
-            "Explain the insights clearly, using business-relevant language, directly from the provided data.\n\n"
-            f"Inputs:\n"
-            f"Business profile: Avg monthly revenue: ₱{avg_monthly_revenue:,.2f}, Industry: {industry}\n"
-            f"Projected data: Total projected net cash flow over the period: ₱{total_net_cash_flow_period:,.2f}. "
-            f"Lowest projected cash balance: ₱{lowest_cash_value:,.2f} in Month {lowest_cash_month_idx}. "
-            f"Primary cash outflow identified: {significant_drain_name.replace('_', ' ').title()}.\n"
-            f"Growth plan: Capital required: ₱{capital_required:,.2f}, Expected ROI: {expected_roi}."
-        )
 
-        explanation_text = generate_response(prompt)
-
-        return {
-            "status": "success",
-            "data": {
-                "explanation_text": explanation_text,
-                "model_info": {
-                    "model_name": "cohere-command",
-                    "prompt_version": "v1.0.0"
-                }
-            }
-        }
+def _ai_data(scenario: DebtManagementModel, job_type: str, build, deadline: float) -> dict:
+    # Serve the result pre-generated on save when it's ready
+    precomputed = get_completed_result(SCENARIO_TYPE, scenario.id, job_type, scenario_version(scenario))
+    return precomputed if precomputed else build(scenario, deadline)
+
+
+@router.get("/debt-management/ai-explanation")
+async def get_ai_explanation(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
+
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_explanation", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_explanation", _build_ai_explanation, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
+
+    return {
+        "status": "success",
+        "data": data
+    }
     
 
 
+def _build_ai_suggestions(scenario: DebtManagementModel, deadline: float = None) -> dict:
+    # Extract key stats for prompt context
+    business_financials = scenario.business_financials
+    growth_needs = scenario.growth_needs
+    chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
+
+    avg_monthly_revenue = business_financials.get("avg_monthly_revenue", 0)
+    capital_required = growth_needs.get("capital_required", 0)
+
+    # Calculate summary stats from chart_data
+    lowest_cash_value = min([c.get("net_cash_position", 0) for c in chart_data]) if chart_data else 0
+    lowest_cash_month_idx = (
+        [c.get("period", 0) for c in chart_data if c.get("net_cash_position", 0) == lowest_cash_value][0]
+        if chart_data and lowest_cash_value else "N/A"
+    )
+    period_name = PERIOD_NAMES[scenario.granularity or "monthly"]
+
+    # Get the latest AI insight
+    insight_prompt = (
+        "As an expert financial advisor for Filipino MSMEs, analyze the provided business cash flow projection. "
+        "Focus on how revenues, operating expenses, and debt payments impact the net cash position. "
+        "Identify the most critical period for cash flow and the primary factor causing it. "
+        "Explain the insights clearly, using business-relevant language, directly from the provided data.\n\n"
+        f"Inputs:\n"
+        f"Business profile: Avg monthly revenue: ₱{avg_monthly_revenue:,.2f}\n"
+        f"Projected data: Lowest projected cash balance: ₱{lowest_cash_value:,.2f} in {period_name} {lowest_cash_month_idx}.\n"
+        f"Growth plan: Capital required: ₱{capital_required:,.2f}."
+    )
+    ai_insight = generate_response_within(insight_prompt, deadline, route="/debt-management/ai-suggestions", prompt_version=PROMPT_VERSION)
+    if ai_insight is None:
+        return debt_suggestions(scenario)
+
+    # Build suggestion prompt, instructing the AI to return JSON
+    suggestion_prompt = (
+        "Based on the cash flow insights and the planned growth initiative, recommend actionable, next steps for this Filipino MSME to optimize their debt and capital structure and ensure sufficient liquidity. Suggestions should be specific to business operations and financing.\n\n"
+        "Return your answer as a JSON array of objects with keys: priority, title, description.\n"
+        f"Inputs:\n"
+        f"Insight: {ai_insight}\n"
+        f"Projected data: AI suggests improving cash position by ₱{lowest_cash_value:,.2f} by addressing the {period_name} {lowest_cash_month_idx} cash crunch.\n"
+        f"Planned growth: Capital required: ₱{capital_required:,.2f}."
+    )
+
+    raw_suggestions = generate_response_within(suggestion_prompt, deadline, route="/debt-management/ai-suggestions", prompt_version=PROMPT_VERSION)
+    if raw_suggestions is None:
+        return debt_suggestions(scenario)
+
+    # Try to parse the AI output as JSON
+    try:
+        actionable_recommendations = json.loads(raw_suggestions)
+    except Exception:
+        # fallback: wrap the raw text in a single recommendation
+        actionable_recommendations = [{
+            "priority": "Info",
+            "title": "AI Suggestion",
+            "description": raw_suggestions
+        }]
+
+    return {
+        "actionable_recommendations": actionable_recommendations,
+        "model_info": {
+            "model_name": "cohere-command",
+            "prompt_version": PROMPT_VERSION
+        }
+    }
+
+
 @router.get("/debt-management/ai-suggestions")
-def get_ai_suggestions():
-    with get_session() as session:
-        scenario = session.exec(
-            select(DebtManagementModel).order_by(DebtManagementModel.created_at.desc())
-        ).first()
-        if not scenario:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No debt management scenario found.")
+async def get_ai_suggestions(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
 
-        # Extract key stats for prompt context
-        business_financials = scenario.business_financials
-        growth_needs = scenario.growth_needs
-        chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_suggestions", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-        avg_monthly_revenue = business_financials.get("avg_monthly_revenue", 0)
-        capital_required = growth_needs.get("capital_required", 0)
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_suggestions", _build_ai_suggestions, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
 
-        # Calculate summary stats from chart_data
-        lowest_cash_value = min([c.get("net_cash_position", 0) for c in chart_data]) if chart_data else 0
-        lowest_cash_month_idx = (
-            [c.get("period", 0) for c in chart_data if c.get("net_cash_position", 0) == lowest_cash_value][0]
-            if chart_data and lowest_cash_value else "N/A"
-        )
+    return {
+        "status": "success",
+        "data": data
+    }
 
-        # Get the latest AI insight
-        insight_prompt = (
-            "As an expert financial advisor for Filipino MSMEs, analyze the provided business cash flow projection. "
-            "Focus on how revenues, operating expenses, and debt payments impact the net cash position. "
-            "Identify the most critical period for cash flow and the primary factor causing it. "
-            "Explain the insights clearly, using business-relevant language, directly from the provided data.\n\n"
-            f"Inputs:\n"
-            f"Business profile: Avg monthly revenue: ₱{avg_monthly_revenue:,.2f}\n"
-            f"Projected data: Lowest projected cash balance: ₱{lowest_cash_value:,.2f} in Month {lowest_cash_month_idx}.\n"
-            f"Growth plan: Capital required: ₱{capital_required:,.2f}."
-        )
-        ai_insight = generate_response(insight_prompt)
-
-        # Build suggestion prompt, instructing the AI to return JSON
-        suggestion_prompt = (
-            "Based on the cash flow insights and the planned growth initiative, recommend actionable, next steps for this Filipino MSME to optimize their debt and capital structure and ensure sufficient liquidity. Suggestions should be specific to business operations and financing.\n\n"
-            "Return your answer as a JSON array of objects with keys: priority, title, description.\n"
-            f"Inputs:\n"
-            f"Insight: {ai_insight}\n"
-            f"Projected data: AI suggests improving cash position by ₱{lowest_cash_value:,.2f} by addressing the Month {lowest_cash_month_idx} cash crunch.\n"
-            f"Planned growth: Capital required: ₱{capital_required:,.2f}."
-        )
 
-        raw_suggestions = generate_response(suggestion_prompt)
-
-        # Try to parse the AI output as JSON
-        try:
-            actionable_recommendations = json.loads(raw_suggestions)
-        except Exception:
-            # fallback: wrap the raw text in a single recommendation
-            actionable_recommendations = [{
-                "priority": "Info",
-                "title": "AI Suggestion",
-                "description": raw_suggestions
-            }]
-
-        return {
-            "status": "success",
-            "data": {
-                "actionable_recommendations": actionable_recommendations,
-                "model_info": {
-                    "model_name": "cohere-command",
-                    "prompt_version": "v1.0.0"
-                }
-            }
-        }
\ No newline at end of file
+register_generator(SCENARIO_TYPE, "ai_explanation", DebtManagementModel, _build_ai_explanation)
+register_generator(SCENARIO_TYPE, "ai_suggestions", DebtManagementModel, _build_ai_suggestions)
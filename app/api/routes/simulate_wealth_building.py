@@ -1,57 +1,185 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Request, Response, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlmodel import select
 import json
 
-from app.schemas.wealth_building_schema import WealthBuildingInput
-from app.services.simulation_logic import simulate_wealth_building
+from app.schemas.wealth_building_schema import WealthBuildingInput, WealthBuildingResponse, HouseholdPlanInput, WealthSensitivityInput
+from app.services.simulation_logic import simulate_wealth_building, ENGINE_VERSION
+from app.services.household_plan import simulate_household_plan
+from app.services.sensitivity import wealth_sensitivity
 from app.models.wealth_building_model import WealthBuildingModel
-from app.services.ai_explainer import generate_response
+from app.services.ai_explainer import generate_response_within, response_deadline
+from app.services.ai_fallback import wealth_explanation, wealth_suggestions
+from app.services.admission import ai_slot
+from app.services.simulation_pool import run_simulation, estimate_cost
+from app.services.simulation_result import serialize_result, chart_rows
+from app.services.downsampling import downsample_result, downsample_chart_data, MIN_CHART_POINTS
+from app.services.single_flight import simulation_flight, request_key
+from app.services.http_cache import make_etag, scenario_version, etag_matches, cache_headers, not_modified
+from app.services.background_jobs import register_generator, enqueue_ai_jobs, get_completed_result
 from app.db.session import get_session
+from app.services.tracing import TracedRoute, span
 
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
+SCENARIO_TYPE = "wealth-building"
+# Bump when the AI prompts change, so clients refetch AI text they already hold
+PROMPT_VERSION = "v1.0.0"
 
-@router.post("/simulate/wealth-building")
-def simulate_wealth_building_route(data: WealthBuildingInput):
-    result = simulate_wealth_building(
-        goal_name=data.goal_name,
-        current_age=data.current_age,
-        target_age=data.target_age,
-        target_amount=data.target_amount,
-        current_savings=data.current_savings,
-        monthly_contribution=data.monthly_contribution,
-        annual_contribution_increase=data.annual_contribution_increase,
-        expected_annual_return=data.expected_annual_return,
-        inflation_rate=data.inflation_rate,
-        risk_profile=data.risk_profile,
-        advisor_fee_percent=data.advisor_fee_percent
+
+@router.post("/simulate/wealth-building", response_model=WealthBuildingResponse)
+def simulate_wealth_building_route(request: Request, data: WealthBuildingInput, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+), sensitivity: bool = Query(False, description="Also return the tornado sensitivity of the key assumptions")):
+    # Dump the input once and reuse it for the cache key and the simulator
+    payload = data.model_dump()
+
+    # The response depends only on the inputs and the engine, so their hash is its ETag
+    etag = make_etag("/simulate/wealth-building", payload, max_points, sensitivity, ENGINE_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Identical payloads already being simulated share one computation
+    key = request_key("/simulate/wealth-building", payload)
+    # Long projections run in the process pool so they don't hold this worker's GIL
+    result = simulation_flight.do(
+        key,
+        run_simulation,
+        simulate_wealth_building,
+        estimate_cost((payload["target_age"] - payload["current_age"]) * 12),
+        goal_name=payload["goal_name"],
+        current_age=payload["current_age"],
+        target_age=payload["target_age"],
+        target_amount=payload["target_amount"],
+        current_savings=payload["current_savings"],
+        monthly_contribution=payload["monthly_contribution"],
+        annual_contribution_increase=payload["annual_contribution_increase"],
+        expected_annual_return=payload["expected_annual_return"],
+        inflation_rate=payload["inflation_rate"],
+        risk_profile=payload["risk_profile"],
+        advisor_fee_percent=payload["advisor_fee_percent"]
     )
 
-    return result
+    result = downsample_result(SCENARIO_TYPE, result, max_points)
+    if sensitivity:
+        with span("simulate wealth_sensitivity"):
+            result = {**result, "data": {**result["data"], "sensitivity": wealth_sensitivity(payload)}}
+
+    # Rows are built only here, after downsampling; the result is then JSON-shaped,
+    # so skip response validation and jsonable_encoder
+    return ORJSONResponse(serialize_result(result), headers=cache_headers(etag))
+
 
+@router.post("/simulate/wealth-building/sensitivity")
+def simulate_wealth_sensitivity_route(data: WealthSensitivityInput):
+    payload = data.model_dump()
+
+    # Every perturbation is evaluated in one vectorized batch, cheap enough to run inline
+    key = request_key("/simulate/wealth-building/sensitivity", payload)
+    steps = payload.pop("steps")
+    with span("simulate wealth_sensitivity"):
+        result = simulation_flight.do(key, wealth_sensitivity, payload, steps)
+
+    return {
+        "status": "success",
+        "data": result
+    }
+
+
+@router.post("/simulate/household-plan")
+def simulate_household_plan_route(data: HouseholdPlanInput):
+    payload = data.model_dump()
+
+    # All goals are projected together in one vectorized pass
+    key = request_key("/simulate/household-plan", payload)
+    with span("simulate simulate_household_plan"):
+        result = simulation_flight.do(
+            key,
+            simulate_household_plan,
+            current_age=payload["current_age"],
+            goals=payload["goals"],
+            inflation_rate=payload["inflation_rate"],
+            expected_annual_return=payload["expected_annual_return"],
+            advisor_fee_percent=payload["advisor_fee_percent"],
+            monthly_budget=payload["monthly_budget"]
+        )
+
+    return ORJSONResponse(result)
 
 
 @router.post("/wealth-building/save")
 def save_wealth_building_to_db(data: WealthBuildingInput):
+    # Dump the input once and reuse it for the simulator and the DB row
+    payload = data.model_dump()
+
+    # run simulation so the AI routes and their fallback have results to work from
+    sim_result = run_simulation(
+        simulate_wealth_building,
+        estimate_cost((payload["target_age"] - payload["current_age"]) * 12),
+        goal_name=payload["goal_name"],
+        current_age=payload["current_age"],
+        target_age=payload["target_age"],
+        target_amount=payload["target_amount"],
+        current_savings=payload["current_savings"],
+        monthly_contribution=payload["monthly_contribution"],
+        annual_contribution_increase=payload["annual_contribution_increase"],
+        expected_annual_return=payload["expected_annual_return"],
+        inflation_rate=payload["inflation_rate"],
+        risk_profile=payload["risk_profile"],
+        advisor_fee_percent=payload["advisor_fee_percent"]
+    )
+    sim_data = sim_result["data"]
+
     with get_session() as session:
         scenario = WealthBuildingModel(
-            goal_name=data.goal_name,
-            current_age=data.current_age,
-            target_age=data.target_age,
-            target_amount=data.target_amount,
-            current_savings=data.current_savings,
-            monthly_contribution=data.monthly_contribution,
-            annual_contribution_increase=data.annual_contribution_increase,
-            expected_annual_return=data.expected_annual_return,
-            inflation_rate=data.inflation_rate,
-            risk_profile=data.risk_profile,
-            advisor_fee_percent=data.advisor_fee_percent
+            goal_name=payload["goal_name"],
+            current_age=payload["current_age"],
+            target_age=payload["target_age"],
+            target_amount=payload["target_amount"],
+            current_savings=payload["current_savings"],
+            monthly_contribution=payload["monthly_contribution"],
+            annual_contribution_increase=payload["annual_contribution_increase"],
+            expected_annual_return=payload["expected_annual_return"],
+            inflation_rate=payload["inflation_rate"],
+            risk_profile=payload["risk_profile"],
+            advisor_fee_percent=payload["advisor_fee_percent"],
+            chart_data=chart_rows(sim_data.get("chart_data")),
+            key_metrics=sim_data.get("key_metrics"),
+            insight=sim_data.get("insight"),
+            engine_version=ENGINE_VERSION
         )
         session.add(scenario)
         session.commit()
         session.refresh(scenario)
-    return {"id": scenario.id}
+
+    # Pre-generate the AI explanation and suggestions off the interactive path
+    job_ids = enqueue_ai_jobs(SCENARIO_TYPE, scenario.id)
+
+    return {"id": scenario.id, "ai_jobs": job_ids}
+
+
+@router.get("/wealth-building/{scenario_id:int}")
+def get_wealth_building(request: Request, response: Response, scenario_id: int, max_points: Optional[int] = Query(
+    None, ge=MIN_CHART_POINTS, description="Downsample chart_data to at most this many points"
+)):
+    with get_session() as session:
+        scenario = session.get(WealthBuildingModel, scenario_id)
+        if not scenario:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
+        etag = make_etag(SCENARIO_TYPE, scenario_version(scenario), max_points)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        data = scenario.model_dump()
+
+    data["chart_data"] = downsample_chart_data(SCENARIO_TYPE, data["chart_data"] or [], max_points)
+    response.headers.update(cache_headers(etag))
+    return {
+        "status": "success",
+        "data": data
+    }
 
 
 @router.delete("/wealth-building/{scenario_id}")
@@ -67,153 +195,194 @@ def delete_wealth_building(scenario_id: int):
     
 
 
-@router.get("/wealth-building/ai-explanation")
-def get_ai_explanation():
-    with get_session() as session:
-        scenario = session.exec(
-            select(WealthBuildingModel).order_by(WealthBuildingModel.created_at.desc())
-        ).first()
-        if not scenario:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No wealth building scenario found.")
+def _build_ai_explanation(scenario: WealthBuildingModel, deadline: float = None) -> dict:
+    goal_name = scenario.goal_name
+    current_age = scenario.current_age
+    target_age = scenario.target_age
+    target_amount = scenario.target_amount
+    current_savings = scenario.current_savings
+    monthly_contribution = scenario.monthly_contribution
+    annual_contribution_increase = scenario.annual_contribution_increase
+    expected_annual_return = scenario.expected_annual_return
+    inflation_rate = scenario.inflation_rate
+    risk_profile = scenario.risk_profile
+    advisor_fee_percent = scenario.advisor_fee_percent
 
-        goal_name = scenario.goal_name
-        current_age = scenario.current_age
-        target_age = scenario.target_age
-        target_amount = scenario.target_amount
-        current_savings = scenario.current_savings
-        monthly_contribution = scenario.monthly_contribution
-        annual_contribution_increase = scenario.annual_contribution_increase
-        expected_annual_return = scenario.expected_annual_return
-        inflation_rate = scenario.inflation_rate
-        risk_profile = scenario.risk_profile
-        advisor_fee_percent = scenario.advisor_fee_percent
-
-        chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
-        key_metrics = scenario.key_metrics if hasattr(scenario, "key_metrics") else {}
-
-        # Calculate summary stats
-        total_projected_value = key_metrics.get("total_projected_value", 0)
-        inflation_adjusted_target = key_metrics.get("inflation_adjusted_target", 0)
-        projected_shortfall = key_metrics.get("projected_shortfall", 0)
-        percent_from_growth = key_metrics.get("percent_from_growth", 0)
-
-        prompt = (
-            "As an expert financial advisor, analyze the provided wealth building projection for a client. "
-            "Focus on their goal, contributions, investment growth, and inflation-adjusted target. "
-            "Identify the projected shortfall or surplus and the main factors driving the outcome. "
-            "Explain the insights clearly, using client-relevant language, directly from the provided data.\n\n"
-            f"Inputs:\n"
-            f"Goal: {goal_name}\n"
-            f"Client age: {current_age}, Target age: {target_age}\n"
-            f"Target amount: ₱{target_amount:,.2f}\n"
-            f"Current savings: ₱{current_savings:,.2f}\n"
-            f"Monthly contribution: ₱{monthly_contribution:,.2f}, Annual increase: {annual_contribution_increase:.2%}\n"
-            f"Expected annual return: {expected_annual_return:.2%}, Inflation rate: {inflation_rate:.2%}, Risk profile: {risk_profile}\n"
-            f"Advisor fee: {advisor_fee_percent:.2f}%\n"
-            f"Projected data: Total projected value: ₱{total_projected_value:,.2f}. "
-            f"Inflation-adjusted target: ₱{inflation_adjusted_target:,.2f}. "
-            f"Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
-            f"Percent from investment growth: {percent_from_growth:.2f}%."
-        )
+    chart_data = scenario.chart_data if hasattr(scenario, "chart_data") else []
+    key_metrics = scenario.key_metrics if hasattr(scenario, "key_metrics") else {}
+
+    # Calculate summary stats
+    total_projected_value = key_metrics.get("total_projected_value", 0)
+    inflation_adjusted_target = key_metrics.get("inflation_adjusted_target", 0)
+    projected_shortfall = key_metrics.get("projected_shortfall", 0)
+    percent_from_growth = key_metrics.get("percent_from_growth", 0)
 
-        explanation_text = generate_response(prompt)
-
-        return {
-            "status": "success",
-            "data": {
-                "explanation_text": explanation_text,
-                "model_info": {
-                    "model_name": "cohere-command",
-                    "prompt_version": "v1.0.0"
-                }
-            }
+    prompt = (
+        "As an expert financial advisor, analyze the provided wealth building projection for a client. "
+        "Focus on their goal, contributions, investment growth, and inflation-adjusted target. "
+        "Identify the projected shortfall or surplus and the main factors driving the outcome. "
+        "Explain the insights clearly, using client-relevant language, directly from the provided data.\n\n"
+        f"Inputs:\n"
+        f"Goal: {goal_name}\n"
+        f"Client age: {current_age}, Target age: {target_age}\n"
+        f"Target amount: ₱{target_amount:,.2f}\n"
+        f"Current savings: ₱{current_savings:,.2f}\n"
+        f"Monthly contribution: ₱{monthly_contribution:,.2f}, Annual increase: {annual_contribution_increase:.2%}\n"
+        f"Expected annual return: {expected_annual_return:.2%}, Inflation rate: {inflation_rate:.2%}, Risk profile: {risk_profile}\n"
+        f"Advisor fee: {advisor_fee_percent:.2f}%\n"
+        f"Projected data: Total projected value: ₱{total_projected_value:,.2f}. "
+        f"Inflation-adjusted target: ₱{inflation_adjusted_target:,.2f}. "
+        f"Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
+        f"Percent from investment growth: {percent_from_growth:.2f}%."
+    )
+
+    explanation_text = generate_response_within(prompt, deadline, route="/wealth-building/ai-explanation", prompt_version=PROMPT_VERSION)
+    if explanation_text is None:
+        return wealth_explanation(scenario)
+
+    return {
+        "explanation_text": explanation_text,
+        "model_info": {
+            "model_name": "cohere-command",
+            "prompt_version": PROMPT_VERSION
         }
-    
+    }
 
 
-@router.get("/wealth-building/ai-suggestions")
-def get_ai_suggestions():
+def _latest_scenario() -> WealthBuildingModel:
     with get_session() as session:
         scenario = session.exec(
             select(WealthBuildingModel).order_by(WealthBuildingModel.created_at.desc())
         ).first()
         if not scenario:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No wealth building scenario found.")
+        # A detached copy, so no connection is held while the LLM answers
+        return WealthBuildingModel(**scenario.model_dump())
 
-        # Extract key stats for prompt context
-        goal_name = scenario.goal_name
-        current_age = scenario.current_age
-        target_age = scenario.target_age
-        target_amount = scenario.target_amount
-        current_savings = scenario.current_savings
-        monthly_contribution = scenario.monthly_contribution
-        annual_contribution_increase = scenario.annual_contribution_increase
-        expected_annual_return = scenario.expected_annual_return
-        inflation_rate = scenario.inflation_rate
-        risk_profile = scenario.risk_profile
-        advisor_fee_percent = scenario.advisor_fee_percent
-
-        key_metrics = scenario.key_metrics if hasattr(scenario, "key_metrics") else {}
-
-        total_projected_value = key_metrics.get("total_projected_value", 0)
-        inflation_adjusted_target = key_metrics.get("inflation_adjusted_target", 0)
-        projected_shortfall = key_metrics.get("projected_shortfall", 0)
-        percent_from_growth = key_metrics.get("percent_from_growth", 0)
-
-        # Get the latest AI insight
-        insight_prompt = (
-            "As an expert financial advisor, analyze the provided wealth building projection for a client. "
-            "Focus on their goal, contributions, investment growth, and inflation-adjusted target. "
-            "Identify the projected shortfall or surplus and the main factors driving the outcome. "
-            "Explain the insights clearly, using client-relevant language, directly from the provided data.\n\n"
-            f"Inputs:\n"
-            f"Goal: {goal_name}\n"
-            f"Client age: {current_age}, Target age: {target_age}\n"
-            f"Target amount: ₱{target_amount:,.2f}\n"
-            f"Current savings: ₱{current_savings:,.2f}\n"
-            f"Monthly contribution: ₱{monthly_contribution:,.2f}, Annual increase: {annual_contribution_increase:.2%}\n"
-            f"Expected annual return: {expected_annual_return:.2%}, Inflation rate: {inflation_rate:.2%}, Risk profile: {risk_profile}\n"
-            f"Advisor fee: {advisor_fee_percent:.2f}%\n"
-            f"Projected data: Total projected value: ₱{total_projected_value:,.2f}. "
-            f"Inflation-adjusted target: ₱{inflation_adjusted_target:,.2f}. "
-            f"Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
-            f"Percent from investment growth: {percent_from_growth:.2f}%."
-        )
-        ai_insight = generate_response(insight_prompt)
-
-        # Build suggestion prompt, instructing the AI to return JSON
-        suggestion_prompt = (
-            "Based on the wealth building insights and the client's goal, recommend actionable, next steps for this client to optimize their contributions, investment strategy, and probability of reaching their goal. "
-            "Suggestions should be specific to financial planning and investment options.\n\n"
-            "Return your answer as a JSON array of objects with keys: priority, title, description.\n"
-            f"Inputs:\n"
-            f"Insight: {ai_insight}\n"
-            f"Projected data: Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
-            f"Percent from investment growth: {percent_from_growth:.2f}%.\n"
-            f"Goal: {goal_name}, Target amount: ₱{target_amount:,.2f}, Target age: {target_age}."
-        )
 
-        raw_suggestions = generate_response(suggestion_prompt)
-
-        # Try to parse the AI output as JSON
-        try:
-            actionable_recommendations = json.loads(raw_suggestions)
-        except Exception:
-            actionable_recommendations = [{
-                "priority": "Info",
-                "title": "AI Suggestion",
-                "description": raw_suggestions
-            }]
-
-        return {
-            "status": "success",
-            "data": {
-                "actionable_recommendations": actionable_recommendations,
-                "model_info": {
-                    "model_name": "cohere-command",
-                    "prompt_version": "v1.0.0"
-                }
-            }
-        }
+def _ai_data(scenario: WealthBuildingModel, job_type: str, build, deadline: float) -> dict:
+    # Serve the result pre-generated on save when it's ready
+    precomputed = get_completed_result(SCENARIO_TYPE, scenario.id, job_type, scenario_version(scenario))
+    return precomputed if precomputed else build(scenario, deadline)
+
+
+@router.get("/wealth-building/ai-explanation")
+async def get_ai_explanation(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
+
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_explanation", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_explanation", _build_ai_explanation, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
+
+    return {
+        "status": "success",
+        "data": data
+    }
     
 
+
+def _build_ai_suggestions(scenario: WealthBuildingModel, deadline: float = None) -> dict:
+    # Extract key stats for prompt context
+    goal_name = scenario.goal_name
+    current_age = scenario.current_age
+    target_age = scenario.target_age
+    target_amount = scenario.target_amount
+    current_savings = scenario.current_savings
+    monthly_contribution = scenario.monthly_contribution
+    annual_contribution_increase = scenario.annual_contribution_increase
+    expected_annual_return = scenario.expected_annual_return
+    inflation_rate = scenario.inflation_rate
+    risk_profile = scenario.risk_profile
+    advisor_fee_percent = scenario.advisor_fee_percent
+
+    key_metrics = scenario.key_metrics if hasattr(scenario, "key_metrics") else {}
+
+    total_projected_value = key_metrics.get("total_projected_value", 0)
+    inflation_adjusted_target = key_metrics.get("inflation_adjusted_target", 0)
+    projected_shortfall = key_metrics.get("projected_shortfall", 0)
+    percent_from_growth = key_metrics.get("percent_from_growth", 0)
+
+    # Get the latest AI insight
+    insight_prompt = (
+        "As an expert financial advisor, analyze the provided wealth building projection for a client. "
+        "Focus on their goal, contributions, investment growth, and inflation-adjusted target. "
+        "Identify the projected shortfall or surplus and the main factors driving the outcome. "
+        "Explain the insights clearly, using client-relevant language, directly from the provided data.\n\n"
+        f"Inputs:\n"
+        f"Goal: {goal_name}\n"
+        f"Client age: {current_age}, Target age: {target_age}\n"
+        f"Target amount: ₱{target_amount:,.2f}\n"
+        f"Current savings: ₱{current_savings:,.2f}\n"
+        f"Monthly contribution: ₱{monthly_contribution:,.2f}, Annual increase: {annual_contribution_increase:.2%}\n"
+        f"Expected annual return: {expected_annual_return:.2%}, Inflation rate: {inflation_rate:.2%}, Risk profile: {risk_profile}\n"
+        f"Advisor fee: {advisor_fee_percent:.2f}%\n"
+        f"Projected data: Total projected value: ₱{total_projected_value:,.2f}. "
+        f"Inflation-adjusted target: ₱{inflation_adjusted_target:,.2f}. "
+        f"Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
+        f"Percent from investment growth: {percent_from_growth:.2f}%."
+    )
+    ai_insight = generate_response_within(insight_prompt, deadline, route="/wealth-building/ai-suggestions", prompt_version=PROMPT_VERSION)
+    if ai_insight is None:
+        return wealth_suggestions(scenario)
+
+    # Build suggestion prompt, instructing the AI to return JSON
+    suggestion_prompt = (
+        "Based on the wealth building insights and the client's goal, recommend actionable, next steps for this client to optimize their contributions, investment strategy, and probability of reaching their goal. "
+        "Suggestions should be specific to financial planning and investment options.\n\n"
+        "Return your answer as a JSON array of objects with keys: priority, title, description.\n"
+        f"Inputs:\n"
+        f"Insight: {ai_insight}\n"
+        f"Projected data: Projected shortfall/surplus: ₱{projected_shortfall:,.2f}. "
+        f"Percent from investment growth: {percent_from_growth:.2f}%.\n"
+        f"Goal: {goal_name}, Target amount: ₱{target_amount:,.2f}, Target age: {target_age}."
+    )
+
+    raw_suggestions = generate_response_within(suggestion_prompt, deadline, route="/wealth-building/ai-suggestions", prompt_version=PROMPT_VERSION)
+    if raw_suggestions is None:
+        return wealth_suggestions(scenario)
+
+    # Try to parse the AI output as JSON
+    try:
+        actionable_recommendations = json.loads(raw_suggestions)
+    except Exception:
+        actionable_recommendations = [{
+            "priority": "Info",
+            "title": "AI Suggestion",
+            "description": raw_suggestions
+        }]
+
+    return {
+        "actionable_recommendations": actionable_recommendations,
+        "model_info": {
+            "model_name": "cohere-command",
+            "prompt_version": PROMPT_VERSION
+        }
+    }
+
+
+@router.get("/wealth-building/ai-suggestions")
+async def get_ai_suggestions(request: Request, response: Response):
+    scenario = await run_in_threadpool(_latest_scenario)
+
+    # Same scenario revision and prompts as the client's copy: answer before taking an AI slot
+    etag = make_etag(SCENARIO_TYPE, "ai_suggestions", scenario_version(scenario), PROMPT_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async with ai_slot(request):
+        data = await run_in_threadpool(_ai_data, scenario, "ai_suggestions", _build_ai_suggestions, response_deadline())
+    response.headers.update(cache_headers(etag, cacheable=not data.get("fallback")))
+
+    return {
+        "status": "success",
+        "data": data
+    }
+
+
+register_generator(SCENARIO_TYPE, "ai_explanation", WealthBuildingModel, _build_ai_explanation)
+register_generator(SCENARIO_TYPE, "ai_suggestions", WealthBuildingModel, _build_ai_suggestions)
@@ -0,0 +1,276 @@
+"""
+Simulate a whole file of scenarios offline, e.g. a client book exported from a spreadsheet.
+
+Usage:
+    python -m app.cli.bulk_simulate SCENARIO_TYPE INPUT (--output PATH | --db)
+        [--chunk-size 500] [--workers N] [--max-points N] [--checkpoint PATH] [--resume]
+
+SCENARIO_TYPE is budget-optimization, debt-management or wealth-building. INPUT is a CSV
+file (nested fields as dotted columns, e.g. income.monthly_gross_income; list fields such
+as loans as a JSON cell) or a JSONL file with one input object per line.
+
+The file is streamed in chunks that are validated and simulated across a process pool,
+with at most two chunks per worker in flight, so memory stays flat however large the
+file is. Results are written as chunks finish, in input order: to JSONL (--output x.jsonl),
+to a directory of Parquet parts (--output x.parquet, needs pyarrow) or into the scenario's
+table with bulk inserts (--db). Rejected records go to an errors JSONL file.
+
+After every chunk a checkpoint records how far the job got; --resume continues from it.
+File outputs are truncated back to the checkpoint first, so no record is written twice.
+With --db, a chunk committed just before an interruption is inserted again on resume.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+
+from app.services.bulk_simulation import unflatten, simulate_records
+from app.services.scenarios import SCENARIOS
+from app.services.simulation_logic import ENGINE_VERSION
+
+
+def read_records(path: str):
+    """Yield (record number, raw input) pairs from a CSV or JSONL file, one at a time."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, unflatten(row)
+        return
+
+    with open(path, "rb") as f:
+        number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # Passed on as text, so validation rejects it like any other bad record
+                yield number, line.decode("utf-8", errors="replace").strip()
+
+
+def _chunks(records, size: int):
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class JsonlWriter:
+    def __init__(self, path: str, offset: int = 0):
+        self.file = open(path, "ab")
+        # Drop anything written after the last checkpoint
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    def write(self, results: list):
+        self.file.write(b"".join(orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n" for r in results))
+
+    def commit(self) -> int:
+        """Make the written results durable and return the offset to checkpoint."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """One Parquet file per chunk in a directory, named after the chunk's first record."""
+
+    def __init__(self, path: str, records_done: int = 0):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        # Drop parts written after the last checkpoint
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:14]) > records_done:
+                os.remove(os.path.join(path, name))
+
+    def write(self, results: list):
+        if not results:
+            return
+        # Nested outputs are stored as JSON text so every part has the same flat schema
+        table = self.pa.table({
+            "record": [r["record"] for r in results],
+            "inputs": [orjson.dumps(r["inputs"]).decode() for r in results],
+            "key_metrics": [orjson.dumps(r["key_metrics"]).decode() for r in results],
+            "insight": [r["insight"] for r in results],
+            "chart_data": [orjson.dumps(r["chart_data"]).decode() for r in results]
+        })
+        self.pq.write_table(table, os.path.join(self.path, f"part-{results[0]['record']:09d}.parquet"))
+
+    def commit(self) -> int:
+        return 0
+
+    def close(self):
+        pass
+
+
+class DatabaseWriter:
+    """Bulk-inserts successful results into the scenario's table, one transaction per chunk."""
+
+    def __init__(self, scenario_type: str):
+        from sqlalchemy import insert
+        from app.db.session import engine
+        from app.db.base import init_db
+
+        # The app engine echoes every statement; far too noisy for thousands of rows
+        engine.echo = False
+        init_db()
+        self.engine = engine
+        self.model = SCENARIOS[scenario_type]["model"]
+        self.columns = set(self.model.model_fields) - {"id", "created_at", "updated_at", "engine_version"}
+        self.statement = insert(self.model.__table__)
+        self.pending = []
+
+    def write(self, results: list):
+        for r in results:
+            row = {k: v for k, v in r["inputs"].items() if k in self.columns and v is not None}
+            row.update(
+                chart_data=r["chart_data"], key_metrics=r["key_metrics"], insight=r["insight"],
+                engine_version=ENGINE_VERSION
+            )
+            # Through the model, so defaults such as created_at are filled in like on save
+            self.pending.append(self.model(**row).model_dump(exclude={"id"}))
+
+    def commit(self) -> int:
+        if self.pending:
+            with self.engine.begin() as connection:
+                connection.execute(self.statement, self.pending)
+            self.pending = []
+        return 0
+
+    def close(self):
+        pass
+
+
+def _load_checkpoint(path: str, args) -> dict:
+    if not (args.resume and os.path.exists(path)):
+        return {"records_done": 0, "output_offset": 0, "errors_offset": 0, "succeeded": 0, "failed": 0}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("scenario_type") != args.scenario_type or checkpoint.get("input") != os.path.abspath(args.input):
+        raise SystemExit(f"Checkpoint {path} belongs to a different job")
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    # Write then rename, so an interruption never leaves a half-written checkpoint
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def run(args) -> dict:
+    checkpoint_path = args.checkpoint or f"{args.input}.checkpoint.json"
+    errors_path = args.errors or f"{args.input}.errors.jsonl"
+    checkpoint = _load_checkpoint(checkpoint_path, args)
+    checkpoint.update(scenario_type=args.scenario_type, input=os.path.abspath(args.input))
+
+    if args.db:
+        writer = DatabaseWriter(args.scenario_type)
+    elif args.output.lower().endswith(".parquet"):
+        writer = ParquetWriter(args.output, checkpoint["records_done"])
+    else:
+        writer = JsonlWriter(args.output, checkpoint["output_offset"])
+    errors = JsonlWriter(errors_path, checkpoint["errors_offset"])
+
+    # Skip what a previous run already finished
+    records = itertools.islice(read_records(args.input), checkpoint["records_done"], None)
+    chunks = _chunks(records, args.chunk_size)
+
+    pool = None
+    if args.workers > 0:
+        pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    started = time.perf_counter()
+    done_this_run = 0
+    in_flight = deque()
+    try:
+        while True:
+            # Keep every worker busy with one chunk queued behind it, and no more
+            while len(in_flight) < max(args.workers, 1) * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                if pool:
+                    in_flight.append((len(chunk), pool.submit(simulate_records, args.scenario_type, chunk, args.max_points)))
+                else:
+                    in_flight.append((len(chunk), simulate_records(args.scenario_type, chunk, args.max_points)))
+            if not in_flight:
+                break
+
+            size, pending = in_flight.popleft()
+            results = pending.result() if pool else pending
+            succeeded = [r for r in results if r["status"] == "success"]
+            writer.write(succeeded)
+            errors.write([r for r in results if r["status"] != "success"])
+
+            checkpoint["output_offset"] = writer.commit()
+            checkpoint["errors_offset"] = errors.commit()
+            checkpoint["records_done"] += size
+            checkpoint["succeeded"] += len(succeeded)
+            checkpoint["failed"] += size - len(succeeded)
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+            done_this_run += size
+            elapsed = time.perf_counter() - started
+            print(
+                f"{checkpoint['records_done']:,} records ({checkpoint['failed']:,} rejected), "
+                f"{done_this_run / elapsed:,.0f} records/s",
+                file=sys.stderr
+            )
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        writer.close()
+        errors.close()
+
+    return checkpoint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a CSV/JSONL file of scenarios in bulk.")
+    parser.add_argument("scenario_type", choices=sorted(SCENARIOS), help="Scenario every record is an input of")
+    parser.add_argument("input", help="CSV or JSONL file of inputs")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="JSONL file, or a .parquet directory, to write results to")
+    target.add_argument("--db", action="store_true", help="Insert results into the scenario's table")
+    parser.add_argument("--errors", help="JSONL file for rejected records (default: INPUT.errors.jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Records per chunk (default: 500)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes; 0 runs inline")
+    parser.add_argument("--max-points", type=int, default=None, help="Downsample each chart_data to this many points")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: INPUT.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint of an interrupted run")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    checkpoint = run(args)
+    print(json.dumps({k: checkpoint[k] for k in ("records_done", "succeeded", "failed")}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
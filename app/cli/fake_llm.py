@@ -0,0 +1,106 @@
+"""
+Stand-in for the Gemini API, for load tests that must not spend tokens.
+
+Usage:
+    python -m app.cli.fake_llm [--port 8081] [--latency-ms 800] [--jitter-ms 400]
+        [--error-rate 0.02] [--error-status 503] [--output-tokens 250]
+
+Serves the REST countTokens and generateContent methods the Gemini SDK calls, with a
+configurable response latency (latency plus uniform jitter) and a fraction of requests
+that fail (503 by default, which the SDK retries; 500 is not retried). Point the API at it with:
+
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8081 GEMINI_API_KEY=fake uvicorn app.main:app
+
+Token counts are estimated as one token per four characters of the prompt.
+"""
+import sys
+import random
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+
+SENTENCE = (
+    "Your projected cash flow stays positive in most months, but the largest outflow is worth "
+    "reviewing before committing to new obligations. "
+)
+
+ERROR_STATUSES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def _prompt_text(body: dict) -> str:
+    # countTokens wraps the contents in a generateContentRequest
+    body = body.get("generateContentRequest", body)
+    return " ".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def create_app(latency_ms: float, jitter_ms: float, error_rate: float, output_tokens: int, error_status: int = 503) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    stats = {"count_tokens": 0, "generate": 0, "errors": 0}
+
+    @app.post("/v1beta/models/{model}:countTokens")
+    async def count_tokens(model: str, request: Request):
+        stats["count_tokens"] += 1
+        return {"totalTokens": max(1, len(_prompt_text(await request.json())) // 4)}
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request):
+        body = await request.json()
+        stats["generate"] += 1
+        await asyncio.sleep((latency_ms + random.uniform(0, jitter_ms)) / 1000)
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return ORJSONResponse(
+                {"error": {"code": error_status, "message": "Injected failure.", "status": ERROR_STATUSES[error_status]}},
+                status_code=error_status
+            )
+
+        limit = body.get("generationConfig", {}).get("maxOutputTokens") or output_tokens
+        tokens = min(output_tokens, limit)
+        # About 25 tokens per sentence
+        text = SENTENCE * max(1, tokens // 25)
+        prompt_tokens = max(1, len(_prompt_text(body)) // 4)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": tokens,
+                "totalTokenCount": prompt_tokens + tokens
+            }
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Gemini REST API with configurable latency and errors.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=800, help="Minimum generation latency (default: 800)")
+    parser.add_argument("--jitter-ms", type=float, default=400, help="Uniform random latency added on top (default: 400)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of generations that fail with 503")
+    parser.add_argument("--error-status", type=int, default=503, choices=sorted(ERROR_STATUSES), help="HTTP status of failures")
+    parser.add_argument("--output-tokens", type=int, default=250, help="Tokens per generated answer (default: 250)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.output_tokens, args.error_status)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
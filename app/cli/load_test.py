@@ -0,0 +1,378 @@
+"""
+Load-test a running API with a weighted mix of simulation, save and AI requests.
+
+Usage:
+    python -m app.cli.load_test run [--base-url http://127.0.0.1:8000] [--duration 60]
+        [--warmup 5] [--concurrency 32] [--mix simulate=70,save=10,ai=20]
+        [--scenarios budget-optimization,debt-management,wealth-building]
+        [--distinct-inputs 50] [--seed 1] [--label NAME] [--output report.json]
+    python -m app.cli.load_test compare BASELINE.json CANDIDATE.json
+
+`run` keeps --concurrency requests in flight for --duration seconds (closed loop), so
+throughput at the point where latency takes off is the ceiling of the configuration
+under test. Each request picks a kind from --mix and a scenario type at random:
+
+    simulate  POST /simulate/<scenario>
+    save      POST /<scenario>/save (also queues the AI background jobs)
+    ai        GET /<scenario>/ai-explanation or /<scenario>/ai-suggestions
+
+Inputs are drawn from a pool of --distinct-inputs variants per scenario type, so the
+caches and request coalescing see a realistic amount of repetition. Requests of the
+first --warmup seconds are not counted. The JSON report holds the configuration,
+throughput, p50/p95/p99 latency and error rates per endpoint, and the server's own
+metrics at the end of the run; `compare` diffs two of them, e.g. runs against
+different worker counts.
+
+Run the API against the fake LLM (python -m app.cli.fake_llm) so AI requests don't
+spend tokens, and with AI_RATE_LIMIT_PER_MINUTE=0, or every AI request beyond the
+per-client burst is rejected with 429.
+"""
+import sys
+import copy
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from collections import Counter
+
+import httpx
+import numpy as np
+
+SAMPLE_INPUTS = {
+    "budget-optimization": {
+        "projection_months": 12,
+        "income": {"monthly_gross_income": 50000, "other_monthly_income": 5000},
+        "expenses": {
+            "fixed_needs": {"rent": 10000, "utilities": 3000, "groceries": 8000},
+            "variable_needs": {"household_supplies": 1000},
+            "wants_discretionary": {"dining_out": 4000, "shopping_leisure": 2500}
+        },
+        "savings_goals": {"target_monthly_savings": 5000, "emergency_fund_target": 60000},
+        "what_if_factors": {"income_growth_rate": 0.01, "wants_reduction_rate": 0.05, "savings_increase_rate": 0.0}
+    },
+    "debt-management": {
+        "projection_period": 24,
+        "loans": [{
+            "loan_name": "Bank loan", "principal_amount": 200000, "outstanding_balance": 150000,
+            "annual_interest_rate": 12, "monthly_payment": 9000, "remaining_term_months": 24
+        }],
+        "business_financials": {
+            "avg_monthly_revenue": 120000, "avg_monthly_operating_expenses": 95000, "current_cash_reserves": 30000
+        },
+        "growth_needs": {"capital_required": 100000, "expected_roi": 15},
+        "proposed_financing": {"proposed_loan_amount": 100000, "proposed_annual_interest_rate": 10, "proposed_loan_term": 36},
+        "reinvestment_rate": 0.1
+    },
+    "wealth-building": {
+        "goal_name": "Retirement", "current_age": 30, "target_age": 60, "target_amount": 5000000,
+        "current_savings": 100000, "monthly_contribution": 5000, "annual_contribution_increase": 0.03,
+        "expected_annual_return": 0.07, "inflation_rate": 0.035, "advisor_fee_percent": 1
+    }
+}
+
+# Numbers under keys containing these are ages, horizons, rates or terms and are kept as is
+UNSCALED = ("age", "month", "period", "term", "rate", "roi", "percent")
+
+REQUEST_KINDS = ("simulate", "save", "ai")
+AI_ROUTES = ("ai-explanation", "ai-suggestions")
+# Server metrics captured at the end of a run
+SERVER_METRICS = ("simulation-pool", "single-flight", "ai-cache", "ai-admission")
+
+REPORT_VERSION = 1
+
+
+def _scaled(value, factor: float, key: str = ""):
+    """Copy of an input with every money amount multiplied by `factor`."""
+    if isinstance(value, dict):
+        return {k: _scaled(v, factor, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_scaled(v, factor, key) for v in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and not any(u in key for u in UNSCALED):
+        return round(value * factor, 2)
+    return copy.deepcopy(value)
+
+
+def input_pool(scenario_type: str, size: int, rng: random.Random) -> list:
+    base = SAMPLE_INPUTS[scenario_type]
+    return [base] + [_scaled(base, rng.uniform(0.8, 1.2)) for _ in range(max(size, 1) - 1)]
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown request kind {kind!r}; use {', '.join(REQUEST_KINDS)}")
+        try:
+            mix[kind] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Weight of {kind!r} must be a number")
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+class TrafficPlan:
+    """Draws the next request of the mix: (endpoint label, method, path, JSON body)."""
+
+    def __init__(self, mix: dict, scenarios: list, distinct_inputs: int, seed: int):
+        self.rng = random.Random(seed)
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.scenarios = scenarios
+        self.inputs = {s: input_pool(s, distinct_inputs, self.rng) for s in scenarios}
+
+    def next_request(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        scenario = self.rng.choice(self.scenarios)
+        if kind == "simulate":
+            path = f"/simulate/{scenario}"
+            return f"POST {path}", "POST", path, self.rng.choice(self.inputs[scenario])
+        if kind == "save":
+            path = f"/{scenario}/save"
+            return f"POST {path}", "POST", path, self.rng.choice(self.inputs[scenario])
+        path = f"/{scenario}/{self.rng.choice(AI_ROUTES)}"
+        return f"GET {path}", "GET", path, None
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints = {}
+
+    def record(self, endpoint: str, seconds: float, status, fallback: bool = False):
+        stats = self.endpoints.setdefault(endpoint, {"latencies": [], "statuses": Counter(), "fallbacks": 0})
+        stats["latencies"].append(seconds * 1000)
+        stats["statuses"][str(status)] += 1
+        stats["fallbacks"] += fallback
+
+
+def _is_error(status: str) -> bool:
+    # Anything that isn't an HTTP status (timeouts, refused connections) is an error too
+    return not status.isdigit() or int(status) >= 400
+
+
+def _latency_summary(latencies: list) -> dict:
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    values = np.asarray(latencies)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "max_ms": round(float(values.max()), 2)
+    }
+
+
+def summarize(recorder: Recorder, seconds: float) -> dict:
+    endpoints = {}
+    for endpoint, stats in sorted(recorder.endpoints.items()):
+        count = len(stats["latencies"])
+        errors = sum(n for status, n in stats["statuses"].items() if _is_error(status))
+        endpoints[endpoint] = {
+            "requests": count,
+            "throughput_rps": round(count / seconds, 2),
+            **_latency_summary(stats["latencies"]),
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0,
+            "status_codes": dict(sorted(stats["statuses"].items())),
+            # AI answers served by the rule-based fallback instead of the LLM
+            **({"fallback_rate": round(stats["fallbacks"] / count, 4)} if endpoint.startswith("GET") and count else {})
+        }
+
+    latencies = [ms for stats in recorder.endpoints.values() for ms in stats["latencies"]]
+    errors = sum(e["errors"] for e in endpoints.values())
+    totals = {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / seconds, 2),
+        **_latency_summary(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0
+    }
+    return {"totals": totals, "endpoints": endpoints}
+
+
+async def _send(client, plan: TrafficPlan, recorder: Recorder, count_from: float):
+    endpoint, method, path, body = plan.next_request()
+    started = time.perf_counter()
+    fallback = False
+    try:
+        response = await client.request(method, path, json=body)
+        status = response.status_code
+        if method == "GET" and status == 200:
+            fallback = bool(response.json().get("data", {}).get("fallback"))
+    except Exception as e:
+        status = type(e).__name__
+    if started >= count_from:
+        recorder.record(endpoint, time.perf_counter() - started, status, fallback)
+
+
+async def _worker(client, plan: TrafficPlan, recorder: Recorder, count_from: float, stop_at: float):
+    while time.perf_counter() < stop_at:
+        await _send(client, plan, recorder, count_from)
+
+
+async def _prepare(client, plan: TrafficPlan):
+    """Fail fast if the API is down, and save a scenario of each type for the AI routes."""
+    response = await client.get("/metrics/simulation-pool")
+    response.raise_for_status()
+    if "ai" in plan.kinds:
+        for scenario in plan.scenarios:
+            response = await client.post(f"/{scenario}/save", json=SAMPLE_INPUTS[scenario])
+            response.raise_for_status()
+
+
+async def _server_metrics(client) -> dict:
+    metrics = {}
+    for name in SERVER_METRICS:
+        try:
+            response = await client.get(f"/metrics/{name}")
+            metrics[name] = response.json().get("data") if response.status_code == 200 else None
+        except Exception:
+            metrics[name] = None
+    return metrics
+
+
+async def run_load(args) -> dict:
+    plan = TrafficPlan(args.mix, args.scenarios, args.distinct_inputs, args.seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        await _prepare(client, plan)
+
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        count_from = start + args.warmup
+        stop_at = count_from + args.duration
+        await asyncio.gather(*(
+            _worker(client, plan, recorder, count_from, stop_at) for _ in range(args.concurrency)
+        ))
+        # In-flight requests finish after stop_at; they are counted, so measure to the end
+        measured = time.perf_counter() - count_from
+        server_metrics = await _server_metrics(client)
+
+    return {
+        "report_version": REPORT_VERSION,
+        "label": args.label,
+        "started_at": started_at.isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "scenarios": args.scenarios,
+            "distinct_inputs": args.distinct_inputs,
+            "seed": args.seed,
+            "timeout_s": args.timeout
+        },
+        "measured_s": round(measured, 3),
+        **summarize(recorder, measured),
+        "server_metrics": server_metrics
+    }
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:,.1f}"
+
+
+def print_report(report: dict, out=sys.stdout):
+    print(f"{'endpoint':<45} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}", file=out)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["totals"])]
+    for endpoint, e in rows:
+        print(
+            f"{endpoint:<45} {e['throughput_rps']:>8,.1f} {_ms(e['p50_ms']):>9} {_ms(e['p95_ms']):>9} "
+            f"{_ms(e['p99_ms']):>9} {e['error_rate']:>7.1%}",
+            file=out
+        )
+
+
+def _change(old, new) -> str:
+    if old is None or new is None:
+        return "-"
+    if not old:
+        return "new" if new else "0"
+    return f"{(new - old) / old:+.0%}"
+
+
+def compare_reports(baseline: dict, candidate: dict, out=sys.stdout):
+    """Print throughput, tail latency and error rate of two reports side by side."""
+    print(f"baseline:  {baseline.get('label') or '-'} ({baseline['started_at']})", file=out)
+    print(f"candidate: {candidate.get('label') or '-'} ({candidate['started_at']})", file=out)
+    changed = {
+        k: (baseline["config"].get(k), v) for k, v in candidate["config"].items() if baseline["config"].get(k) != v
+    }
+    for key, (old, new) in changed.items():
+        print(f"config {key}: {old} -> {new}", file=out)
+    print(file=out)
+    print(f"{'endpoint':<45} {'req/s':>22} {'p95 ms':>26} {'p99 ms':>26} {'errors':>18}", file=out)
+
+    endpoints = sorted(set(baseline["endpoints"]) | set(candidate["endpoints"]))
+    rows = [(e, baseline["endpoints"].get(e), candidate["endpoints"].get(e)) for e in endpoints]
+    rows.append(("TOTAL", baseline["totals"], candidate["totals"]))
+    for endpoint, old, new in rows:
+        old, new = old or {}, new or {}
+        cells = []
+        for field, width in (("throughput_rps", 22), ("p95_ms", 26), ("p99_ms", 26)):
+            a, b = old.get(field), new.get(field)
+            cells.append(f"{_ms(a) + ' -> ' + _ms(b) + ' ' + _change(a, b):>{width}}")
+        errors = f"{old.get('error_rate', 0):.1%} -> {new.get('error_rate', 0):.1%}"
+        print(f"{endpoint:<45} {' '.join(cells)} {errors:>18}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running API and compare runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Generate load and write a JSON report")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000", help="API under test")
+    run.add_argument("--duration", type=float, default=60, help="Seconds of measured load (default: 60)")
+    run.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring (default: 5)")
+    run.add_argument("--concurrency", type=int, default=32, help="Requests kept in flight (default: 32)")
+    run.add_argument("--mix", type=parse_mix, default=parse_mix("simulate=70,save=10,ai=20"),
+                     help="Weights of the request kinds (default: simulate=70,save=10,ai=20)")
+    run.add_argument("--scenarios", type=lambda text: [s.strip() for s in text.split(",")],
+                     default=list(SAMPLE_INPUTS), help="Comma-separated scenario types (default: all)")
+    run.add_argument("--distinct-inputs", type=int, default=50, help="Input variants per scenario type (default: 50)")
+    run.add_argument("--seed", type=int, default=1, help="Seed of the inputs and the request sequence")
+    run.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds (default: 30)")
+    run.add_argument("--label", help="Name of the configuration under test, e.g. 'workers=4'")
+    run.add_argument("--output", help="Write the JSON report here")
+
+    compare = commands.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        compare_reports(baseline, candidate)
+        return 0
+
+    unknown = [s for s in args.scenarios if s not in SAMPLE_INPUTS]
+    if unknown:
+        parser.error(f"Unknown scenario types: {', '.join(unknown)}")
+    if args.concurrency < 1 or args.duration <= 0:
+        parser.error("--concurrency and --duration must be positive")
+
+    try:
+        report = asyncio.run(run_load(args))
+    except httpx.HTTPError as e:
+        print(f"API at {args.base_url} is not usable: {e!r}", file=sys.stderr)
+        return 1
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Report cold-start cost of the API, broken down by module import time.
+
+Usage:
+    python -m app.cli.startup_report [--module app.main] [--top 20] [--json] [--max-ms 1500]
+
+Runs the import in a fresh interpreter with `-X importtime`, so the numbers are a true
+cold start. With --max-ms the command exits non-zero when the total exceeds the budget,
+which makes it usable as a CI gate.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+
+def measure_startup(module: str, env: dict = None) -> dict:
+    """Import `module` in a fresh interpreter and collect per-module import times."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})}
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+
+    target = next((m for m in modules if m["module"] == module), None)
+    return {
+        "module": module,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": target["cumulative_ms"] if target else None,
+        "modules": modules
+    }
+
+
+def top_level_costs(modules: list, limit: int) -> list:
+    """Most expensive top-level packages, by the largest cumulative time of any of their modules."""
+    costs = {}
+    for m in modules:
+        package = m["module"].split(".")[0]
+        costs[package] = max(costs.get(package, 0), m["cumulative_ms"])
+    ranked = sorted(costs.items(), key=lambda item: item[1], reverse=True)
+    return [{"package": name, "cumulative_ms": round(ms, 1)} for name, ms in ranked[:limit]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure API cold-start import cost.")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the import takes longer than this")
+    args = parser.parse_args(argv)
+
+    report = measure_startup(args.module)
+    report["packages"] = top_level_costs(report["modules"], args.top)
+    report["slowest_modules"] = sorted(report["modules"], key=lambda m: m["self_ms"], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps({k: v for k, v in report.items() if k != "modules"}, indent=2))
+    else:
+        print(f"Cold start of {report['module']}: {report['import_ms']:.1f} ms import, {report['wall_ms']:.1f} ms wall")
+        print("\nSlowest packages (cumulative):")
+        for p in report["packages"]:
+            print(f"  {p['cumulative_ms']:>9.1f} ms  {p['package']}")
+        print("\nSlowest modules (self):")
+        for m in report["slowest_modules"]:
+            print(f"  {m['self_ms']:>9.1f} ms  {m['module']}")
+
+    if args.max_ms is not None and report["import_ms"] is not None and report["import_ms"] > args.max_ms:
+        print(f"\nStartup budget exceeded: {report['import_ms']:.1f} ms > {args.max_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
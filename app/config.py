@@ -0,0 +1,10 @@
+import os
+from dotenv import load_dotenv
+
+# Load .env once for the whole app; modules that read settings at import time import this first
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Skip schema creation on startup when migrations are managed outside the app
+FAST_BOOT = os.getenv("FAST_BOOT", "false").lower() in ("1", "true", "yes")
@@ -1,3 +1,4 @@
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel
 from app.db.session import engine
 
@@ -6,4 +7,26 @@ def init_db():
     """
     Initialize the database by creating all tables defined in SQLModel models
     """
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns():
+    """
+    Add nullable columns (and their indexes) that models gained after their table was created.
+
+    create_all only creates missing tables, so e.g. engine_version would otherwise never
+    reach a database created before it existed.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = [column for column in table.columns if column.name not in existing and column.nullable]
+            for column in added:
+                column_type = column.type.compile(engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            indexed = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexed and any(column.name not in existing for column in index.columns):
+                    index.create(connection)
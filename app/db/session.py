@@ -1,10 +1,7 @@
 from sqlmodel import SQLModel, create_engine, Session
-from dotenv import load_dotenv
-import os
 
-load_dotenv()
+from app.config import DATABASE_URL
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 engine = create_engine(DATABASE_URL, echo=True)
 
 def get_session():
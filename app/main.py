@@ -1,15 +1,28 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.config import FAST_BOOT
 from app.db.base import init_db
 from app.api.routes import (
     simulate_budget_optimization,
     simulate_debt_management,
-    simulate_wealth_building
+    simulate_wealth_building,
+    compare,
+    export,
+    background_jobs,
+    metrics
 )
+from app.services.background_jobs import resume_pending_jobs, shutdown_background_jobs
+from app.services.ai_explainer import shutdown_llm_executor
+from app.services.simulation_pool import start_simulation_pool, shutdown_simulation_pool
+from app.services.factor_tables import warm_factor_tables
+from app.services.tracing import setup_tracing, shutdown_tracing
+from app.services.llm_usage import llm_usage
 
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI()
+# orjson is several times faster than the stdlib encoder for large chart_data payloads
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 # Middleware for CORS
@@ -19,13 +32,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read ETags to revalidate simulation results, and trace ids
+    expose_headers=["ETag", "traceparent"],
 )
 
+# Spans for requests, validation, simulators, queries and LLM calls when TRACING_EXPORTER is set
+setup_tracing(app)
+
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    # Fast-boot workers leave schema creation to external migrations
+    # and job recovery to a regular worker, and spawn the simulation pool
+    # on the first long simulation instead of at startup
+    if not FAST_BOOT:
+        init_db()
+        resume_pending_jobs()
+        start_simulation_pool()
+    warm_factor_tables()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # Queued jobs stay queued in the database and resume on the next start
+    shutdown_background_jobs()
+    shutdown_llm_executor()
+    shutdown_simulation_pool()
+    # Write usage counted since the last periodic flush
+    llm_usage.flush()
+    shutdown_tracing()
+
 
 app.include_router(simulate_budget_optimization.router, tags=["Budget Optimization"])
 app.include_router(simulate_debt_management.router, tags=["Debt Management"])
-app.include_router(simulate_wealth_building.router, tags=["Wealth Building"])
\ No newline at end of file
+app.include_router(simulate_wealth_building.router, tags=["Wealth Building"])
+app.include_router(compare.router, tags=["Scenario Comparison"])
+app.include_router(export.router, tags=["Report Export"])
+app.include_router(background_jobs.router, tags=["Background Jobs"])
+app.include_router(metrics.router, tags=["Metrics"])
\ No newline at end of file
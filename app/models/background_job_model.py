@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field, JSON, Column
+from typing import Optional
+from datetime import datetime
+
+class BackgroundJobModel(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_type: str = Field(index=True)
+    scenario_type: str = Field(index=True)
+    scenario_id: Optional[int] = Field(default=None, index=True)
+    status: str = Field(default="queued")
+
+    result: dict = Field(default={}, sa_column=Column(JSON))
+    error: Optional[str] = Field(default=None)
+    # Revision (http_cache.scenario_version) of the scenario the AI text was generated from
+    scenario_version: Optional[str] = Field(default=None)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default=None)
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, JSON, Column
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 class BudgetOptimizationModel(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -13,11 +13,17 @@ class BudgetOptimizationModel(SQLModel, table=True):
     expenses: dict = Field(default={}, sa_column=Column(JSON))
     savings_goals: dict = Field(default={}, sa_column=Column(JSON))
     what_if_factors: dict = Field(default={}, sa_column=Column(JSON))
+    # Calendar of a daily projection; None if saved before daily resolution existed (monthly)
+    resolution: Optional[str] = Field(default="monthly")
+    start_date: Optional[date] = Field(default=None)
+    opening_balance: Optional[float] = Field(default=0)
 
     # Simulation Results
     chart_data: list = Field(default=[], sa_column=Column(JSON))
     key_metrics: dict = Field(default={}, sa_column=Column(JSON))
     insight: str = Field(default="")
+    # ENGINE_VERSION of the simulator that produced the results; None if saved before versioning
+    engine_version: Optional[str] = Field(default=None, index=True)
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": "NOW()"})
\ No newline at end of file
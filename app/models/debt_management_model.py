@@ -13,6 +13,15 @@ class DebtManagementModel(SQLModel, table=True):
     growth_needs: dict = Field(default={}, sa_column=Column(JSON))
     proposed_financing: dict = Field(default={}, sa_column=Column(JSON))
     reinvestment_rate: Optional[float] = Field(default=0)
+    # Periods of chart_data; None if saved before granularity existed (monthly)
+    granularity: Optional[str] = Field(default="monthly")
+
+    # Simulation Results
+    chart_data: list = Field(default=[], sa_column=Column(JSON))
+    key_metrics: dict = Field(default={}, sa_column=Column(JSON))
+    insight: Optional[str] = Field(default=None)
+    # ENGINE_VERSION of the simulator that produced the results; None if saved before versioning
+    engine_version: Optional[str] = Field(default=None, index=True)
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel, Field, JSON, Column
+from typing import Optional
+from datetime import datetime
+
+# LLM calls of one route and prompt version, aggregated per hour
+class LLMUsageModel(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    period_start: datetime = Field(index=True)
+    route: str = Field(index=True)
+    prompt_version: str = Field(default="")
+
+    calls: int = Field(default=0)
+    cache_hits: int = Field(default=0)
+    failures: int = Field(default=0)
+    deadline_misses: int = Field(default=0)
+    latency_ms_total: float = Field(default=0)
+    latency_ms_max: float = Field(default=0)
+    latency_histogram: list = Field(default=[], sa_column=Column(JSON))
+
+    generations: int = Field(default=0)
+    generation_failures: int = Field(default=0)
+    prompt_tokens: int = Field(default=0)
+    output_tokens: int = Field(default=0)
+    generation_ms_total: float = Field(default=0)
+
+    updated_at: Optional[datetime] = Field(default=None)
@@ -16,9 +16,11 @@ class WealthBuildingModel(SQLModel, table=True):
     risk_profile: Optional[str] = Field(default="Moderate")
     advisor_fee_percent: Optional[float] = Field(default=0)
 
-    chart_data: dict = Field(default={}, sa_column=Column(JSON))
+    chart_data: list = Field(default=[], sa_column=Column(JSON))
     key_metrics: dict = Field(default={}, sa_column=Column(JSON))
     insight: Optional[str] = Field(default=None)
+    # ENGINE_VERSION of the simulator that produced the results; None if saved before versioning
+    engine_version: Optional[str] = Field(default=None, index=True)
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+class ResimulateInput(BaseModel):
+    scenario_types: List[Literal["budget-optimization", "debt-management", "wealth-building"]] = Field(
+        ["budget-optimization", "debt-management", "wealth-building"],
+        min_length=1,
+        description="Scenario tables to re-simulate"
+    )
+    force: bool = Field(False, description="Re-simulate every row, not only rows from an older engine version")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Literal
+from datetime import date
 
 class IncomeDetails(BaseModel):
     monthly_gross_income: float = Field(..., description="Take-home pay after taxes and deductions")
@@ -51,4 +52,49 @@ class BudgetOptimizationInput(BaseModel):
     income: IncomeDetails
     expenses: Expenses
     savings_goals: SavingsGoals
-    what_if_factors: Optional[WhatIfFactors] = Field(None, description="Optional 'what-if' percentage adjustments for the simulation")
\ No newline at end of file
+    what_if_factors: Optional[WhatIfFactors] = Field(None, description="Optional 'what-if' percentage adjustments for the simulation")
+    resolution: Literal["monthly", "daily"] = Field("monthly", description="'daily' schedules paydays (per income_frequency) and bills on the calendar and rolls them up to months")
+    start_date: Optional[date] = Field(None, description="First month of a daily projection (defaults to the current month)")
+    opening_balance: Optional[float] = Field(0, description="Cash on hand at the start of a daily projection")
+    include_daily_series: bool = Field(False, description="Also return the day-by-day inflow, outflow and balance (daily resolution only)")
+
+# Response models: document the simulation output; routes return pre-shaped results as-is
+class BudgetChartRow(BaseModel):
+    month: int
+    total_income: float
+    fixed_expenses: float
+    variable_expenses: float
+    wants_expenses: float
+    net_cash_flow: float
+    cumulative_savings: float
+    cumulative_deficit: float
+    min_balance: Optional[float] = Field(None, description="Lowest daily balance in the month (daily resolution only)")
+    min_balance_date: Optional[date] = None
+    days_negative: Optional[int] = None
+
+class BudgetKeyMetrics(BaseModel):
+    avg_net_cash_flow: float
+    discretionary_spending_percent: float
+    total_discretionary_spending: float
+    highest_discretionary_category: Optional[str]
+    projected_emergency_fund_months: Optional[float] = Field(None, description="null when no monthly savings are planned")
+    lowest_balance: Optional[float] = None
+    days_negative: Optional[int] = None
+
+class BudgetDailySeries(BaseModel):
+    dates: List[date]
+    inflow: List[float]
+    outflow: List[float]
+    balance: List[float]
+
+class BudgetOptimizationResult(BaseModel):
+    inputs_received: dict
+    chart_data: List[BudgetChartRow]
+    key_metrics: BudgetKeyMetrics
+    insight: str
+    show_my_math: List[str]
+    daily_series: Optional[BudgetDailySeries] = None
+
+class BudgetOptimizationResponse(BaseModel):
+    status: str
+    data: BudgetOptimizationResult
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class ScenarioOverride(BaseModel):
+    label: Optional[str] = Field(None, description="Name shown for this variant (e.g., 'Higher contribution')")
+    changes: dict = Field(..., description="Fields to change on the base input; nested objects are merged, lists are replaced")
+
+class CompareInput(BaseModel):
+    base: dict = Field(..., description="Base simulation input for the scenario type")
+    overrides: List[ScenarioOverride] = Field(..., min_length=1, max_length=10, description="Variants to compare against the base")
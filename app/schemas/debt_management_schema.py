@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 class LoanDetails(BaseModel):
     loan_name: str = Field(..., description="Name or type of the loan")
@@ -26,9 +26,59 @@ class ProposedFinancing(BaseModel):
 class DebtManagementInput(BaseModel):
     scenario_type: str = Field("debt_management", description="Type of scenario")
     user_type: str = Field("msme", description="User type")
-    projection_period: int = Field(..., description="Number of months/quarters for projection")
+    projection_period: int = Field(..., description="Number of months for projection")
     loans: List[LoanDetails]
     business_financials: BusinessFinancials
     growth_needs: GrowthNeeds
     proposed_financing: ProposedFinancing
-    reinvestment_rate: Optional[float] = Field(0, description="Percentage of net income to reinvest into the business")
\ No newline at end of file
+    reinvestment_rate: Optional[float] = Field(0, description="Percentage of net income to reinvest into the business")
+    granularity: Literal["monthly", "quarterly", "annual"] = Field("monthly", description="Periods of chart_data: the projection runs monthly, and quarters or years sum its flows and take the cash position at their start and end")
+
+# Stress test: the same scenario over many random revenue and expense paths
+class StressAssumptions(BaseModel):
+    paths: int = Field(2000, ge=100, le=50000, description="Number of simulated paths")
+    revenue_volatility: float = Field(0.15, ge=0, le=2, description="Monthly volatility of revenue (lognormal sigma)")
+    expense_volatility: float = Field(0.05, ge=0, le=2, description="Monthly volatility of operating expenses (lognormal sigma)")
+    revenue_expense_correlation: float = Field(0.3, ge=-1, le=1, description="Correlation of revenue and expense shocks")
+    seasonality: Optional[List[float]] = Field(
+        None, min_length=12, max_length=12, description="Revenue multiplier per month of the year, from period 1 (normalized to mean 1)"
+    )
+    downturn_probability: float = Field(0.02, ge=0, le=1, description="Monthly probability that a downturn starts")
+    downturn_revenue_drop: float = Field(0.3, ge=0, le=1, description="Share of revenue lost during a downturn")
+    downturn_months: int = Field(6, ge=1, description="Length of a downturn in months")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed, for reproducible results")
+
+class DebtStressTestInput(DebtManagementInput):
+    projection_period: int = Field(..., ge=1, le=600, description="Number of months for projection")
+    granularity: Literal["monthly"] = Field("monthly", description="Stress tests report monthly periods")
+    stress: StressAssumptions = Field(default_factory=StressAssumptions)
+
+# Response models: document the simulation output; routes return pre-shaped results as-is
+class DebtChartRow(BaseModel):
+    period: int
+    starting_cash: float
+    revenue: float
+    operating_expenses: float
+    loan_interest_payments: float
+    loan_principal_payments: float
+    net_operating_cash_flow: float
+    net_cash_position: float
+    end_month: Optional[int] = Field(None, description="Last month of the period (quarterly and annual granularity only)")
+
+class DebtKeyMetrics(BaseModel):
+    total_interest_paid: float
+    total_principal_paid: float
+    ending_cash_position: float
+    capital_required: float
+    expected_roi: Optional[float]
+
+class DebtManagementResult(BaseModel):
+    inputs_received: dict
+    chart_data: List[DebtChartRow]
+    key_metrics: DebtKeyMetrics
+    insight: str
+    show_my_math: List[str]
+
+class DebtManagementResponse(BaseModel):
+    status: str
+    data: DebtManagementResult
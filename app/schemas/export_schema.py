@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+class BulkExportInput(BaseModel):
+    scenario_ids: List[int] = Field(..., min_length=1, max_length=1000, description="Stored scenarios to include in the ZIP")
+    format: Literal["pdf", "csv", "xlsx"] = Field("pdf", description="Report format of every file in the ZIP")
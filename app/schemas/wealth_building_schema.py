@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Dict, Literal
 
 class WealthBuildingInput(BaseModel):
     goal_name: str = Field(..., description="Name of the financial goal (e.g., Retirement, Education, House Down Payment)")
@@ -12,4 +12,61 @@ class WealthBuildingInput(BaseModel):
     expected_annual_return: Optional[float] = Field(0.07, description="Expected annual investment return (%)")
     inflation_rate: Optional[float] = Field(0.035, description="Inflation rate (%)")
     risk_profile: Optional[str] = Field("Moderate", description="Investment portfolio risk profile")
-    advisor_fee_percent: Optional[float] = Field(0, description="Advisor fee as percent of assets under management")
\ No newline at end of file
+    advisor_fee_percent: Optional[float] = Field(0, description="Advisor fee as percent of assets under management")
+
+# Response models: document the simulation output; routes return pre-shaped results as-is
+class WealthChartRow(BaseModel):
+    year: int
+    cumulative_contributions: float
+    cumulative_investment_growth: float
+    total_value: float
+    inflation_adjusted_target: float
+
+class WealthKeyMetrics(BaseModel):
+    projected_final_value_nominal: float
+    projected_final_value_real: float
+    total_shortfall_real: float
+    required_monthly_contribution: Optional[float]
+    required_annual_return: Optional[float]
+
+class WealthBuildingResult(BaseModel):
+    inputs_received: dict
+    chart_data: List[WealthChartRow]
+    key_metrics: WealthKeyMetrics
+    insight: str
+    show_my_math: List[str]
+
+class WealthBuildingResponse(BaseModel):
+    status: str
+    data: WealthBuildingResult
+
+
+# Sensitivity (tornado) analysis: each assumption moved down and up around the base case
+SensitivityInputName = Literal[
+    "expected_annual_return", "inflation_rate", "annual_contribution_increase", "advisor_fee_percent", "monthly_contribution"
+]
+
+class WealthSensitivityInput(WealthBuildingInput):
+    steps: Optional[Dict[SensitivityInputName, float]] = Field(
+        None, description="Step per input; a fraction of the base for monthly_contribution, an absolute change otherwise"
+    )
+
+
+# Household plan: several goals sharing one age timeline and inflation assumption
+class HouseholdGoal(BaseModel):
+    goal_name: str = Field(..., description="Name of the goal (e.g., Retirement, Education, House Down Payment)")
+    target_age: int = Field(..., description="Age of the client when the goal is due")
+    target_amount: float = Field(..., description="Financial value needed for the goal")
+    current_savings: float = Field(0, description="Amount already accumulated for the goal")
+    monthly_contribution: float = Field(0, description="Current monthly contribution towards the goal")
+    annual_contribution_increase: Optional[float] = Field(0, description="Annual increase in contribution (%)")
+    expected_annual_return: Optional[float] = Field(None, description="Overrides the household's expected return for this goal")
+    priority: Optional[int] = Field(1, ge=1, description="Funding priority when allocating a budget (1 = funded first)")
+
+class HouseholdPlanInput(BaseModel):
+    current_age: int = Field(..., description="Current age of the client")
+    goals: List[HouseholdGoal] = Field(..., min_length=1, max_length=20)
+    inflation_rate: Optional[float] = Field(0.035, description="Inflation rate (%)")
+    expected_annual_return: Optional[float] = Field(0.07, description="Expected annual investment return (%)")
+    advisor_fee_percent: Optional[float] = Field(0, description="Advisor fee as percent of assets under management")
+    monthly_budget: Optional[float] = Field(None, ge=0, description="Total monthly amount to allocate across goals")
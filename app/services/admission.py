@@ -0,0 +1,152 @@
+import os
+import time
+import math
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, Request, status
+
+import app.config
+
+# Admission control for the LLM-backed routes. Requests beyond the concurrency limit
+# wait in a bounded queue on the event loop (not in a worker thread), so a spike of
+# AI traffic can't exhaust the threadpool the simulation routes also run on.
+AI_MAX_CONCURRENT = int(os.getenv("AI_MAX_CONCURRENT", "4"))
+AI_MAX_QUEUE_DEPTH = int(os.getenv("AI_MAX_QUEUE_DEPTH", "16"))
+AI_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("AI_MAX_QUEUE_WAIT_SECONDS", "5"))
+AI_RATE_LIMIT_PER_MINUTE = float(os.getenv("AI_RATE_LIMIT_PER_MINUTE", "30"))
+AI_RATE_LIMIT_BURST = int(os.getenv("AI_RATE_LIMIT_BURST", "10"))
+MAX_TRACKED_CLIENTS = 10000
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets refilled at a steady rate."""
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str):
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        if self.rate <= 0:
+            return True, 0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+
+        return allowed, 0 if allowed else (1 - tokens) / self.rate
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and fast rejection once it's full."""
+
+    def __init__(self, max_concurrent: int, max_queue_depth: int, max_queue_wait: float, limiter: TokenBucketLimiter):
+        self.max_concurrent = max_concurrent
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_wait = max_queue_wait
+        self.limiter = limiter
+        self._semaphore = None
+        self._loop = None
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self.total_queue_wait = 0.0
+        self.max_observed_queue_wait = 0.0
+        # Moving average of how long an admitted request holds its slot, for Retry-After
+        self.avg_service_time = 1.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+
+    def _retry_after(self) -> int:
+        backlog = (self.queued + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(backlog * self.avg_service_time))
+
+    def _reject(self, reason: str, status_code: int, retry_after: float):
+        self.rejected[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"AI service is busy ({reason.replace('_', ' ')}). Please retry shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    async def acquire(self, client: str):
+        allowed, wait = self.limiter.take(client)
+        if not allowed:
+            self._reject("rate_limited", status.HTTP_429_TOO_MANY_REQUESTS, wait)
+
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.queued >= self.max_queue_depth:
+            self._reject("queue_full", status.HTTP_503_SERVICE_UNAVAILABLE, self._retry_after())
+
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout", status.HTTP_503_SERVICE_UNAVAILABLE, self._retry_after())
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        self.total_queue_wait += waited
+        self.max_observed_queue_wait = max(self.max_observed_queue_wait, waited)
+        self.admitted += 1
+        self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, admitted_at: float):
+        self.in_flight -= 1
+        self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * (time.monotonic() - admitted_at)
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue_depth": self.max_queue_depth,
+            "max_queue_wait_seconds": self.max_queue_wait,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_queue_wait_ms": round(self.total_queue_wait / self.admitted * 1000, 2) if self.admitted else 0,
+            "max_queue_wait_ms": round(self.max_observed_queue_wait * 1000, 2),
+            "avg_service_time_ms": round(self.avg_service_time * 1000, 2)
+        }
+
+
+ai_admission_controller = AdmissionController(
+    max_concurrent=AI_MAX_CONCURRENT,
+    max_queue_depth=AI_MAX_QUEUE_DEPTH,
+    max_queue_wait=AI_MAX_QUEUE_WAIT_SECONDS,
+    limiter=TokenBucketLimiter(AI_RATE_LIMIT_PER_MINUTE, AI_RATE_LIMIT_BURST)
+)
+
+
+@asynccontextmanager
+async def ai_slot(request: Request):
+    """Hold an AI slot for the body of the block; routes take it after their conditional checks."""
+    client = request.client.host if request.client else "unknown"
+    admitted_at = await ai_admission_controller.acquire(client)
+    try:
+        yield
+    finally:
+        ai_admission_controller.release(admitted_at)
@@ -1,27 +1,66 @@
 import os
-import google.generativeai as genai
+import time
+import hashlib
+import threading
 import logging
-from dotenv import load_dotenv
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
-# Load .env file
-load_dotenv()
+import app.config
+from app.services.single_flight import llm_flight
+from app.services.tracing import span, set_attributes
+from app.services.llm_usage import llm_usage
 
-# Get API key from environment variable
-api_key = os.getenv("GEMINI_API_KEY")
-
-# Configure Gemini with the key
-genai.configure(api_key=api_key)
-
-# Instantiate the model once
-model = genai.GenerativeModel('gemini-1.5-flash')
+MODEL_NAME = "gemini-1.5-flash"
 
 MAX_CONTEXT_TOKENS = 4096 
 MAX_OUTPUT_TOKENS = 1000
 MAX_SUGGESTION_TOKENS = 120
 
+# Latency budget for interactive AI requests before falling back to rule-based text
+AI_RESPONSE_BUDGET_SECONDS = float(os.getenv("AI_RESPONSE_BUDGET_SECONDS", "8"))
+AI_RESPONSE_CACHE_SIZE = int(os.getenv("AI_RESPONSE_CACHE_SIZE", "256"))
+AI_LLM_WORKERS = int(os.getenv("AI_LLM_WORKERS", "4"))
+# Longest a single LLM call may take, the SDK's retries included, so an unreachable
+# provider can't hold an LLM thread (or process exit) for minutes
+AI_LLM_TIMEOUT_SECONDS = float(os.getenv("AI_LLM_TIMEOUT_SECONDS", "30"))
+# Alternative Gemini REST endpoint, e.g. the fake server of app.cli.fake_llm for load tests
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The Gemini SDK is slow to import, so it's loaded and configured on first AI use
+_genai = None
+_model = None
+_request_options = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """Import, configure and instantiate the Gemini model once, on first use."""
+    global _genai, _model, _request_options
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+                from google.api_core.retry import Retry
+
+                # Configure Gemini with the API key from the environment
+                if GEMINI_API_ENDPOINT:
+                    genai.configure(
+                        api_key=os.getenv("GEMINI_API_KEY"),
+                        transport="rest",
+                        client_options={"api_endpoint": GEMINI_API_ENDPOINT}
+                    )
+                else:
+                    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                _genai = genai
+                _request_options = {"timeout": AI_LLM_TIMEOUT_SECONDS, "retry": Retry(timeout=AI_LLM_TIMEOUT_SECONDS)}
+                _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
 # UTILITIES
 def peso_wrap_prompt(prompt: str) -> str:
     """Ensure Philippine peso clarification is added."""
@@ -31,33 +70,182 @@ def peso_wrap_prompt(prompt: str) -> str:
         "not in US dollars or any other currency."
     )
 
-# AI response Settings
-def generate_response(prompt: str) -> str:
-    peso_prompt = peso_wrap_prompt(prompt)
-    
+# Completed responses keyed by prompt hash, so late LLM answers serve the next request
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"lookups": 0, "hits": 0}
+_llm_executor = ThreadPoolExecutor(max_workers=AI_LLM_WORKERS, thread_name_prefix="llm")
+
+
+def _prompt_key(peso_prompt: str) -> str:
+    return hashlib.sha256(peso_prompt.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str):
+    with _cache_lock:
+        _cache_stats["lookups"] += 1
+        text = _response_cache.get(key)
+        if text is not None:
+            _cache_stats["hits"] += 1
+            _response_cache.move_to_end(key)
+        return text
+
+
+def cache_stats() -> dict:
+    """Hit rate of the exact prompt-keyed response cache."""
+    with _cache_lock:
+        lookups, hits = _cache_stats["lookups"], _cache_stats["hits"]
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0,
+            "entries": len(_response_cache)
+        }
+
+
+def _cache_put(key: str, text: str):
+    with _cache_lock:
+        _response_cache[key] = text
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > AI_RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def _call_model(peso_prompt: str, usage: tuple) -> str:
+    """Call Gemini and return the generated text, raising on any failure."""
+    model = _get_model()
+    started = time.perf_counter()
+    tokens = {}
     try:
-        # Use the pre-instantiated model's token counter
-        prompt_tokens = model.count_tokens(peso_prompt).total_tokens
-        
+        # Use the model's token counter
+        with span("llm count_tokens", {"llm.model": MODEL_NAME}) as counted:
+            prompt_tokens = model.count_tokens(peso_prompt, request_options=_request_options).total_tokens
+            set_attributes(counted, {"llm.prompt_tokens": prompt_tokens})
+
         available = MAX_CONTEXT_TOKENS - prompt_tokens
         # Gemini uses max_output_tokens for max_tokens
         max_output_tokens = min(1200, available)
-        
+
         # Check if there is enough context space for a response
         if max_output_tokens <= 0:
-            logger.warning("Not enough token capacity for a response.")
-            return "Unable to generate a response due to prompt size."
-            
-        response = model.generate_content(
-            contents=peso_prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=max_output_tokens,
+            raise ValueError("Not enough token capacity for a response.")
+
+        with span("llm generate", {"llm.model": MODEL_NAME, "llm.max_output_tokens": max_output_tokens}) as generated:
+            response = model.generate_content(
+                contents=peso_prompt,
+                generation_config=_genai.GenerationConfig(
+                    temperature=0.7,
+                    max_output_tokens=max_output_tokens,
+                ),
+                request_options=_request_options
             )
-        )
-        # The generated text is in the 'text' attribute of the response
-        return response.text.strip()
-    
+            # Billed tokens, whether or not the text turns out to be usable
+            metadata = getattr(response, "usage_metadata", None)
+            tokens = {
+                "prompt_tokens": getattr(metadata, "prompt_token_count", None) or prompt_tokens,
+                "output_tokens": getattr(metadata, "candidates_token_count", None) or 0
+            }
+            # The generated text is in the 'text' attribute of the response
+            text = response.text.strip()
+            set_attributes(generated, {"llm.output_tokens": tokens["output_tokens"], "llm.output_chars": len(text)})
+    except Exception:
+        llm_usage.record_generation(*usage, (time.perf_counter() - started) * 1000, failed=True, **tokens)
+        raise
+    llm_usage.record_generation(*usage, (time.perf_counter() - started) * 1000, **tokens)
+    return text
+
+
+def _generate_and_cache(key: str, peso_prompt: str, usage: tuple) -> str:
+    text = _call_model(peso_prompt, usage)
+    _cache_put(key, text)
+    return text
+
+
+# AI response Settings
+def generate_response(prompt: str, route: str = None, prompt_version: str = None) -> str:
+    """
+    Generate a response, waiting as long as the LLM takes.
+
+    `route` and `prompt_version` label the call in the LLM usage accounting.
+    """
+    started = time.perf_counter()
+    with span("llm generate_response", {"llm.route": route}) as current:
+        text, outcome = _generate_response(prompt, (route, prompt_version), current)
+    llm_usage.record_call(route, prompt_version, (time.perf_counter() - started) * 1000, **outcome)
+    return text
+
+
+def _generate_response(prompt: str, usage: tuple, current):
+    peso_prompt = peso_wrap_prompt(prompt)
+    key = _prompt_key(peso_prompt)
+
+    cached = _cache_get(key)
+    set_attributes(current, {"llm.cache_hit": cached is not None})
+    if cached is not None:
+        return cached, {"cache_hit": True}
+
+    try:
+        # Identical prompts already in flight share one LLM call
+        return llm_flight.do(key, _generate_and_cache, key, peso_prompt, usage), {}
+
+    except ValueError as e:
+        logger.warning(str(e))
+        return "Unable to generate a response due to prompt size.", {"failed": True}
+
+    except Exception as e:
+        logger.error(f"Gemini API error: {e}")
+        return "An error occurred while generating the AI explanation.", {"failed": True}
+
+
+def shutdown_llm_executor():
+    """Drop LLM calls that haven't started; calls in flight end within AI_LLM_TIMEOUT_SECONDS."""
+    _llm_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def response_deadline(budget_seconds: float = None) -> float:
+    """Return the monotonic time by which an interactive AI request must answer."""
+    budget = AI_RESPONSE_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+    return time.monotonic() + budget
+
+
+def generate_response_within(prompt: str, deadline: float = None, route: str = None, prompt_version: str = None):
+    """
+    Generate a response, giving up at the deadline.
+
+    Returns None when the LLM fails or misses the deadline so the caller can fall back.
+    A late answer keeps generating in the background and is cached for the next request.
+    `route` and `prompt_version` label the call in the LLM usage accounting.
+    """
+    started = time.perf_counter()
+    with span("llm generate_response", {"llm.route": route}) as current:
+        text, outcome = _generate_response_within(prompt, deadline, (route, prompt_version), current)
+    llm_usage.record_call(route, prompt_version, (time.perf_counter() - started) * 1000, **outcome)
+    return text
+
+
+def _generate_response_within(prompt: str, deadline: float, usage: tuple, current):
+    peso_prompt = peso_wrap_prompt(prompt)
+    key = _prompt_key(peso_prompt)
+
+    cached = _cache_get(key)
+    set_attributes(current, {"llm.cache_hit": cached is not None})
+    if cached is not None:
+        return cached, {"cache_hit": True}
+
+    # Identical prompts already in flight share one LLM call. It runs in the caller's
+    # context, so its spans belong to the request that started it
+    future = llm_flight.submit(
+        key, _llm_executor, contextvars.copy_context().run, _generate_and_cache, key, peso_prompt, usage
+    )
+
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    set_attributes(current, {"llm.budget_ms": None if timeout is None else round(timeout * 1000)})
+    try:
+        return future.result(timeout=timeout), {}
+    except FutureTimeoutError:
+        logger.warning("Gemini response missed the latency budget; using rule-based fallback.")
+        set_attributes(current, {"llm.deadline_missed": True})
+        return None, {"deadline_missed": True}
     except Exception as e:
         logger.error(f"Gemini API error: {e}")
-        return "An error occurred while generating the AI explanation."
\ No newline at end of file
+        return None, {"failed": True}
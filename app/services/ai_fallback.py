@@ -0,0 +1,272 @@
+import math
+
+# Rule-based explanations and suggestions served when the LLM misses its latency budget.
+# Everything here is built from the stored simulation results, so it is deterministic.
+
+FALLBACK_MODEL_INFO = {
+    "model_name": "rule-based-fallback",
+    "prompt_version": "v1.0.0"
+}
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ") if key else "N/A"
+
+
+def _months_text(months) -> str:
+    if months is None or (isinstance(months, float) and not math.isfinite(months)):
+        return "no fixed timeline yet"
+    return f"about {months:.1f} months"
+
+
+def budget_explanation(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+    chart_data = scenario.chart_data or []
+
+    avg_net_cash_flow = key_metrics.get("avg_net_cash_flow", 0)
+    discretionary_percent = key_metrics.get("discretionary_spending_percent", 0)
+    discretionary_total = key_metrics.get("total_discretionary_spending", 0)
+    top_category = key_metrics.get("highest_discretionary_category")
+    emergency_months = key_metrics.get("projected_emergency_fund_months")
+
+    months = len(chart_data)
+    last = chart_data[-1] if chart_data else {}
+    deficit_months = sum(1 for m in chart_data if m.get("net_cash_flow", 0) < 0)
+
+    if avg_net_cash_flow >= 0:
+        health = (
+            f"Your budget shows an average monthly surplus of ₱{avg_net_cash_flow:,.2f}, "
+            f"which builds up to about ₱{last.get('cumulative_savings', 0):,.2f} in extra savings over {months} months."
+        )
+    else:
+        health = (
+            f"Your budget runs an average monthly deficit of ₱{abs(avg_net_cash_flow):,.2f}, "
+            f"with {deficit_months} of {months} months spending more than you earn "
+            f"and a total shortfall of ₱{last.get('cumulative_deficit', 0):,.2f}."
+        )
+
+    explanation_text = (
+        f"{health} Discretionary spending takes up {discretionary_percent:.1%} of your income "
+        f"(₱{discretionary_total:,.2f} a month), with {_label(top_category)} as your largest category. "
+        f"At your current savings rate, your emergency fund would be fully funded in {_months_text(emergency_months)}. "
+        f"Trimming {_label(top_category)} is the quickest way to free up more cash each month."
+    )
+
+    return {
+        "explanation_text": explanation_text,
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
+
+
+def budget_suggestions(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+    expenses = scenario.expenses or {}
+    savings_goals = scenario.savings_goals or {}
+
+    wants = expenses.get("wants_discretionary", {})
+    top_category = key_metrics.get("highest_discretionary_category")
+    top_value = wants.get(top_category, 0) if top_category else 0
+    avg_net_cash_flow = key_metrics.get("avg_net_cash_flow", 0)
+    target_monthly_savings = savings_goals.get("target_monthly_savings", 0)
+    emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
+
+    potential_savings = top_value * 0.2
+    optimized_savings = target_monthly_savings + potential_savings
+    optimized_months = emergency_fund_target / optimized_savings if optimized_savings else None
+
+    suggestions = [
+        f"Reduce {_label(top_category)}: cutting it by 20% frees up ₱{potential_savings:,.2f} a month.",
+    ]
+    if avg_net_cash_flow < 0:
+        suggestions.append(
+            f"Close the monthly gap: you need ₱{abs(avg_net_cash_flow):,.2f} more each month, "
+            "so review your fixed bills and variable needs for items you can renegotiate or pause."
+        )
+    else:
+        suggestions.append(
+            f"Put your surplus to work: move the ₱{avg_net_cash_flow:,.2f} monthly surplus into savings right after payday."
+        )
+    if emergency_fund_target:
+        suggestions.append(
+            f"Prioritize your emergency fund: adding the 20% cut to your savings reaches ₱{emergency_fund_target:,.2f} "
+            f"in {_months_text(optimized_months)}."
+        )
+    suggestions.append(
+        "Track your spending weekly so small leaks in discretionary categories are caught before the month ends."
+    )
+
+    return {
+        "suggestions_text": "\n".join(f"{i}. {s}" for i, s in enumerate(suggestions, start=1)),
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
+
+
+def _lowest_cash_period(chart_data: list):
+    if not chart_data:
+        return None
+    return min(chart_data, key=lambda c: c.get("net_cash_position", 0))
+
+
+def debt_explanation(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+    chart_data = scenario.chart_data or []
+
+    lowest = _lowest_cash_period(chart_data) or {}
+    negative_periods = sum(1 for c in chart_data if c.get("net_cash_position", 0) < 0)
+    ending_cash = key_metrics.get("ending_cash_position", 0)
+    total_interest = key_metrics.get("total_interest_paid", 0)
+    total_principal = key_metrics.get("total_principal_paid", 0)
+
+    explanation_text = (
+        f"Over {len(chart_data)} periods, your business is projected to end with a cash position of ₱{ending_cash:,.2f}. "
+        f"Debt service totals ₱{total_interest:,.2f} in interest and ₱{total_principal:,.2f} in principal. "
+        f"Your tightest point is period {lowest.get('period', 'N/A')}, "
+        f"with a cash balance of ₱{lowest.get('net_cash_position', 0):,.2f}"
+        + (f", and cash stays negative for {negative_periods} periods." if negative_periods else ".")
+        + " Keeping a cash buffer ahead of that period, or stretching loan terms, protects your liquidity."
+    )
+
+    return {
+        "explanation_text": explanation_text,
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
+
+
+def debt_suggestions(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+    chart_data = scenario.chart_data or []
+
+    lowest = _lowest_cash_period(chart_data) or {}
+    lowest_cash = lowest.get("net_cash_position", 0)
+    first = chart_data[0] if chart_data else {}
+    capital_required = key_metrics.get("capital_required", 0)
+
+    recommendations = []
+    if lowest_cash < 0:
+        recommendations.append({
+            "priority": "High",
+            "title": "Cover the cash shortfall",
+            "description": (
+                f"Cash drops to ₱{lowest_cash:,.2f} in period {lowest.get('period')}. "
+                f"Arrange a credit line or reserve of at least ₱{abs(lowest_cash):,.2f} before then."
+            )
+        })
+    if first.get("loan_interest_payments", 0) > 0:
+        recommendations.append({
+            "priority": "Medium",
+            "title": "Reduce interest costs",
+            "description": (
+                f"You pay about ₱{first.get('loan_interest_payments', 0):,.2f} in interest per period. "
+                "Refinance or prepay the highest-rate loan first."
+            )
+        })
+    if first.get("net_operating_cash_flow", 0) <= 0:
+        recommendations.append({
+            "priority": "High",
+            "title": "Restore positive operating cash flow",
+            "description": "Revenue does not cover operating costs and interest; review pricing and the largest expense lines."
+        })
+    if capital_required:
+        recommendations.append({
+            "priority": "Medium",
+            "title": "Stage the growth investment",
+            "description": (
+                f"Fund the ₱{capital_required:,.2f} expansion in stages so the cash balance stays above your safety buffer."
+            )
+        })
+
+    return {
+        "actionable_recommendations": recommendations or [{
+            "priority": "Low",
+            "title": "Maintain your current plan",
+            "description": "Your projected cash position stays healthy; keep monitoring revenue and expenses monthly."
+        }],
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
+
+
+def wealth_explanation(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+
+    real_value = key_metrics.get("projected_final_value_real", 0)
+    shortfall = key_metrics.get("total_shortfall_real", 0)
+    required_contribution = key_metrics.get("required_monthly_contribution")
+
+    if shortfall > 0:
+        outcome = f"falls short of your {scenario.goal_name.lower()} goal by ₱{shortfall:,.2f} in today's pesos"
+    else:
+        outcome = f"exceeds your {scenario.goal_name.lower()} goal by ₱{abs(shortfall):,.2f} in today's pesos"
+
+    explanation_text = (
+        f"Saving ₱{scenario.monthly_contribution:,.2f} a month from age {scenario.current_age} to {scenario.target_age} "
+        f"is projected to grow to ₱{real_value:,.2f} after inflation, which {outcome}. "
+        f"This assumes a {scenario.expected_annual_return:.2%} annual return and {scenario.inflation_rate:.2%} inflation"
+        + (f", less a {scenario.advisor_fee_percent:.2f}% advisor fee." if scenario.advisor_fee_percent else ".")
+        + (
+            f" Contributing about ₱{required_contribution:,.2f} a month would put you on track."
+            if shortfall > 0 and required_contribution else ""
+        )
+    )
+
+    return {
+        "explanation_text": explanation_text,
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
+
+
+def wealth_suggestions(scenario) -> dict:
+    key_metrics = scenario.key_metrics or {}
+
+    shortfall = key_metrics.get("total_shortfall_real", 0)
+    required_contribution = key_metrics.get("required_monthly_contribution")
+    required_return = key_metrics.get("required_annual_return")
+
+    recommendations = []
+    if shortfall > 0 and required_contribution:
+        recommendations.append({
+            "priority": "High",
+            "title": "Increase your monthly contribution",
+            "description": (
+                f"Raise your contribution from ₱{scenario.monthly_contribution:,.2f} toward ₱{required_contribution:,.2f} "
+                "a month to close the gap."
+            )
+        })
+    if not scenario.annual_contribution_increase:
+        recommendations.append({
+            "priority": "Medium",
+            "title": "Step up contributions every year",
+            "description": "Increase your contribution each year in line with salary raises to keep pace with inflation."
+        })
+    if scenario.advisor_fee_percent:
+        recommendations.append({
+            "priority": "Medium",
+            "title": "Review investment fees",
+            "description": (
+                f"A {scenario.advisor_fee_percent:.2f}% fee compounds over {scenario.target_age - scenario.current_age} years; "
+                "compare lower-cost funds with a similar risk profile."
+            )
+        })
+    if shortfall > 0 and required_return:
+        recommendations.append({
+            "priority": "Low",
+            "title": "Revisit your return assumptions",
+            "description": (
+                f"Reaching the goal with current contributions needs about {required_return:.2%} a year; "
+                f"check whether your {scenario.risk_profile} portfolio can realistically deliver it."
+            )
+        })
+
+    return {
+        "actionable_recommendations": recommendations or [{
+            "priority": "Low",
+            "title": "Stay the course",
+            "description": "You are on track for your goal; review your plan yearly or after major life changes."
+        }],
+        "fallback": True,
+        "model_info": FALLBACK_MODEL_INFO
+    }
@@ -0,0 +1,205 @@
+import os
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import select
+
+from app.db.session import get_session
+from app.models.background_job_model import BackgroundJobModel
+from app.services.http_cache import scenario_version
+from app.services.tracing import span
+
+# Bounded worker pool so a burst of saves can't flood the LLM provider
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+# How long a job waits for the LLM before it fails, instead of holding a worker indefinitely
+AI_JOB_TIMEOUT_SECONDS = float(os.getenv("AI_JOB_TIMEOUT_SECONDS", "60"))
+
+AI_JOB_TYPES = ("ai_explanation", "ai_suggestions")
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=AI_JOB_WORKERS, thread_name_prefix="ai-job")
+
+# (scenario_type, job_type) -> (scenario model, builder(scenario) -> data dict)
+_generators = {}
+# job_type -> (executor, run(job_id)) for jobs that aren't one scenario's AI text
+_runners = {}
+_shutting_down = False
+
+
+def register_generator(scenario_type: str, job_type: str, model, builder):
+    """Register the function that produces the result of a job type for a scenario type; builder(scenario, deadline)."""
+    _generators[(scenario_type, job_type)] = (model, builder)
+
+
+def register_runner(job_type: str, executor, run):
+    """Register a job type that `run(job_id)` carries out on its own executor."""
+    _runners[job_type] = (executor, run)
+
+
+def submit_job(job_id: int, job_type: str):
+    executor, run = _runners.get(job_type, (_executor, _run_job))
+    executor.submit(run, job_id)
+
+
+def enqueue_ai_jobs(scenario_type: str, scenario_id: int) -> list:
+    """Persist and submit explanation and suggestion jobs for a saved scenario."""
+    with get_session() as session:
+        jobs = [
+            BackgroundJobModel(job_type=job_type, scenario_type=scenario_type, scenario_id=scenario_id)
+            for job_type in AI_JOB_TYPES
+            if (scenario_type, job_type) in _generators
+        ]
+        session.add_all(jobs)
+        session.commit()
+        job_ids = [job.id for job in jobs]
+
+    for job_id in job_ids:
+        _executor.submit(_run_job, job_id)
+    return job_ids
+
+
+def shutting_down() -> bool:
+    """True once the process is stopping; long jobs check it between steps."""
+    return _shutting_down
+
+
+def shutdown_background_jobs():
+    """
+    Stop taking jobs without waiting for them.
+
+    Queued jobs are dropped from the executors but stay queued in the database, and
+    jobs interrupted by the shutdown go back to queued, so the next start resumes both.
+    """
+    global _shutting_down
+    _shutting_down = True
+    for executor in {_executor, *(executor for executor, _ in _runners.values())}:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def set_job_status(job_id: int, status: str, result: dict = None, error: str = None, version: str = None):
+    """Record a job's status, and its result or progress so far (and the scenario revision it's for)."""
+    with get_session() as session:
+        job = session.get(BackgroundJobModel, job_id)
+        if not job:
+            return
+        job.status = status
+        if result is not None:
+            job.result = result
+        if version is not None:
+            job.scenario_version = version
+        job.error = error
+        job.updated_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+
+
+def _run_job(job_id: int):
+    # Each job is its own trace: it runs after the request that queued it has finished
+    with span("background job", {"job.id": job_id}):
+        _execute_job(job_id)
+
+
+def _execute_job(job_id: int):
+    if _shutting_down:
+        return
+    with get_session() as session:
+        job = session.get(BackgroundJobModel, job_id)
+        if not job or job.status != "queued":
+            return
+        scenario_type, job_type, scenario_id = job.scenario_type, job.job_type, job.scenario_id
+
+    set_job_status(job_id, "running")
+    try:
+        model, builder = _generators[(scenario_type, job_type)]
+        with get_session() as session:
+            scenario = session.get(model, scenario_id)
+            if not scenario:
+                raise LookupError(f"{scenario_type} scenario {scenario_id} no longer exists")
+            # A detached copy: the connection goes back to the pool before the LLM calls
+            scenario = model(**scenario.model_dump())
+        version = scenario_version(scenario)
+        result = builder(scenario, time.monotonic() + AI_JOB_TIMEOUT_SECONDS)
+        if _shutting_down:
+            # The LLM calls were cut short by the shutdown, not by the provider
+            set_job_status(job_id, "queued")
+            return
+        if result.get("fallback"):
+            raise RuntimeError("LLM unavailable; only the rule-based fallback could be produced")
+    except Exception as e:
+        if _shutting_down:
+            set_job_status(job_id, "queued")
+            return
+        logger.error(f"Background job {job_id} ({job_type}) failed: {e}")
+        set_job_status(job_id, "failed", error=str(e))
+        return
+    set_job_status(job_id, "completed", result=result, version=version)
+
+
+def resume_pending_jobs():
+    """Re-submit jobs left queued or running by a previous process."""
+    with get_session() as session:
+        jobs = session.exec(
+            select(BackgroundJobModel).where(BackgroundJobModel.status.in_(["queued", "running"]))
+        ).all()
+        for job in jobs:
+            job.status = "queued"
+            session.add(job)
+        session.commit()
+        job_ids = [(job.id, job.job_type) for job in jobs]
+
+    for job_id, job_type in job_ids:
+        submit_job(job_id, job_type)
+    return [job_id for job_id, _ in job_ids]
+
+
+def get_job(job_id: int):
+    with get_session() as session:
+        return session.get(BackgroundJobModel, job_id)
+
+
+def get_scenario_jobs(scenario_type: str, scenario_id: int) -> list:
+    with get_session() as session:
+        return session.exec(
+            select(BackgroundJobModel)
+            .where(BackgroundJobModel.scenario_type == scenario_type)
+            .where(BackgroundJobModel.scenario_id == scenario_id)
+            .order_by(BackgroundJobModel.id)
+        ).all()
+
+
+def get_completed_result(scenario_type: str, scenario_id: int, job_type: str, version: str):
+    """
+    Return the precomputed result of a finished job, or None if it isn't ready.
+
+    Only text generated from revision `version` of the scenario counts: after e.g. a
+    re-simulation, AI text about the old numbers is ignored.
+    """
+    with get_session() as session:
+        job = session.exec(
+            select(BackgroundJobModel)
+            .where(BackgroundJobModel.scenario_type == scenario_type)
+            .where(BackgroundJobModel.scenario_id == scenario_id)
+            .where(BackgroundJobModel.job_type == job_type)
+            .where(BackgroundJobModel.status == "completed")
+            .where(BackgroundJobModel.scenario_version == version)
+            .order_by(BackgroundJobModel.id.desc())
+        ).first()
+        return job.result if job else None
+
+
+def job_to_dict(job: BackgroundJobModel) -> dict:
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "scenario_type": job.scenario_type,
+        "scenario_id": job.scenario_id,
+        "status": job.status,
+        "result": job.result if job.status == "completed" else None,
+        "progress": job.result.get("progress") if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
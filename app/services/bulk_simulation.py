@@ -0,0 +1,84 @@
+import json
+
+from pydantic import ValidationError
+
+from app.services.scenarios import SCENARIOS
+from app.services.downsampling import downsample_chart_data
+from app.services.simulation_result import chart_rows
+
+# Batch side of the offline bulk pipeline (app.cli.bulk_simulate): validate and simulate one
+# chunk of raw records. Kept apart from the CLI so pool workers import it by module path.
+
+
+def unflatten(row: dict) -> dict:
+    """
+    Nest a flat CSV row: "income.monthly_gross_income" becomes {"income": {"monthly_gross_income": ...}}.
+
+    Empty cells are dropped so schema defaults apply, and cells holding a JSON array or
+    object (e.g. the loans of a debt scenario) are decoded.
+    """
+    nested = {}
+    for column, value in row.items():
+        if column is None or value is None:
+            continue
+        value = value.strip() if isinstance(value, str) else value
+        if value == "":
+            continue
+        if isinstance(value, str) and value[0] in "[{":
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        target = nested
+        *parents, leaf = column.strip().split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return nested
+
+
+def simulate_records(scenario_type: str, records: list, max_points: int = None) -> list:
+    """
+    Validate and simulate a chunk of (record number, raw input) pairs.
+
+    Returns one result per record, in order: either the validated inputs with the
+    simulation outputs, or the errors of a record that was rejected or failed. The valid
+    records are simulated together through the scenario's batch simulator.
+    """
+    spec = SCENARIOS[scenario_type]
+    results = [None] * len(records)
+    valid = []
+    for position, (number, raw) in enumerate(records):
+        try:
+            valid.append((position, number, spec["input"].model_validate(raw).model_dump()))
+        except ValidationError as e:
+            results[position] = {
+                "record": number,
+                "status": "error",
+                "errors": e.errors(include_url=False, include_context=False, include_input=False)
+            }
+
+    try:
+        outputs = [result["data"] for result in spec["simulate_batch"]([payload for _, _, payload in valid])]
+    except Exception:
+        # One bad record must not abort a file of thousands: find it by simulating one at a time
+        outputs = []
+        for _, _, payload in valid:
+            try:
+                outputs.append(spec["simulate"](**payload)["data"])
+            except Exception as e:
+                outputs.append(e)
+
+    for (position, number, payload), data in zip(valid, outputs):
+        if isinstance(data, Exception):
+            results[position] = {"record": number, "status": "error", "errors": [{"type": type(data).__name__, "msg": str(data)}]}
+            continue
+        results[position] = {
+            "record": number,
+            "status": "success",
+            "inputs": payload,
+            "key_metrics": data["key_metrics"],
+            "insight": data["insight"],
+            "chart_data": chart_rows(downsample_chart_data(scenario_type, data["chart_data"], max_points))
+        }
+    return results
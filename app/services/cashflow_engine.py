@@ -0,0 +1,208 @@
+from datetime import date
+
+import numpy as np
+
+from app.services.money import to_centavos, to_pesos, spread
+from app.services.factor_tables import growth_power_rows
+from app.services.simulation_result import ChartSeries, BUDGET_DAILY_CHART_FIELDS
+
+# Calendar-based cash flow: income and bills land on their real days instead of one
+# monthly netting, so a payday after rent day shows up as a mid-month cash crunch.
+# Every array is (households, days), so a batch of households is one vectorized pass.
+#
+# Event schedule:
+#   - pay (salary and other income) on the last day of the month (monthly), the 15th
+#     and last day (semi-monthly, half each) or every 7th day from the start (weekly,
+#     12/52 of the monthly amount each)
+#   - savings are transferred out on each payday in the same proportion
+#   - bills (rent, utilities, loan payments, insurance, tuition) are due on the 1st
+#   - groceries, transportation, variable needs and wants are spent evenly every day
+BILL_FIELDS = ("rent", "utilities", "loan_payments", "insurance_premiums", "tuition_fees")
+INCOME_FREQUENCIES = ("monthly", "semi-monthly", "weekly")
+
+
+def projection_start(start_date: date = None) -> date:
+    """First day of the first projected month; the current month if `start_date` is None."""
+    return (start_date or date.today()).replace(day=1)
+
+
+def _calendar(start_date: date, months: int) -> dict:
+    # Whole calendar months, so every month has its bill day and its paydays
+    start_month = np.datetime64(start_date, "M")
+    days = np.arange(
+        start_month.astype("datetime64[D]"),
+        (start_month + months).astype("datetime64[D]")
+    )
+    month_start = days.astype("datetime64[M]")
+    month_index = (month_start - start_month).astype(int)
+    day_of_month = (days - month_start.astype("datetime64[D]")).astype(int) + 1
+    days_in_month = ((month_start + 1).astype("datetime64[D]") - month_start.astype("datetime64[D]")).astype(int)
+    is_month_end = day_of_month == days_in_month
+
+    # Share of a month's pay received each day, one row per income frequency
+    pay_share = np.zeros((len(INCOME_FREQUENCIES), days.size))
+    pay_share[0] = is_month_end
+    pay_share[1] = ((day_of_month == 15) | is_month_end) * 0.5
+    pay_share[2] = (np.arange(days.size) % 7 == 6) * (12 / 52)
+
+    # Running share of the month's pay received by the end of each day
+    month_starts = np.flatnonzero(day_of_month == 1)
+    paid_to_date = np.cumsum(pay_share, axis=1)
+    if month_starts.size:
+        before_month = np.concatenate([[0], month_starts[1:]]) - 1
+        opening = np.where(before_month >= 0, paid_to_date[:, np.maximum(before_month, 0)], 0)
+        paid_to_date -= np.repeat(opening, np.diff(np.append(month_starts, days.size)), axis=1)
+
+    return {
+        "days": days,
+        "month_index": month_index,
+        "day_of_month": day_of_month,
+        "days_in_month": days_in_month,
+        "pay_share": pay_share,
+        "paid_to_date": paid_to_date
+    }
+
+
+def _household_arrays(households: list, months: int) -> dict:
+    """Per-household monthly amounts with the what-if factors applied, shape (households, months)."""
+    def column(values):
+        return np.asarray(values, dtype=float)[:, None]
+
+    income, fixed, variable = [], [], []
+    bills, daily_needs, wants, savings = [], [], [], []
+    growth, reduction, savings_growth, frequency = [], [], [], []
+    for h in households:
+        fixed_needs = h["expenses"].get("fixed_needs", {})
+        variable_needs = h["expenses"].get("variable_needs", {})
+        what_if = h.get("what_if_factors") or {}
+        income.append(h["income"].get("monthly_gross_income", 0) + (h["income"].get("other_monthly_income") or 0))
+        fixed.append(sum(fixed_needs.values()))
+        variable.append(sum(variable_needs.values()))
+        bills.append(sum(fixed_needs.get(field, 0) for field in BILL_FIELDS))
+        daily_needs.append(sum(fixed_needs.values()) - bills[-1] + variable[-1])
+        wants.append(sum(h["expenses"].get("wants_discretionary", {}).values()))
+        savings.append(h["savings_goals"].get("target_monthly_savings", 0))
+        growth.append(what_if.get("income_growth_rate") or 0)
+        reduction.append(what_if.get("wants_reduction_rate") or 0)
+        savings_growth.append(what_if.get("savings_increase_rate") or 0)
+        freq = h["income"].get("income_frequency") or "monthly"
+        frequency.append(INCOME_FREQUENCIES.index(freq) if freq in INCOME_FREQUENCIES else 0)
+
+    return {
+        "income": column(income) * growth_power_rows(growth, months),
+        "wants": column(wants) * growth_power_rows([-rate for rate in reduction], months),
+        "savings": column(savings) * growth_power_rows(savings_growth, months),
+        "fixed": column(fixed),
+        "bills": column(bills),
+        "daily_needs": column(daily_needs),
+        "variable": column(variable),
+        "frequency": np.asarray(frequency, dtype=int)
+    }
+
+
+def project_daily_cash_flows(households: list, months: int, start_date: date = None, opening_balances=None) -> dict:
+    """
+    Daily inflows, outflows and running balances for a batch of budget inputs.
+
+    `households` are budget simulation inputs (income, expenses, savings_goals,
+    what_if_factors). Returns (households, days) centavo arrays plus the calendar.
+    """
+    cal = _calendar(projection_start(start_date), months)
+    h = _household_arrays(households, months)
+    month_index = cal["month_index"]
+    days_in_month = cal["days_in_month"]
+
+    # Monthly amounts are rounded to the centavo and spread over their days so that
+    # each month's pieces add back up exactly and balances are exact running sums
+    paid_to_date = cal["paid_to_date"][h["frequency"]]
+    paid_before = paid_to_date - cal["pay_share"][h["frequency"]]
+    spent_to_date = cal["day_of_month"] / days_in_month
+    spent_before = (cal["day_of_month"] - 1) / days_in_month
+
+    income = spread(to_centavos(h["income"])[:, month_index], paid_to_date, paid_before)
+    savings = spread(to_centavos(h["savings"])[:, month_index], paid_to_date, paid_before)
+    bills = to_centavos(h["bills"]) * (cal["day_of_month"] == 1)
+    needs = spread(to_centavos(h["daily_needs"]), spent_to_date, spent_before)
+    wants = spread(to_centavos(h["wants"])[:, month_index], spent_to_date, spent_before)
+
+    outflow = bills + needs + wants + savings
+    opening = to_centavos(np.zeros(len(households)) if opening_balances is None else opening_balances)
+    balance = opening[:, None] + np.cumsum(income - outflow, axis=1)
+
+    return {
+        "dates": cal["days"],
+        "month_index": month_index,
+        "income": income,
+        "bills": bills,
+        "needs": needs,
+        "wants": wants,
+        "savings": savings,
+        "balance": balance,
+        "monthly": h
+    }
+
+
+def _per_month(values: np.ndarray, month_index: np.ndarray, months: int) -> np.ndarray:
+    # Sum of a (households, days) array within each month -> (households, months)
+    out = np.zeros((values.shape[0], months), dtype=values.dtype)
+    np.add.at(out.T, month_index, values.T)
+    return out
+
+
+def monthly_rollup(projection: dict, months: int, household: int = 0, include_daily_series: bool = False):
+    """
+    Roll one household's daily projection up to monthly chart_data.
+
+    Months keep the monthly simulator's fields and add the lowest balance of the month,
+    the day it happens and how many days the balance is negative.
+    """
+    month_index = projection["month_index"]
+    dates = projection["dates"]
+    balance = projection["balance"][household]
+    if balance.size == 0:
+        return ChartSeries({"month": np.arange(0)}, fields=BUDGET_DAILY_CHART_FIELDS[:1]), None
+
+    income = _per_month(projection["income"][household:household + 1], month_index, months)[0]
+    wants = _per_month(projection["wants"][household:household + 1], month_index, months)[0]
+    savings = _per_month(projection["savings"][household:household + 1], month_index, months)[0]
+    fixed = int(to_centavos(projection["monthly"]["fixed"][household, 0]))
+    variable = int(to_centavos(projection["monthly"]["variable"][household, 0]))
+    net = income - fixed - variable - wants - savings
+
+    # Lowest day of each month: sort by (month, balance) and take each month's first day
+    by_month_balance = np.lexsort((balance, month_index))
+    lows = by_month_balance[np.flatnonzero(np.diff(month_index[by_month_balance], prepend=-1))]
+    month_starts = np.flatnonzero(np.diff(month_index, prepend=-1))
+
+    chart_data = ChartSeries(
+        {
+            "month": np.arange(1, months + 1),
+            "total_income": income,
+            "wants_expenses": wants,
+            "net_cash_flow": net,
+            "cumulative_savings": np.cumsum(np.where(net >= 0, net, 0)),
+            "cumulative_deficit": np.cumsum(np.where(net < 0, -net, 0)),
+            "min_balance": balance[lows],
+            "min_balance_date": dates[lows].astype(str),
+            "days_negative": np.add.reduceat((balance < 0).astype(int), month_starts)
+        },
+        constants={"fixed_expenses": fixed, "variable_expenses": variable},
+        money=BUDGET_DAILY_CHART_FIELDS[1:9],
+        fields=BUDGET_DAILY_CHART_FIELDS
+    )
+
+    daily_series = None
+    if include_daily_series:
+        inflow = projection["income"][household]
+        outflow = (
+            projection["bills"][household] + projection["needs"][household]
+            + projection["wants"][household] + projection["savings"][household]
+        )
+        daily_series = {
+            "dates": [str(d) for d in dates],
+            "inflow": to_pesos(inflow).tolist(),
+            "outflow": to_pesos(outflow).tolist(),
+            "balance": to_pesos(balance).tolist()
+        }
+
+    return chart_data, daily_series
@@ -0,0 +1,147 @@
+import copy
+import math
+
+import numpy as np
+
+from pydantic import ValidationError
+
+from app.services.scenarios import SCENARIOS
+from app.services.simulation_pool import run_simulation, estimate_cost
+from app.services.single_flight import request_key
+
+
+class VariantError(ValueError):
+    """A variant (base merged with its overrides) is not a valid simulation input."""
+
+    def __init__(self, label: str, errors: list):
+        super().__init__(f"Invalid variant '{label}'")
+        self.label = label
+        self.errors = errors
+
+
+def deep_merge(base: dict, changes: dict) -> dict:
+    """Apply `changes` on top of `base`; nested dicts merge, everything else (lists included) replaces."""
+    merged = copy.deepcopy(base)
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _validate(spec: dict, label: str, raw: dict) -> dict:
+    try:
+        return spec["input"].model_validate(raw).model_dump()
+    except ValidationError as e:
+        raise VariantError(label, e.errors(include_url=False, include_context=False))
+
+
+def _check_x_axis(spec: dict, label: str, base: dict, payload: dict):
+    # Period 4 is month 4 of a monthly variant but year 4 of an annual one: series only
+    # line up when every variant counts periods the same way
+    for name in spec["x_axis_inputs"]:
+        if payload[name] != base[name]:
+            raise VariantError(label, [{
+                "type": "value_error",
+                "loc": [name],
+                "msg": f"{name} must match the base ({base[name]!r}) for the series to line up, got {payload[name]!r}"
+            }])
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _align_series(x_axis: str, labels: list, charts: list) -> dict:
+    """One x column over the union of every variant's points, and one column per variant and field."""
+    xs = np.unique(np.concatenate([chart.column(x_axis) for chart in charts]))
+    fields = []
+    for chart in charts:
+        fields.extend(field for field in chart.fields if field != x_axis and field not in fields)
+
+    series = {field: {} for field in fields}
+    for label, chart in zip(labels, charts):
+        # Variants with a shorter horizon (or without a field) get nulls where they have no point
+        positions = np.searchsorted(xs, chart.column(x_axis))
+        for field in fields:
+            column = [None] * len(xs)
+            if field in chart.fields:
+                for position, value in zip(positions.tolist(), chart.column(field).tolist()):
+                    column[position] = value
+            series[field][label] = column
+
+    return {"x_axis": x_axis, "x": xs.tolist(), "series": series}
+
+
+def _metric_deltas(base_metrics: dict, metrics: dict) -> dict:
+    deltas = {}
+    for name, value in metrics.items():
+        base_value = base_metrics.get(name)
+        if not (_is_number(value) and _is_number(base_value)):
+            continue
+        delta = value - base_value
+        deltas[name] = {
+            "base": base_value,
+            "value": value,
+            "delta": delta,
+            "delta_percent": round(delta / abs(base_value), 4) if base_value else None
+        }
+    return deltas
+
+
+def compare_scenarios(scenario_type: str, base: dict, overrides: list) -> dict:
+    """
+    Simulate a base input and every override of it, and line the results up side by side.
+
+    `overrides` is a list of (label, changes) pairs. Variants that resolve to the same
+    input are simulated once, and the distinct ones are simulated together as one batch:
+    one task for the process pool, with what the variants share (e.g. unchanged loans)
+    computed once and their projections evaluated as rows of one grid.
+    """
+    spec = SCENARIOS[scenario_type]
+
+    labels = ["base"]
+    payloads = [_validate(spec, "base", base)]
+    for index, (label, changes) in enumerate(overrides, start=1):
+        label = label or f"variant_{index}"
+        if label in labels:
+            label = f"{label}_{index}"
+        labels.append(label)
+        payloads.append(_validate(spec, label, deep_merge(base, changes)))
+        _check_x_axis(spec, label, payloads[0], payloads[-1])
+
+    keys = [request_key(scenario_type, payload) for payload in payloads]
+    distinct = dict(zip(keys, payloads))
+    batch = run_simulation(
+        spec["simulate_batch"],
+        estimate_cost(sum(spec["horizon"](payload) for payload in distinct.values())),
+        payloads=list(distinct.values())
+    )
+    results = {key: result["data"] for key, result in zip(distinct, batch)}
+    variants = [(label, payload, results[key]) for label, key, payload in zip(labels, keys, payloads)]
+
+    base_data = variants[0][2]
+    return {
+        "scenario_type": scenario_type,
+        "simulations_run": len(results),
+        "variants": [
+            {
+                "label": label,
+                "inputs": payload,
+                "key_metrics": data["key_metrics"],
+                "insight": data["insight"]
+            }
+            for label, payload, data in variants
+        ],
+        "aligned_series": _align_series(
+            spec["x_axis"], labels, [data["chart_data"] for _, _, data in variants]
+        ),
+        "deltas": [
+            {
+                "label": label,
+                "key_metrics": _metric_deltas(base_data["key_metrics"], data["key_metrics"])
+            }
+            for label, _, data in variants[1:]
+        ]
+    }
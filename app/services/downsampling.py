@@ -0,0 +1,126 @@
+import numpy as np
+
+from app.services.simulation_result import ChartSeries
+
+# Shape-preserving downsampling of chart_data, so payloads and chart render time stay
+# bounded however long the projection is. Points are picked with Largest-Triangle-
+# Three-Buckets on each scenario's main series; the extremes of its key series are
+# always kept so the lowest cash position can't be averaged away.
+
+# Smallest max_points accepted: room for the endpoints, the kept extremes and some shape
+MIN_CHART_POINTS = 10
+
+# scenario type -> x field, series LTTB follows, series whose min and max are always kept
+CHART_SERIES = {
+    "budget-optimization": ("month", "net_cash_flow", ("net_cash_flow", "min_balance")),
+    "debt-management": ("period", "net_cash_position", ("net_cash_position",)),
+    "debt-stress-test": ("period", "p50", ("p5", "p50")),
+    "wealth-building": ("year", "total_value", ("total_value", "cumulative_investment_growth"))
+}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps (first and last included)."""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    # Interior points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle corner
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+
+def _select(x: np.ndarray, y: np.ndarray, extremes: set, max_points: int) -> list:
+    """LTTB picks plus every extreme, at most `max_points` in total."""
+    keep = set(lttb_indices(x, y, max_points).tolist())
+    if not extremes <= keep:
+        # Reserve a slot for every extreme: a smaller LTTB run picks different points, so
+        # extremes it happens to keep can't be counted on to share a slot
+        keep = set(lttb_indices(x, y, max(max_points - len(extremes), 2)).tolist()) | extremes
+    return sorted(keep)
+
+
+def _column(chart_data, field: str):
+    if isinstance(chart_data, ChartSeries):
+        return chart_data.column(field) if field in chart_data.fields else None
+    values = [row.get(field) for row in chart_data]
+    if any(v is None for v in values):
+        return None
+    return np.asarray(values, dtype=float)
+
+
+def downsample_chart_data(scenario_type: str, chart_data, max_points: int = None):
+    """
+    Reduce chart_data to at most `max_points` periods, keeping its shape and its extremes.
+
+    Works on a ChartSeries (straight on its columns) or on stored row dicts, and returns
+    the same kind it was given.
+    """
+    if not max_points or len(chart_data) <= max_points or scenario_type not in CHART_SERIES:
+        return chart_data
+
+    x_field, main_field, extreme_fields = CHART_SERIES[scenario_type]
+    x = _column(chart_data, x_field)
+    y = _column(chart_data, main_field)
+    if x is None or y is None:
+        return chart_data[:max_points]
+
+    extremes = set()
+    for field in extreme_fields:
+        values = _column(chart_data, field)
+        if values is not None:
+            extremes.update((int(values.argmin()), int(values.argmax())))
+
+    indices = _select(x, y, extremes, max_points)
+    if isinstance(chart_data, ChartSeries):
+        return chart_data.take(indices)
+    return [chart_data[i] for i in indices]
+
+
+def downsample_result(scenario_type: str, result: dict, max_points: int = None) -> dict:
+    """Copy of a simulation response with its chart_data downsampled (the cached original is untouched)."""
+    data = result["data"]
+    chart_data = data.get("chart_data") or []
+    if not max_points or len(chart_data) <= max_points:
+        return result
+
+    downsampled = downsample_chart_data(scenario_type, chart_data, max_points)
+    data = {
+        **data,
+        "chart_data": downsampled,
+        "chart_points": {"original": len(chart_data), "returned": len(downsampled)}
+    }
+    if data.get("daily_series"):
+        data["daily_series"] = downsample_series(data["daily_series"], "balance", max_points)
+    return {**result, "data": data}
+
+
+def downsample_series(series: dict, main_field: str, max_points: int) -> dict:
+    """Same as downsample_chart_data for a columnar series (dict of equal-length lists)."""
+    y = np.asarray(series[main_field], dtype=float)
+    if not max_points or y.size <= max_points:
+        return series
+
+    indices = _select(np.arange(y.size, dtype=float), y, {int(y.argmin()), int(y.argmax())}, max_points)
+    return {field: [values[i] for i in indices] for field, values in series.items()}
@@ -0,0 +1,161 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import app.config
+
+# Compound-interest factors shared by the simulators, keyed by (rate, term). Traffic
+# clusters on a few bank rates and standard terms, so each factor is computed once and
+# reused instead of raising (1 + r) to a power on every request:
+#
+#   growth(r, n)        (1 + r)^n                 compounding a balance or a target
+#   discount(r, n)      (1 + r)^-n                real value of a future amount
+#   annuity(r, n)       ((1 + r)^n - 1) / r       future value of n end-of-period deposits of 1
+#   amortization(r, n)  r (1 + r)^n / ((1 + r)^n - 1)   level payment per unit borrowed
+#   growth_powers(r, n) [(1 + r)^0 ... (1 + r)^(n-1)]   per-period growth of a series
+#
+# Rates are keyed at FACTOR_RATE_DECIMALS decimals, so the same bank rate reached by
+# different arithmetic shares an entry, and factors are computed from the keyed rate.
+# The table is a bounded LRU of FACTOR_TABLE_SIZE entries, per process: simulation pool
+# workers keep their own, warmed the same way.
+FACTOR_TABLE_SIZE = int(os.getenv("FACTOR_TABLE_SIZE", "4096"))
+# Annual rates (in percent) and terms (in months) warmed at startup, as monthly rates
+FACTOR_WARM_RATES = [float(r) for r in os.getenv("FACTOR_WARM_RATES", "3,5,6,7,8,10,12,15,18,24,36").split(",") if r]
+FACTOR_WARM_TERMS = [int(t) for t in os.getenv("FACTOR_WARM_TERMS", "6,12,18,24,36,48,60,120,180,240,360").split(",") if t]
+FACTOR_RATE_DECIMALS = 12
+# Power series are computed to a multiple of this many periods and sliced, so horizons
+# of different lengths share an entry
+POWERS_BLOCK = 120
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("growth", "discount", "annuity", "amortization", "growth_powers")
+
+
+class FactorTable:
+    """Bounded LRU of factors by (kind, rate, term), with hit counts per kind."""
+
+    def __init__(self, max_entries: int = FACTOR_TABLE_SIZE):
+        self.max_entries = max_entries
+        self._factors = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = dict.fromkeys(KINDS, 0)
+        self.hits = dict.fromkeys(KINDS, 0)
+
+    def get(self, kind: str, rate: float, term: int, compute):
+        # This is on every simulation's hot path: one lock round trip per hit
+        key = (kind, round(float(rate), FACTOR_RATE_DECIMALS), term)
+        with self._lock:
+            self.lookups[kind] += 1
+            factor = self._factors.get(key)
+            if factor is not None:
+                self.hits[kind] += 1
+                self._factors.move_to_end(key)
+                return factor
+
+        # Computed outside the lock; a concurrent miss on the same key computes the same value
+        factor = compute(key[1], key[2])
+        with self._lock:
+            self._factors[key] = factor
+            while len(self._factors) > self.max_entries:
+                self._factors.popitem(last=False)
+        return factor
+
+    def reset_stats(self):
+        with self._lock:
+            self.lookups = dict.fromkeys(KINDS, 0)
+            self.hits = dict.fromkeys(KINDS, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self.lookups.values())
+            hits = sum(self.hits.values())
+            return {
+                "entries": len(self._factors),
+                "max_entries": self.max_entries,
+                "lookups": lookups,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0,
+                "by_kind": {
+                    kind: {
+                        "lookups": self.lookups[kind],
+                        "hits": self.hits[kind],
+                        "hit_rate": round(self.hits[kind] / self.lookups[kind], 4) if self.lookups[kind] else 0
+                    }
+                    for kind in KINDS
+                }
+            }
+
+
+factor_table = FactorTable()
+
+
+def _growth(rate: float, term: int) -> float:
+    return (1 + rate) ** term
+
+
+def _annuity(rate: float, term: int) -> float:
+    return ((1 + rate) ** term - 1) / rate if rate else float(term)
+
+
+def _amortization(rate: float, term: int) -> float:
+    if not rate:
+        return 1 / term
+    growth = (1 + rate) ** term
+    return rate * growth / (growth - 1)
+
+
+def _growth_powers(rate: float, count: int):
+    powers = (1 + rate) ** np.arange(count)
+    # Shared between requests, so nobody may write into it
+    powers.setflags(write=False)
+    return powers
+
+
+def growth(rate: float, term: int) -> float:
+    return factor_table.get("growth", rate, term, _growth)
+
+
+def discount(rate: float, term: int) -> float:
+    return factor_table.get("discount", rate, term, lambda r, n: 1 / _growth(r, n))
+
+
+def annuity(rate: float, term: int) -> float:
+    return factor_table.get("annuity", rate, term, _annuity)
+
+
+def amortization(rate: float, term: int) -> float:
+    """Level payment per unit of principal over `term` periods; callers check term > 0."""
+    return factor_table.get("amortization", rate, term, _amortization)
+
+
+def growth_powers(rate: float, count: int):
+    """Read-only array of (1 + rate)^k for k = 0 .. count - 1."""
+    length = -(-max(count, 1) // POWERS_BLOCK) * POWERS_BLOCK
+    powers = factor_table.get("growth_powers", rate, length, _growth_powers)
+    return powers if count == length else powers[:max(count, 0)]
+
+
+def growth_power_rows(rates, count: int):
+    """(len(rates), count) array whose rows are the growth_powers of each rate (read-only)."""
+    if len(rates) == 1:
+        # A single input reads the shared row instead of copying it
+        return growth_powers(rates[0], count)[None, :]
+    return np.array([growth_powers(rate, count) for rate in rates]).reshape(len(rates), max(count, 0))
+
+
+def warm_factor_tables():
+    """Precompute the factors of the common rates and terms (FACTOR_WARM_RATES/TERMS)."""
+    for annual_rate in FACTOR_WARM_RATES:
+        monthly_rate = annual_rate / 12 / 100
+        for term in FACTOR_WARM_TERMS:
+            growth(monthly_rate, term)
+            annuity(monthly_rate, term)
+            amortization(monthly_rate, term)
+        growth_powers(monthly_rate, max(FACTOR_WARM_TERMS, default=0) + 1)
+    # Warming isn't traffic: hit rates describe requests only
+    factor_table.reset_stats()
+    logger.info(f"Factor tables warmed with {factor_table.stats()['entries']} entries")
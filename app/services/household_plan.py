@@ -0,0 +1,192 @@
+import numpy as np
+
+from app.services.factor_tables import discount, growth_power_rows
+from app.services.money import to_centavos, to_pesos, round_half_away, spread
+
+# Several goals on one age timeline. Every goal is a row of a (goals, months) grid, so the
+# whole household is projected in one vectorized pass. A goal's final value is linear in
+# its base monthly contribution:
+#
+#   final_value = current_savings * growth_factor + monthly_contribution * annuity_factor
+#
+# so required contributions and any allocation of a budget across goals are solved from
+# the two factors directly, without re-running the projection per goal.
+#
+# The factors are unitless floats; every amount is int64 centavos (see money.py), rounded
+# once where it's produced and converted to pesos only in the response.
+
+
+def _goal_arrays(goals: list, current_age: int, expected_annual_return: float, advisor_fee_percent: float) -> dict:
+    months = np.array([max(g["target_age"] - current_age, 0) * 12 for g in goals])
+    annual_return = np.array([
+        g["expected_annual_return"] if g.get("expected_annual_return") is not None else expected_annual_return
+        for g in goals
+    ])
+    return {
+        "months": months,
+        "rate": (annual_return - advisor_fee_percent / 100) / 12,
+        "savings": to_centavos([g["current_savings"] for g in goals]),
+        "contribution": to_centavos([g["monthly_contribution"] for g in goals]),
+        "increase": np.array([g.get("annual_contribution_increase") or 0 for g in goals], dtype=float),
+        "target": to_centavos([g["target_amount"] for g in goals])
+    }
+
+
+def _project(a: dict, horizon: int) -> dict:
+    """Month-end values of every goal on the shared grid, contributions made at the end of each month."""
+    t = np.arange(horizon + 1)
+    active = t[None, :-1] < a["months"][:, None]
+    # Contribution per unit of base contribution: steps up once a year, stops at the goal's target age
+    schedule = growth_power_rows(a["increase"], horizon // 12 + 1)[:, t[:-1] // 12] * active
+
+    growth = growth_power_rows(a["rate"], horizon + 1)
+    # V(t) = growth(t) * (savings + sum_{k<t} c(k) / growth(k+1)), i.e. V(t+1) = V(t)(1+r) + c(t)
+    discounted = np.cumsum(schedule / growth[:, 1:], axis=1)
+    unit_value = growth * np.concatenate([np.zeros((len(a["months"]), 1)), discounted], axis=1)
+
+    # Freeze each goal once it reaches its target age
+    end = np.minimum(a["months"], horizon)
+    frozen = t[None, :] > end[:, None]
+    unit_value = np.where(frozen, np.take_along_axis(unit_value, end[:, None], axis=1), unit_value)
+    savings_value = a["savings"][:, None] * np.where(frozen, np.take_along_axis(growth, end[:, None], axis=1), growth)
+
+    rows = np.arange(len(end))
+    return {
+        "schedule": schedule,
+        "unit_value": unit_value,
+        "savings_value": savings_value,
+        "growth_factor": growth[rows, end],
+        "annuity_factor": unit_value[rows, end]
+    }
+
+
+def _allocate(budget: int, required: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    """Fund goals in priority order; goals sharing a priority split what's left pro rata, in centavos."""
+    allocation = np.zeros_like(required)
+    remaining = budget
+    for level in np.unique(priority):
+        members = priority == level
+        need = int(required[members].sum())
+        if need <= 0:
+            continue
+        if remaining >= need:
+            allocation[members] = required[members]
+        elif remaining > 0:
+            # Split by cumulative share, so the pieces add up to what's left exactly
+            to_date = np.cumsum(required[members])
+            allocation[members] = spread(remaining, to_date / need, (to_date - required[members]) / need)
+        remaining -= int(allocation[members].sum())
+    return allocation
+
+
+def simulate_household_plan(
+    current_age,
+    goals,
+    inflation_rate=0.035,
+    expected_annual_return=0.07,
+    advisor_fee_percent=0,
+    monthly_budget=None
+):
+    names = []
+    for index, goal in enumerate(goals, start=1):
+        name = goal["goal_name"]
+        names.append(name if name not in names else f"{name} ({index})")
+
+    a = _goal_arrays(goals, current_age, expected_annual_return, advisor_fee_percent)
+    horizon = int(a["months"].max()) if len(goals) else 0
+    p = _project(a, horizon)
+
+    values = round_half_away(p["savings_value"] + a["contribution"][:, None] * p["unit_value"])
+    contributions = round_half_away(a["contribution"][:, None] * p["schedule"])
+
+    inflation_discount = np.array([discount(inflation_rate, int(months) // 12) for months in a["months"]])
+    final_nominal = values[np.arange(len(goals)), np.minimum(a["months"], horizon)]
+    final_real = round_half_away(final_nominal * inflation_discount)
+    target_real = round_half_away(a["target"] * inflation_discount)
+    funding_ratio = np.divide(final_nominal, a["target"], out=np.zeros(len(goals)), where=a["target"] > 0)
+
+    # Base contribution that exactly funds each goal, straight from the linear factors;
+    # a goal with a gap and no months left to contribute can't be funded
+    gap = a["target"] - a["savings"] * p["growth_factor"]
+    fundable = (p["annuity_factor"] > 0) | (gap <= 0)
+    required = round_half_away(
+        np.divide(np.maximum(gap, 0), p["annuity_factor"], out=np.zeros(len(goals)), where=p["annuity_factor"] > 0)
+    )
+
+    allocation = None
+    if monthly_budget is not None:
+        budget = int(to_centavos(monthly_budget))
+        priority = np.array([g.get("priority") or 1 for g in goals])
+        allocated = _allocate(budget, np.where(fundable, required, 0), priority)
+        allocated_final = a["savings"] * p["growth_factor"] + allocated * p["annuity_factor"]
+        allocation = {
+            "monthly_budget": monthly_budget,
+            "unallocated": to_pesos(budget - allocated.sum()),
+            "goals": [
+                {
+                    "goal_name": name,
+                    "monthly_contribution": to_pesos(allocated[i]),
+                    "funding_ratio": round(float(allocated_final[i] / a["target"][i]), 4) if a["target"][i] else None
+                }
+                for i, name in enumerate(names)
+            ]
+        }
+
+    # Yearly rows on the shared timeline, like the single-goal chart
+    chart_data = []
+    for year in range(horizon // 12 + 1):
+        month = min(year * 12, horizon)
+        load = contributions[:, month].sum() if month < horizon else 0
+        chart_data.append({
+            "year": current_age + year,
+            "monthly_contribution_load": to_pesos(load),
+            "combined_value": to_pesos(values[:, month].sum()),
+            "goal_values": {name: to_pesos(values[i, month]) for i, name in enumerate(names)}
+        })
+
+    goal_results = [
+        {
+            "goal_name": name,
+            "target_age": goals[i]["target_age"],
+            "target_amount": goals[i]["target_amount"],
+            "projected_final_value_nominal": to_pesos(final_nominal[i]),
+            "projected_final_value_real": to_pesos(final_real[i]),
+            "inflation_adjusted_target": to_pesos(target_real[i]),
+            "total_shortfall_real": to_pesos(target_real[i] - final_real[i]),
+            "funding_ratio": round(float(funding_ratio[i]), 4),
+            "required_monthly_contribution": to_pesos(required[i]) if fundable[i] else None
+        }
+        for i, name in enumerate(names)
+    ]
+
+    monthly_load = contributions.sum(axis=0)
+    underfunded = [g["goal_name"] for g in goal_results if g["funding_ratio"] < 1]
+    insight = (
+        f"Across {len(goals)} goals the household currently contributes ₱{to_pesos(a['contribution'].sum()):,.2f} a month"
+        f"{f', peaking at ₱{to_pesos(monthly_load.max()):,.2f}' if monthly_load.size else ''}. "
+        + (f"Goals projected to fall short: {', '.join(underfunded)}." if underfunded else "Every goal is projected to be fully funded.")
+    )
+
+    return {
+        "status": "success",
+        "data": {
+            "inputs_received": {
+                "current_age": current_age,
+                "inflation_rate": inflation_rate,
+                "expected_annual_return": expected_annual_return,
+                "advisor_fee_percent": advisor_fee_percent,
+                "monthly_budget": monthly_budget,
+                "goals": goals
+            },
+            "chart_data": chart_data,
+            "goals": goal_results,
+            "key_metrics": {
+                "current_monthly_contribution": to_pesos(a["contribution"].sum()),
+                "peak_monthly_contribution": to_pesos(monthly_load.max()) if monthly_load.size else 0,
+                "required_monthly_contribution": to_pesos(required.sum()) if fundable.all() else None,
+                "combined_funding_ratio": round(float(final_nominal.sum() / a["target"].sum()), 4) if a["target"].sum() else None
+            },
+            "allocation": allocation,
+            "insight": insight
+        }
+    }
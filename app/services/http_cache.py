@@ -0,0 +1,44 @@
+from fastapi import Request, Response
+
+from app.services.single_flight import request_key
+
+# ETags and conditional requests. A stored scenario's representation only changes when the
+# row does (id + updated_at) or when the prompts behind its AI text do (prompt version),
+# and a simulation only when its inputs or the engine do, so those are hashed into the
+# ETag. Clients must revalidate every time (the "latest scenario" an AI route serves can
+# change at any moment); a matching If-None-Match is answered with an empty 304.
+
+REVALIDATE = "private, no-cache"
+# Rule-based fallbacks stand in for an LLM answer that missed its deadline: never let a
+# cache keep one, so the next view gets another chance at the real text
+NO_STORE = "no-store"
+
+
+def make_etag(*parts) -> str:
+    return f'"{request_key(*parts)[:32]}"'
+
+
+def scenario_version(scenario) -> str:
+    """Revision of a stored scenario: its last update, or its creation if never updated."""
+    stamp = scenario.updated_at or scenario.created_at
+    return f"{scenario.id}:{stamp.isoformat() if stamp else ''}"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names `etag` (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def cache_headers(etag: str, cacheable: bool = True) -> dict:
+    if not cacheable:
+        return {"Cache-Control": NO_STORE}
+    return {"ETag": etag, "Cache-Control": REVALIDATE}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+import app.config
+from app.db.session import get_session
+from app.models.llm_usage_model import LLMUsageModel
+
+# Token and latency accounting of the LLM calls, per route and prompt version. Calls are
+# counted in memory and written every LLM_USAGE_FLUSH_SECONDS as one row per route,
+# prompt version and hour, so the table stays small however busy the AI routes are.
+#
+# Two things are counted. Calls are what a route asked for: cache hits, failures, missed
+# deadlines and the latency the caller saw. Generations are what was actually sent to
+# the model, with its token counts; they are charged to the route whose call started
+# them, including generations that finish after that call gave up on its deadline.
+LLM_USAGE_FLUSH_SECONDS = float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "30"))
+
+# Upper bounds (ms) of the call latency histogram; the last bucket is everything slower
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+COUNTERS = (
+    "calls", "cache_hits", "failures", "deadline_misses", "latency_ms_total",
+    "generations", "generation_failures", "prompt_tokens", "output_tokens", "generation_ms_total"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _hour(now: datetime) -> datetime:
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+def _new_counters() -> dict:
+    counters = dict.fromkeys(COUNTERS, 0)
+    counters.update(latency_ms_max=0, latency_histogram=[0] * (len(LATENCY_BUCKETS_MS) + 1))
+    return counters
+
+
+def _merge(into, counters: dict):
+    """Add `counters` to a counters dict or an LLMUsageModel row."""
+    get = into.get if isinstance(into, dict) else lambda name: getattr(into, name)
+    put = into.__setitem__ if isinstance(into, dict) else lambda name, value: setattr(into, name, value)
+    for name in COUNTERS:
+        put(name, get(name) + counters[name])
+    put("latency_ms_max", max(get("latency_ms_max"), counters["latency_ms_max"]))
+    histogram = get("latency_histogram") or [0] * len(counters["latency_histogram"])
+    put("latency_histogram", [a + b for a, b in zip(histogram, counters["latency_histogram"])])
+
+
+class LLMUsageRecorder:
+    """In-memory usage counters per (hour, route, prompt version), flushed to the database."""
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+
+    def _counters(self, route: str, prompt_version: str) -> dict:
+        # Called with the lock held
+        key = (_hour(datetime.utcnow()), route or "unknown", prompt_version or "")
+        counters = self._pending.get(key)
+        if counters is None:
+            counters = self._pending[key] = _new_counters()
+            self._start_flusher()
+        return counters
+
+    def record_call(self, route: str, prompt_version: str, latency_ms: float,
+                    cache_hit: bool = False, failed: bool = False, deadline_missed: bool = False):
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            counters = self._counters(route, prompt_version)
+            counters["calls"] += 1
+            counters["cache_hits"] += cache_hit
+            counters["failures"] += failed
+            counters["deadline_misses"] += deadline_missed
+            counters["latency_ms_total"] += latency_ms
+            counters["latency_ms_max"] = max(counters["latency_ms_max"], latency_ms)
+            counters["latency_histogram"][bucket] += 1
+
+    def record_generation(self, route: str, prompt_version: str, generation_ms: float,
+                          prompt_tokens: int = 0, output_tokens: int = 0, failed: bool = False):
+        with self._lock:
+            counters = self._counters(route, prompt_version)
+            counters["generations"] += 1
+            counters["generation_failures"] += failed
+            counters["prompt_tokens"] += prompt_tokens or 0
+            counters["output_tokens"] += output_tokens or 0
+            counters["generation_ms_total"] += generation_ms
+
+    def _start_flusher(self):
+        if self._flusher is None and self.flush_seconds > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="llm-usage", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """Add the pending counters to their rows; they are kept for the next flush on failure."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                self._write(pending)
+            except Exception as e:
+                logger.error(f"Could not write LLM usage: {e}")
+                with self._lock:
+                    for key, counters in pending.items():
+                        if key in self._pending:
+                            _merge(counters, self._pending[key])
+                        self._pending[key] = counters
+
+    def _write(self, pending: dict):
+        now = datetime.utcnow()
+        with get_session() as session:
+            for (period_start, route, prompt_version), counters in pending.items():
+                row = session.exec(
+                    select(LLMUsageModel).where(
+                        LLMUsageModel.period_start == period_start,
+                        LLMUsageModel.route == route,
+                        LLMUsageModel.prompt_version == prompt_version
+                    )
+                ).first()
+                if row is None:
+                    row = LLMUsageModel(period_start=period_start, route=route, prompt_version=prompt_version)
+                _merge(row, counters)
+                row.updated_at = now
+                session.add(row)
+            session.commit()
+
+
+llm_usage = LLMUsageRecorder(LLM_USAGE_FLUSH_SECONDS)
+
+
+def _percentile_ms(histogram: list, max_ms: float, q: float):
+    """Upper bound of the histogram bucket holding the q-th quantile."""
+    total = sum(histogram)
+    if not total:
+        return None
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS + (max_ms,), histogram):
+        seen += count
+        if seen >= q * total:
+            return min(bound, max_ms)
+    return max_ms
+
+
+def usage_summary(hours: int = 24) -> list:
+    """Usage per route and prompt version over the last `hours`, most tokens first."""
+    llm_usage.flush()
+    since = _hour(datetime.utcnow()) - timedelta(hours=hours - 1)
+    with get_session() as session:
+        rows = session.exec(select(LLMUsageModel).where(LLMUsageModel.period_start >= since)).all()
+
+    totals = {}
+    for row in rows:
+        key = (row.route, row.prompt_version)
+        if key not in totals:
+            totals[key] = _new_counters()
+        _merge(totals[key], row.model_dump())
+
+    summary = []
+    for (route, prompt_version), t in totals.items():
+        calls, generations = t["calls"], t["generations"]
+        # Tokens are only known for generations the model answered
+        answered = generations - t["generation_failures"]
+        summary.append({
+            "route": route,
+            "prompt_version": prompt_version,
+            "calls": calls,
+            "cache_hits": t["cache_hits"],
+            "cache_hit_rate": round(t["cache_hits"] / calls, 4) if calls else 0,
+            "failures": t["failures"],
+            "deadline_misses": t["deadline_misses"],
+            "avg_latency_ms": round(t["latency_ms_total"] / calls, 1) if calls else None,
+            "p95_latency_ms": _percentile_ms(t["latency_histogram"], round(t["latency_ms_max"], 1), 0.95),
+            "max_latency_ms": round(t["latency_ms_max"], 1),
+            "generations": generations,
+            "generation_failures": t["generation_failures"],
+            "prompt_tokens": t["prompt_tokens"],
+            "output_tokens": t["output_tokens"],
+            "total_tokens": t["prompt_tokens"] + t["output_tokens"],
+            "avg_prompt_tokens": round(t["prompt_tokens"] / answered, 1) if answered else None,
+            "avg_output_tokens": round(t["output_tokens"] / answered, 1) if answered else None,
+            "avg_generation_ms": round(t["generation_ms_total"] / generations, 1) if generations else None
+        })
+    summary.sort(key=lambda s: s["total_tokens"], reverse=True)
+    return summary
@@ -0,0 +1,100 @@
+import math
+
+import numpy as np
+
+from app.services.factor_tables import amortization
+
+# Fixed-point money: amounts are carried as int64 centavos through the simulations and
+# converted to pesos only when results are serialized, so running totals add exactly
+# instead of drifting over hundreds of periods.
+#
+# Rounding rules (applied once, where an amount is produced):
+#   - peso amounts and growth-adjusted amounts round half away from zero to the centavo
+#   - interest accrued on a balance for one period rounds half away from zero
+#   - an amortized loan payment rounds half away from zero; the principal portion is
+#     payment - interest, so the two always add back up to the payment exactly
+#   - an amount split over several days or paydays is rounded cumulatively (`spread`),
+#     so the pieces add back up to the amount exactly
+CENTAVOS_PER_PESO = 100
+
+
+def round_half_away(values):
+    """Round float amounts (already in centavos) to whole centavos, halves away from zero."""
+    values = np.asarray(values, dtype=float)
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+
+
+def to_centavos(pesos):
+    return round_half_away(np.asarray(pesos, dtype=float) * CENTAVOS_PER_PESO)
+
+
+def to_pesos(centavos):
+    """Centavos to pesos: a float for a scalar, a float array otherwise."""
+    if np.ndim(centavos) == 0:
+        return int(centavos) / CENTAVOS_PER_PESO
+    return np.asarray(centavos) / CENTAVOS_PER_PESO
+
+
+def _round_scalar(value: float) -> int:
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def interest(balance, rate):
+    """Interest for one period on a centavo balance (scalar or array)."""
+    if np.ndim(balance) == 0 and np.ndim(rate) == 0:
+        return _round_scalar(int(balance) * rate)
+    return round_half_away(np.asarray(balance) * rate)
+
+
+def spread(amounts, share_to_date, share_before):
+    """
+    Split centavo amounts into pieces by cumulative share, e.g. a monthly bill into days.
+
+    Each piece is round(amount * share_to_date) - round(amount * share_before), so the
+    pieces of one amount always add back up to it exactly.
+    """
+    amounts = np.asarray(amounts)
+    return round_half_away(amounts * share_to_date) - round_half_away(amounts * share_before)
+
+
+def amortized_payment(principal: int, outstanding: int, monthly_rate: float, term: int) -> int:
+    """
+    Level payment in centavos that amortizes `principal` over `term` periods.
+
+    The amortization factor comes from the shared factor tables. Without a rate the
+    outstanding balance is spread evenly over the term.
+    """
+    if monthly_rate > 0 and term > 0:
+        return _round_scalar(principal * amortization(monthly_rate, term))
+    return _round_scalar(outstanding / term) if term else 0
+
+
+def compound(start, rate, deposits):
+    """
+    Balances of accounts that earn `rate` per period, with a deposit at the end of each.
+
+    balance[t + 1] = balance[t] + interest(balance[t], rate) + deposits[t]
+
+    `deposits` is (periods,) for one account or (accounts, periods) for a batch; the
+    result has one more column than `deposits`, starting with `start`. Interest is
+    rounded every period, so the recursion steps through time; a single account steps
+    with plain ints (faster than numpy scalars) and a batch steps as whole columns.
+    """
+    deposits = np.asarray(deposits, dtype=np.int64)
+    if deposits.ndim == 1:
+        balance = int(start)
+        balances = [balance]
+        for deposit in deposits.tolist():
+            # _round_scalar inlined: this loop is the hot path of the wealth projection
+            accrued = balance * rate
+            balance += (int(accrued + 0.5) if accrued >= 0 else -int(0.5 - accrued)) + deposit
+            balances.append(balance)
+        return np.array(balances, dtype=np.int64)
+
+    accounts, periods = deposits.shape
+    rate = np.broadcast_to(np.asarray(rate, dtype=float), (accounts,))
+    balances = np.empty((accounts, periods + 1), dtype=np.int64)
+    balances[:, 0] = start
+    for t in range(periods):
+        balances[:, t + 1] = balances[:, t] + round_half_away(balances[:, t] * rate) + deposits[:, t]
+    return balances
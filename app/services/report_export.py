@@ -0,0 +1,331 @@
+import io
+import os
+import csv
+import json
+import zipfile
+import threading
+from collections import OrderedDict
+
+import app.config
+from app.db.session import get_session
+from app.services.background_jobs import get_completed_result
+from app.services.downsampling import CHART_SERIES
+from app.services.http_cache import make_etag, scenario_version
+from app.services.scenarios import SCENARIOS
+
+# Server-side reports of stored scenarios: chart_data, key metrics, insight and the AI text
+# pre-generated on save, rendered to PDF (reportlab), CSV or XLSX (openpyxl). The PDF and
+# XLSX libraries are imported on first use so they cost nothing at startup. Rendered
+# reports are cached by scenario version, so re-downloads and bulk exports only render
+# what changed.
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Bump when the report layout changes, so cached and client copies are re-rendered
+REPORT_VERSION = "1"
+
+REPORT_FORMATS = {
+    "pdf": "application/pdf",
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+SCENARIO_TITLES = {
+    "budget-optimization": "Budget Optimization",
+    "debt-management": "Debt Management",
+    "wealth-building": "Wealth Building"
+}
+
+
+class ReportCache:
+    """LRU of rendered reports, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def put(self, key: str, content: bytes):
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+report_cache = ReportCache(REPORT_CACHE_MAX_BYTES)
+
+
+def load_report(scenario_type: str, scenario_id: int):
+    """Everything a report shows, plus its version; None if the scenario doesn't exist."""
+    with get_session() as session:
+        scenario = session.get(SCENARIOS[scenario_type]["model"], scenario_id)
+        if not scenario:
+            return None
+        version = scenario_version(scenario)
+        data = scenario.model_dump()
+
+    # Only AI text already generated on save; an export never waits on the LLM
+    explanation = get_completed_result(scenario_type, scenario_id, "ai_explanation", version) or {}
+    suggestions = get_completed_result(scenario_type, scenario_id, "ai_suggestions", version) or {}
+    report = {
+        "scenario_type": scenario_type,
+        "scenario_id": scenario_id,
+        "title": f"{SCENARIO_TITLES[scenario_type]} Report #{scenario_id}",
+        "chart_data": data.get("chart_data") or [],
+        "key_metrics": data.get("key_metrics") or {},
+        "insight": data.get("insight") or "",
+        "explanation": explanation.get("explanation_text"),
+        "suggestions": _suggestion_lines(suggestions)
+    }
+    # The AI text can arrive after the scenario was saved, so it is part of the version
+    report["version"] = make_etag(version, report["explanation"], report["suggestions"], REPORT_VERSION)
+    return report
+
+
+def _suggestion_lines(result: dict) -> list:
+    if result.get("actionable_recommendations"):
+        return [
+            f"{r.get('title', '')}: {r.get('description', '')}" if isinstance(r, dict) else str(r)
+            for r in result["actionable_recommendations"]
+        ]
+    text = result.get("suggestions_text") or ""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").capitalize()
+
+
+def _cell(value):
+    """Flat value for a table cell; nested values are written as JSON."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _columns(chart_data: list) -> list:
+    columns = []
+    for row in chart_data:
+        columns.extend(key for key in row if key not in columns)
+    return columns
+
+
+def render_csv(report: dict) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([report["title"]])
+    writer.writerow([])
+    writer.writerow(["metric", "value"])
+    writer.writerows([name, _cell(value)] for name, value in report["key_metrics"].items())
+    writer.writerow([])
+    columns = _columns(report["chart_data"])
+    writer.writerow(columns)
+    writer.writerows([_cell(row.get(c)) for c in columns] for row in report["chart_data"])
+    writer.writerow([])
+    writer.writerow(["insight", report["insight"]])
+    writer.writerow(["ai_explanation", report["explanation"] or ""])
+    writer.writerows(["ai_suggestion", line] for line in report["suggestions"])
+    # BOM so Excel opens the peso signs as UTF-8
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def render_xlsx(report: dict) -> bytes:
+    from openpyxl import Workbook
+
+    # Write-only: rows stream to the file instead of building a cell grid in memory
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet("Summary")
+    summary.append([report["title"]])
+    summary.append([])
+    summary.append(["Metric", "Value"])
+    for name, value in report["key_metrics"].items():
+        summary.append([_label(name), _cell(value)])
+    summary.append([])
+    summary.append(["Insight", report["insight"]])
+    summary.append(["AI explanation", report["explanation"] or "Not generated yet"])
+    for line in report["suggestions"]:
+        summary.append(["AI suggestion", line])
+
+    chart = workbook.create_sheet("Chart data")
+    columns = _columns(report["chart_data"])
+    chart.append(columns)
+    for row in report["chart_data"]:
+        chart.append([_cell(row.get(c)) for c in columns])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_text(text) -> str:
+    # The standard PDF fonts have no peso glyph, and Paragraph reads markup
+    from xml.sax.saxutils import escape
+    return escape(str(text)).replace("₱", "PHP ").replace("\n", "<br/>")
+
+
+def _pdf_number(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return _pdf_text(_cell(value))
+
+
+def _pdf_chart(report: dict, width: float):
+    """Line chart of the scenario's main series, the one downsampling follows."""
+    from reportlab.graphics.shapes import Drawing
+    from reportlab.graphics.charts.lineplots import LinePlot
+
+    x_field, y_field, _ = CHART_SERIES[report["scenario_type"]]
+    points = [
+        (row[x_field], row[y_field]) for row in report["chart_data"]
+        if isinstance(row.get(x_field), (int, float)) and isinstance(row.get(y_field), (int, float))
+    ]
+    if len(points) < 2:
+        return None
+
+    drawing = Drawing(width, 180)
+    plot = LinePlot()
+    plot.x, plot.y, plot.width, plot.height = 50, 25, width - 70, 140
+    plot.data = [points]
+    plot.lines[0].strokeWidth = 1.5
+    plot.xValueAxis.labels.fontSize = 7
+    plot.yValueAxis.labels.fontSize = 7
+    plot.yValueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    drawing.add(plot)
+    return drawing
+
+
+def render_pdf(report: dict) -> bytes:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, ListFlowable
+
+    styles = getSampleStyleSheet()
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(buffer, pagesize=A4, title=report["title"])
+    table_style = TableStyle([
+        ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e5e7eb")),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("ALIGN", (1, 1), (-1, -1), "RIGHT")
+    ])
+
+    story = [Paragraph(_pdf_text(report["title"]), styles["Title"])]
+    chart = _pdf_chart(report, document.width)
+    if chart is not None:
+        story.append(chart)
+
+    story.append(Paragraph("Key Metrics", styles["Heading2"]))
+    metrics = [["Metric", "Value"]] + [[_label(k), _pdf_number(v)] for k, v in report["key_metrics"].items()]
+    story.append(Table(metrics, hAlign="LEFT", style=table_style))
+
+    story.append(Paragraph("Insight", styles["Heading2"]))
+    story.append(Paragraph(_pdf_text(report["insight"]), styles["BodyText"]))
+    story.append(Paragraph("AI-Powered Explanation", styles["Heading2"]))
+    story.append(Paragraph(_pdf_text(report["explanation"] or "Not generated yet."), styles["BodyText"]))
+    if report["suggestions"]:
+        story.append(Paragraph("AI-Powered Suggestions", styles["Heading2"]))
+        story.append(ListFlowable(
+            [Paragraph(_pdf_text(line), styles["BodyText"]) for line in report["suggestions"]],
+            bulletType="bullet"
+        ))
+
+    columns = _columns(report["chart_data"])
+    if columns:
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("Projection", styles["Heading2"]))
+        rows = [[_label(c) for c in columns]] + [
+            [_pdf_number(row.get(c, "")) for c in columns] for row in report["chart_data"]
+        ]
+        # Header row repeats on every page of a long projection
+        story.append(Table(rows, repeatRows=1, hAlign="LEFT", style=table_style))
+
+    document.build(story)
+    return buffer.getvalue()
+
+
+RENDERERS = {"pdf": render_pdf, "csv": render_csv, "xlsx": render_xlsx}
+
+
+def render_report(report: dict, report_format: str) -> bytes:
+    """Rendered report, from the cache when this version was rendered before."""
+    key = f"{report['scenario_type']}:{report['scenario_id']}:{report_format}:{report['version']}"
+    content = report_cache.get(key)
+    if content is None:
+        content = RENDERERS[report_format](report)
+        report_cache.put(key, content)
+    return content
+
+
+def report_filename(scenario_type: str, scenario_id: int, report_format: str) -> str:
+    return f"{scenario_type}-{scenario_id}.{report_format}"
+
+
+class _ChunkStream(io.RawIOBase):
+    """Write-only, unseekable sink whose contents are drained after every file of the ZIP."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_reports_zip(scenario_type: str, scenario_ids: list, report_format: str):
+    """
+    Yield a ZIP of the reports of `scenario_ids`, one report at a time.
+
+    Only the report being written is held in memory; ids that don't exist are listed
+    in missing.txt instead of failing the whole download.
+    """
+    stream = _ChunkStream()
+    # PDF and XLSX are already compressed
+    compression = zipfile.ZIP_DEFLATED if report_format == "csv" else zipfile.ZIP_STORED
+    missing = []
+    with zipfile.ZipFile(stream, "w", compression=compression) as archive:
+        for scenario_id in dict.fromkeys(scenario_ids):
+            report = load_report(scenario_type, scenario_id)
+            if report is None:
+                missing.append(scenario_id)
+                continue
+            archive.writestr(report_filename(scenario_type, scenario_id, report_format), render_report(report, report_format))
+            yield stream.drain()
+        if missing:
+            archive.writestr("missing.txt", "\n".join(str(i) for i in missing) + "\n")
+    yield stream.drain()
@@ -0,0 +1,169 @@
+import os
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, func, or_, update
+from sqlmodel import select
+
+import app.config
+from app.db.session import engine, get_session
+from app.models.background_job_model import BackgroundJobModel
+from app.services.background_jobs import register_runner, submit_job, set_job_status, shutting_down
+from app.services.bulk_simulation import simulate_records
+from app.services.scenarios import SCENARIOS
+from app.services.simulation_logic import ENGINE_VERSION
+from app.services.simulation_pool import run_simulation, estimate_cost
+from app.services.tracing import span
+
+# Re-simulation of stored scenarios after the engine (ENGINE_VERSION) or its assumptions
+# change. A job walks one scenario table in id order, a chunk at a time: it reads only
+# the input columns of rows whose results are stale, simulates the chunk as one task
+# through the scenario's batch simulator (rows sharing a horizon are one numpy grid; in
+# the simulation process pool when it's large, so request threads keep the GIL),
+# and writes the results back in one executemany UPDATE per chunk. Progress, including
+# the last id done, is saved after every chunk, so a job resumed after a restart
+# continues where it stopped.
+RESIMULATION_CHUNK_SIZE = int(os.getenv("RESIMULATION_CHUNK_SIZE", "200"))
+# Pause between chunks, leaving the database and the pool to interactive requests
+RESIMULATION_PAUSE_SECONDS = float(os.getenv("RESIMULATION_PAUSE_SECONDS", "0.05"))
+
+JOB_TYPE = "resimulate"
+# Ids of rows that failed to re-simulate, kept in the progress up to this many
+MAX_REPORTED_FAILURES = 20
+
+logger = logging.getLogger(__name__)
+
+# One job at a time: they all contend for the same pool and tables
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resimulate")
+
+
+def _stale(model):
+    return or_(model.engine_version.is_(None), model.engine_version != ENGINE_VERSION)
+
+
+def start_resimulation(scenario_type: str, force: bool = False) -> int:
+    """
+    Queue a re-simulation of the scenario table and return its job id.
+
+    Only rows simulated by another ENGINE_VERSION are recomputed, unless `force` (e.g.
+    after an assumption changed without a version bump). A job already queued or
+    running for the table is returned instead of starting a second one.
+    """
+    with get_session() as session:
+        running = session.exec(
+            select(BackgroundJobModel)
+            .where(BackgroundJobModel.job_type == JOB_TYPE)
+            .where(BackgroundJobModel.scenario_type == scenario_type)
+            .where(BackgroundJobModel.status.in_(["queued", "running"]))
+        ).first()
+        if running:
+            return running.id
+        job = BackgroundJobModel(job_type=JOB_TYPE, scenario_type=scenario_type, result={"force": force})
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    submit_job(job_id, JOB_TYPE)
+    return job_id
+
+
+def _chunk_cost(spec: dict, records: list) -> int:
+    horizon = 0
+    for _, raw in records:
+        try:
+            horizon += spec["horizon"](raw)
+        except (KeyError, TypeError):
+            pass
+    return estimate_cost(horizon)
+
+
+def _run_resimulation(job_id: int):
+    with span("background job", {"job.id": job_id, "job.type": JOB_TYPE}):
+        with get_session() as session:
+            job = session.get(BackgroundJobModel, job_id)
+            if not job or job.status != "queued":
+                return
+            scenario_type, params = job.scenario_type, dict(job.result or {})
+
+        try:
+            progress = _resimulate(job_id, scenario_type, params)
+            if progress is None:
+                # Stopped by a shutdown; the progress saved so far lets the next start resume
+                return
+        except Exception as e:
+            logger.error(f"Re-simulation job {job_id} ({scenario_type}) failed: {e}")
+            set_job_status(job_id, "failed", error=str(e))
+            return
+        set_job_status(job_id, "completed", result={**params, "progress": progress})
+
+
+def _resimulate(job_id: int, scenario_type: str, params: dict) -> dict:
+    spec = SCENARIOS[scenario_type]
+    model = spec["model"]
+    table = model.__table__
+    # Inputs only: the stale chart_data is never read
+    input_columns = [table.c[name] for name in spec["input"].model_fields if name in table.c]
+    condition = [] if params.get("force") else [_stale(model)]
+
+    progress = params.get("progress") or {"last_id": 0, "processed": 0, "updated": 0, "failed": 0, "failed_ids": []}
+    with get_session() as session:
+        remaining = session.exec(
+            select(func.count()).select_from(table).where(table.c.id > progress["last_id"], *condition)
+        ).one()
+    progress.update(total=progress["processed"] + remaining, engine_version=ENGINE_VERSION)
+    set_job_status(job_id, "running", result={**params, "progress": progress})
+
+    # Columns to set come from each parameter set; b_id avoids clashing with the id column
+    statement = update(table).where(table.c.id == bindparam("b_id"))
+    while True:
+        with get_session() as session:
+            rows = session.exec(
+                select(table.c.id, *input_columns)
+                .where(table.c.id > progress["last_id"], *condition)
+                .order_by(table.c.id)
+                .limit(RESIMULATION_CHUNK_SIZE)
+            ).all()
+        if not rows:
+            return progress
+        if shutting_down():
+            return None
+
+        # Columns added after a row was saved are NULL there: let the input defaults apply
+        records = [
+            (row.id, {name: value for name, value in row._mapping.items() if name != "id" and value is not None})
+            for row in rows
+        ]
+        results = run_simulation(
+            simulate_records, _chunk_cost(spec, records), scenario_type=scenario_type, records=records
+        )
+
+        now = datetime.utcnow()
+        updates = [
+            {
+                "b_id": r["record"],
+                "chart_data": r["chart_data"],
+                "key_metrics": r["key_metrics"],
+                "insight": r["insight"],
+                "engine_version": ENGINE_VERSION,
+                # A new revision: ETags and cached reports of the scenario change with it
+                "updated_at": now
+            }
+            for r in results if r["status"] == "success"
+        ]
+        if updates:
+            with engine.begin() as connection:
+                connection.execute(statement, updates)
+
+        failed = [r["record"] for r in results if r["status"] != "success"]
+        progress["last_id"] = rows[-1].id
+        progress["processed"] += len(rows)
+        progress["updated"] += len(updates)
+        progress["failed"] += len(failed)
+        progress["failed_ids"] = (progress["failed_ids"] + failed)[:MAX_REPORTED_FAILURES]
+        set_job_status(job_id, "running", result={**params, "progress": progress})
+        time.sleep(RESIMULATION_PAUSE_SECONDS)
+
+
+register_runner(JOB_TYPE, _executor, _run_resimulation)
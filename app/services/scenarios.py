@@ -0,0 +1,52 @@
+from app.models.budgeting_optimization_model import BudgetOptimizationModel
+from app.models.debt_management_model import DebtManagementModel
+from app.models.wealth_building_model import WealthBuildingModel
+from app.schemas.budget_optimization_schema import BudgetOptimizationInput
+from app.schemas.debt_management_schema import DebtManagementInput
+from app.schemas.wealth_building_schema import WealthBuildingInput
+from app.services.simulation_logic import (
+    simulate_budget_optimization,
+    simulate_budget_optimization_batch,
+    simulate_debt_management,
+    simulate_debt_management_batch,
+    simulate_wealth_building,
+    simulate_wealth_building_batch
+)
+
+# The scenario types by their URL name, for the features that work on any of them
+# (comparison, bulk simulation, re-simulation, export, background jobs):
+#   input           input schema
+#   model           table the saved scenarios live in
+#   simulate        simulator, and simulate_batch its form for many inputs at once
+#   x_axis          x-axis of its chart_data
+#   horizon         projection horizon in months, for the simulation pool's cost estimate
+#   x_axis_inputs   inputs that set the unit of the x-axis, so compared variants must agree
+SCENARIOS = {
+    "budget-optimization": {
+        "input": BudgetOptimizationInput,
+        "model": BudgetOptimizationModel,
+        "simulate": simulate_budget_optimization,
+        "simulate_batch": simulate_budget_optimization_batch,
+        "x_axis": "month",
+        "horizon": lambda payload: payload["projection_months"],
+        "x_axis_inputs": ()
+    },
+    "debt-management": {
+        "input": DebtManagementInput,
+        "model": DebtManagementModel,
+        "simulate": simulate_debt_management,
+        "simulate_batch": simulate_debt_management_batch,
+        "x_axis": "period",
+        "horizon": lambda payload: payload["projection_period"] * (len(payload["loans"]) + 1),
+        "x_axis_inputs": ("granularity",)
+    },
+    "wealth-building": {
+        "input": WealthBuildingInput,
+        "model": WealthBuildingModel,
+        "simulate": simulate_wealth_building,
+        "simulate_batch": simulate_wealth_building_batch,
+        "x_axis": "year",
+        "horizon": lambda payload: (payload["target_age"] - payload["current_age"]) * 12,
+        "x_axis_inputs": ()
+    }
+}
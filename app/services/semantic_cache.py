@@ -0,0 +1,144 @@
+import os
+import re
+import math
+import threading
+
+import numpy as np
+
+import app.config
+
+# Reuse AI text across near-identical scenarios instead of paying for a fresh LLM call.
+# Amounts are compared on a log scale (tolerance ~ relative difference) and rates in
+# units of RATE_SCALE, so the default tolerance of 0.02 means "within ~2% on every amount
+# and within 0.2 percentage points on every rate".
+AI_SEMANTIC_CACHE_TOLERANCE = float(os.getenv("AI_SEMANTIC_CACHE_TOLERANCE", "0.02"))
+AI_SEMANTIC_CACHE_SIZE = int(os.getenv("AI_SEMANTIC_CACHE_SIZE", "512"))
+RATE_SCALE = 0.1
+
+_PLACEHOLDER = "\x00{}\x00"
+
+
+def feature_vector(amounts=(), rates=()) -> np.ndarray:
+    """Map prompt-relevant numbers into the space where the tolerance is measured."""
+    amounts = np.asarray(amounts, dtype=float)
+    rates = np.asarray(rates, dtype=float)
+    return np.concatenate([
+        np.sign(amounts) * np.log1p(np.abs(amounts)),
+        rates / RATE_SCALE
+    ])
+
+
+def _formats(kind: str, value: float) -> list:
+    # Every spelling of a number the LLM is likely to echo back, most specific first
+    if kind == "peso":
+        return [f"₱{value:,.2f}", f"₱{value:,.0f}", f"{value:,.2f}"]
+    if kind == "percent":
+        return [f"{value:.2%}", f"{value:.1%}", f"{value:.0%}"]
+    if kind == "months":
+        return [f"{value:.1f} months", f"{value:.0f} months"]
+    return [str(value)]
+
+
+def _replace_number(text: str, spelling: str, replacement: str) -> str:
+    # Only whole numbers: "6 months" must not match inside "16 months"
+    pattern = r"(?<![\d.,])" + re.escape(spelling) + r"(?![\d]|[.,]\d)"
+    return re.sub(pattern, lambda _: replacement, text)
+
+
+def _templatize(text: str, values: dict) -> str:
+    for name, (kind, value) in values.items():
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            continue
+        for i, spelling in enumerate(_formats(kind, value)):
+            text = _replace_number(text, spelling, _PLACEHOLDER.format(f"{name}:{i}"))
+    return text
+
+
+def _render(template: str, values: dict) -> str:
+    for name, (kind, value) in values.items():
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            continue
+        for i, spelling in enumerate(_formats(kind, value)):
+            template = template.replace(_PLACEHOLDER.format(f"{name}:{i}"), spelling)
+    return template
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of AI text, partitioned by namespace and categorical features.
+
+    Each partition keeps its feature vectors in one array, so a lookup is a single
+    vectorized distance computation.
+    """
+
+    def __init__(self, tolerance: float = AI_SEMANTIC_CACHE_TOLERANCE, max_entries: int = AI_SEMANTIC_CACHE_SIZE):
+        self.tolerance = tolerance
+        self.max_entries = max_entries
+        self._partitions = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def _quantize(self, vector: np.ndarray) -> tuple:
+        return tuple(np.round(vector / self.tolerance).astype(int).tolist()) if self.tolerance > 0 else tuple(vector.tolist())
+
+    def lookup(self, namespace: str, category, vector: np.ndarray, values: dict):
+        """Return cached text re-templated with `values`, or None when nothing is close enough."""
+        with self._lock:
+            self.lookups += 1
+            partition = self._partitions.get((namespace, category))
+            if not partition or not partition["templates"]:
+                return None
+
+            vectors = partition["vectors"]
+            if vectors.shape[1] != vector.shape[0]:
+                return None
+            distances = np.abs(vectors - vector).max(axis=1)
+            nearest = int(distances.argmin())
+            if distances[nearest] > self.tolerance:
+                return None
+
+            self.hits += 1
+            template = partition["templates"][nearest]
+
+        return _render(template, values)
+
+    def store(self, namespace: str, category, vector: np.ndarray, values: dict, text: str):
+        template = _templatize(text, values)
+        key = self._quantize(vector)
+
+        with self._lock:
+            partition = self._partitions.setdefault(
+                (namespace, category),
+                {"keys": [], "templates": [], "vectors": np.empty((0, vector.shape[0]))}
+            )
+            if key in partition["keys"]:
+                index = partition["keys"].index(key)
+                partition["templates"][index] = template
+                partition["vectors"][index] = vector
+                return
+
+            partition["keys"].append(key)
+            partition["templates"].append(template)
+            partition["vectors"] = np.vstack([partition["vectors"], vector])
+
+            # Drop the oldest entries once the partition is full
+            overflow = len(partition["keys"]) - self.max_entries
+            if overflow > 0:
+                del partition["keys"][:overflow]
+                del partition["templates"][:overflow]
+                partition["vectors"] = partition["vectors"][overflow:]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tolerance": self.tolerance,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0,
+                "partitions": len(self._partitions),
+                "entries": sum(len(p["keys"]) for p in self._partitions.values())
+            }
+
+
+semantic_cache = SemanticCache()
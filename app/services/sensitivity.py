@@ -0,0 +1,103 @@
+import numpy as np
+
+from app.services.simulation_logic import project_wealth
+
+# One-at-a-time sensitivity of the wealth-building projection, for tornado charts. Every
+# assumption is moved down and up by its step while the others stay at the base case, and
+# all the variants (plus the base) are evaluated together as rows of one (variants, months)
+# grid, through the same project_wealth as simulate_wealth_building.
+
+# input -> (step, whether the step is relative to the base value, lowest allowed value)
+SENSITIVITY_STEPS = {
+    "expected_annual_return": (0.01, False, None),
+    "inflation_rate": (0.01, False, None),
+    "annual_contribution_increase": (0.01, False, -0.99),
+    "advisor_fee_percent": (0.5, False, 0),
+    "monthly_contribution": (0.10, True, 0)
+}
+
+
+def _outcomes(payload: dict, variants: dict) -> dict:
+    """Real final value and real shortfall of every variant; `variants` holds one array per input."""
+    projection = project_wealth(
+        payload["current_savings"],
+        variants["monthly_contribution"],
+        variants["annual_contribution_increase"],
+        (variants["expected_annual_return"] - variants["advisor_fee_percent"] / 100) / 12,
+        variants["inflation_rate"],
+        payload["target_age"] - payload["current_age"]
+    )
+    inflation_discount = projection["inflation_discount"]
+    real_final_value = (projection["FV_initial"] + projection["FV_contributions"]) * inflation_discount
+    return {
+        "real_final_value": real_final_value,
+        "shortfall": payload["target_amount"] * inflation_discount - real_final_value
+    }
+
+
+def _bounds(name: str, base: float, step: float) -> tuple:
+    _, relative, floor = SENSITIVITY_STEPS[name]
+    delta = abs(base) * step if relative else step
+    low, high = base - delta, base + delta
+    if floor is not None:
+        low = max(low, floor)
+    return low, high
+
+
+def wealth_sensitivity(payload: dict, steps: dict = None) -> dict:
+    """
+    Swing in real final value and real shortfall when each assumption moves down and up.
+
+    `steps` overrides the default step of any input in SENSITIVITY_STEPS (a fraction of
+    the base value for monthly_contribution, an absolute change otherwise). Drivers are
+    ranked by the size of their shortfall swing, largest first.
+    """
+    steps = {name: (steps or {}).get(name, default[0]) for name, default in SENSITIVITY_STEPS.items()}
+    names = list(SENSITIVITY_STEPS)
+    base = {name: float(payload[name] or 0) for name in names}
+
+    # Row 0 is the base case, then a low and a high row per input
+    variants = {name: np.full(1 + 2 * len(names), base[name]) for name in names}
+    bounds = {}
+    for index, name in enumerate(names):
+        bounds[name] = _bounds(name, base[name], steps[name])
+        variants[name][1 + 2 * index] = bounds[name][0]
+        variants[name][2 + 2 * index] = bounds[name][1]
+
+    outcomes = _outcomes(payload, variants)
+    real, shortfall = outcomes["real_final_value"], outcomes["shortfall"]
+
+    drivers = []
+    for index, name in enumerate(names):
+        low, high = 1 + 2 * index, 2 + 2 * index
+        drivers.append({
+            "input": name,
+            "base_value": base[name],
+            "low_value": round(bounds[name][0], 6),
+            "high_value": round(bounds[name][1], 6),
+            "real_final_value": {
+                "low": round(float(real[low]), 2),
+                "high": round(float(real[high]), 2),
+                "delta_low": round(float(real[low] - real[0]), 2),
+                "delta_high": round(float(real[high] - real[0]), 2)
+            },
+            "shortfall": {
+                "low": round(float(shortfall[low]), 2),
+                "high": round(float(shortfall[high]), 2),
+                "delta_low": round(float(shortfall[low] - shortfall[0]), 2),
+                "delta_high": round(float(shortfall[high] - shortfall[0]), 2)
+            },
+            "swing": round(float(abs(shortfall[high] - shortfall[low])), 2)
+        })
+    drivers.sort(key=lambda driver: driver["swing"], reverse=True)
+    for rank, driver in enumerate(drivers, start=1):
+        driver["rank"] = rank
+
+    return {
+        "base": {
+            "real_final_value": round(float(real[0]), 2),
+            "shortfall": round(float(shortfall[0]), 2)
+        },
+        "steps": steps,
+        "drivers": drivers
+    }
@@ -1,3 +1,29 @@
+import numpy as np
+
+from app.services.money import to_centavos, to_pesos, interest, amortized_payment, compound
+from app.services.factor_tables import growth, discount, annuity, growth_power_rows
+from app.services.cashflow_engine import projection_start, project_daily_cash_flows, monthly_rollup
+from app.services.simulation_result import (
+    ChartSeries, BUDGET_CHART_FIELDS, DEBT_CHART_FIELDS, DEBT_AGGREGATED_CHART_FIELDS, WEALTH_CHART_FIELDS
+)
+
+# Bump whenever the simulators give different results for the same inputs; it is part of
+# the simulate ETags, so clients don't keep results from an older engine.
+# 2: compound factors come from the shared factor tables (rates keyed at fixed precision)
+ENGINE_VERSION = "2"
+
+# Months in each reported period of the debt projection
+DEBT_PERIOD_MONTHS = {"monthly": 1, "quarterly": 3, "annual": 12}
+# Optional arguments of simulate_wealth_building, for batch inputs that leave them out
+WEALTH_DEFAULTS = {
+    "annual_contribution_increase": 0,
+    "expected_annual_return": 0.07,
+    "inflation_rate": 0.035,
+    "risk_profile": "Moderate",
+    "advisor_fee_percent": 0
+}
+
+
 def simulate_budget_optimization(
     scenario_type,
     user_type,
@@ -5,73 +31,171 @@ def simulate_budget_optimization(
     income,
     expenses,
     savings_goals,
-    what_if_factors=None
+    what_if_factors=None,
+    resolution="monthly",
+    start_date=None,
+    opening_balance=0,
+    include_daily_series=False
 ):
+    return simulate_budget_optimization_batch([{
+        "scenario_type": scenario_type,
+        "user_type": user_type,
+        "projection_months": projection_months,
+        "income": income,
+        "expenses": expenses,
+        "savings_goals": savings_goals,
+        "what_if_factors": what_if_factors,
+        "resolution": resolution,
+        "start_date": start_date,
+        "opening_balance": opening_balance,
+        "include_daily_series": include_daily_series
+    }])[0]
+
+
+def simulate_budget_optimization_batch(payloads: list) -> list:
+    """
+    Simulate many budget inputs (simulate_budget_optimization arguments) in one pass.
+
+    Inputs with the same horizon are projected together as rows of one (inputs, months)
+    grid, and daily inputs with the same start month share one calendar. Each result is
+    the one simulating its input alone gives.
+    """
+    budgets = [_budget_terms(payload) for payload in payloads]
+    charts = [
+        (ChartSeries({"month": np.arange(0)}, fields=BUDGET_CHART_FIELDS[:1]), None)
+        for _ in payloads
+    ]
+
+    groups = {}
+    for index, (payload, budget) in enumerate(zip(payloads, budgets)):
+        months = payload["projection_months"]
+        if months > 0:
+            start = projection_start(payload.get("start_date")) if budget["resolution"] == "daily" else None
+            groups.setdefault((months, start), []).append(index)
+
+    for (months, start), rows in groups.items():
+        if start is None:
+            for index, chart_data in zip(rows, _budget_monthly_charts([budgets[i] for i in rows], months)):
+                charts[index] = (chart_data, None)
+            continue
+        # Schedule paydays and bills on the calendar, then roll the days up into months
+        projection = project_daily_cash_flows(
+            [
+                {
+                    "income": payloads[i]["income"],
+                    "expenses": payloads[i]["expenses"],
+                    "savings_goals": payloads[i]["savings_goals"],
+                    "what_if_factors": budgets[i]["what_if_factors"]
+                }
+                for i in rows
+            ],
+            months,
+            start,
+            [payloads[i].get("opening_balance") or 0 for i in rows]
+        )
+        for household, index in enumerate(rows):
+            charts[index] = monthly_rollup(
+                projection, months, household, include_daily_series=payloads[index].get("include_daily_series", False)
+            )
+
+    return [
+        _budget_result(payload, budget, chart_data, daily_series)
+        for payload, budget, (chart_data, daily_series) in zip(payloads, budgets, charts)
+    ]
+
+
+def _budget_terms(payload: dict) -> dict:
     # Unpack income
+    income = payload["income"]
     monthly_gross_income = income.get("monthly_gross_income", 0)
     other_monthly_income = income.get("other_monthly_income", 0)
-    total_income = monthly_gross_income + other_monthly_income
 
     # Unpack expenses
+    expenses = payload["expenses"]
     fixed = expenses.get("fixed_needs", {})
     variable = expenses.get("variable_needs", {})
     wants = expenses.get("wants_discretionary", {})
 
-    fixed_total = sum(fixed.values())
-    variable_total = sum(variable.values())
-    wants_total = sum(wants.values())
-
     # Unpack savings goals
-    target_monthly_savings = savings_goals.get("target_monthly_savings", 0)
-    emergency_fund_target = savings_goals.get("emergency_fund_target", 0)
+    savings_goals = payload["savings_goals"]
 
     # Apply default what-if factors if none are provided
+    what_if_factors = payload.get("what_if_factors")
     if what_if_factors is None:
         what_if_factors = {}
-    
+
     # Unpack what-if factors with default values of 0
-    income_growth_rate = what_if_factors.get("income_growth_rate", 0)
-    wants_reduction_rate = what_if_factors.get("wants_reduction_rate", 0)
-    savings_increase_rate = what_if_factors.get("savings_increase_rate", 0)
-
-    # Initialize dynamic variables for the loop
-    current_monthly_income = total_income
-    current_wants_total = wants_total
-    current_target_savings = target_monthly_savings
-
-    # Prepare chart data for each month
-    chart_data = []
-    cumulative_savings = 0
-    cumulative_deficit = 0
-    for month in range(1, projection_months + 1):
-        # Apply recurring what-if factors from the second month onwards
-        if month > 1:
-            current_monthly_income *= (1 + income_growth_rate)
-            current_wants_total *= (1 - wants_reduction_rate)
-            current_target_savings *= (1 + savings_increase_rate)
-
-        total_expenses = fixed_total + variable_total + current_wants_total
-        net_cash_flow = current_monthly_income - total_expenses - current_target_savings
-
-        if net_cash_flow >= 0:
-            cumulative_savings += net_cash_flow
-        else:
-            cumulative_deficit += abs(net_cash_flow)
-
-        chart_data.append({
-            "month": month,
-            "total_income": current_monthly_income,
-            "fixed_expenses": fixed_total,
-            "variable_expenses": variable_total,
-            "wants_expenses": current_wants_total,
-            "net_cash_flow": net_cash_flow,
-            "cumulative_savings": cumulative_savings,
-            "cumulative_deficit": cumulative_deficit
-        })
-
-    # Key metrics
-    avg_net_cash_flow = sum([m["net_cash_flow"] for m in chart_data]) / projection_months if projection_months else 0
-    
+    return {
+        "resolution": payload.get("resolution", "monthly"),
+        "total_income": monthly_gross_income + other_monthly_income,
+        "fixed_total": sum(fixed.values()),
+        "variable_total": sum(variable.values()),
+        "wants": wants,
+        "wants_total": sum(wants.values()),
+        "target_monthly_savings": savings_goals.get("target_monthly_savings", 0),
+        "emergency_fund_target": savings_goals.get("emergency_fund_target", 0),
+        "what_if_factors": what_if_factors,
+        "income_growth_rate": what_if_factors.get("income_growth_rate", 0),
+        "wants_reduction_rate": what_if_factors.get("wants_reduction_rate", 0),
+        "savings_increase_rate": what_if_factors.get("savings_increase_rate", 0)
+    }
+
+
+def _budget_monthly_charts(budgets: list, months: int) -> list:
+    """Monthly chart_data of budgets with the same horizon, projected as one grid."""
+    def column(name):
+        return np.array([budget[name] for budget in budgets], dtype=float)[:, None]
+
+    def rates(name, sign=1):
+        return [sign * budget[name] for budget in budgets]
+
+    # Recurring what-if factors compound from the second month onwards; every monthly
+    # amount is rounded to the centavo once, so the running totals add up exactly
+    month = np.arange(1, months + 1)
+    monthly_income = to_centavos(column("total_income") * growth_power_rows(rates("income_growth_rate"), months))
+    monthly_wants = to_centavos(column("wants_total") * growth_power_rows(rates("wants_reduction_rate", -1), months))
+    monthly_savings = to_centavos(
+        column("target_monthly_savings") * growth_power_rows(rates("savings_increase_rate"), months)
+    )
+    fixed_c = to_centavos(column("fixed_total"))
+    variable_c = to_centavos(column("variable_total"))
+
+    net_cash_flows = monthly_income - fixed_c - variable_c - monthly_wants - monthly_savings
+    cumulative_savings = np.cumsum(np.where(net_cash_flows >= 0, net_cash_flows, 0), axis=1)
+    cumulative_deficit = np.cumsum(np.where(net_cash_flows < 0, -net_cash_flows, 0), axis=1)
+    return [
+        ChartSeries(
+            {
+                "month": month,
+                "total_income": monthly_income[row],
+                "wants_expenses": monthly_wants[row],
+                "net_cash_flow": net_cash_flows[row],
+                "cumulative_savings": cumulative_savings[row],
+                "cumulative_deficit": cumulative_deficit[row]
+            },
+            constants={"fixed_expenses": int(fixed_c[row, 0]), "variable_expenses": int(variable_c[row, 0])},
+            money=BUDGET_CHART_FIELDS[1:],
+            fields=BUDGET_CHART_FIELDS
+        )
+        for row in range(len(budgets))
+    ]
+
+
+def _budget_result(payload: dict, budget: dict, chart_data: ChartSeries, daily_series) -> dict:
+    projection_months = payload["projection_months"]
+    total_income = budget["total_income"]
+    wants = budget["wants"]
+    wants_total = budget["wants_total"]
+    emergency_fund_target = budget["emergency_fund_target"]
+    current_target_savings = budget["target_monthly_savings"] * growth(
+        budget["savings_increase_rate"], max(projection_months - 1, 0)
+    )
+
+    # Key metrics, straight from the columns
+    avg_net_cash_flow = (
+        to_pesos(chart_data.columns["net_cash_flow"].sum()) / projection_months if len(chart_data) else 0
+    )
+
     # Use the initial values for the first month for an accurate metric
     discretionary_spending_percent = wants_total / total_income if total_income else 0
     highest_discretionary_category = max(wants, key=wants.get) if wants else None
@@ -86,6 +210,10 @@ def simulate_budget_optimization(
         "highest_discretionary_category": highest_discretionary_category,
         "projected_emergency_fund_months": projected_emergency_fund_months
     }
+    if "min_balance" in chart_data.columns:
+        # Daily resolution also surfaces the cash crunches between paydays
+        key_metrics["lowest_balance"] = to_pesos(chart_data.columns["min_balance"].min())
+        key_metrics["days_negative"] = int(chart_data.columns["days_negative"].sum())
 
     # Insight
     insight = (
@@ -111,13 +239,16 @@ def simulate_budget_optimization(
         "status": "success",
         "data": {
             "inputs_received": {
-                "scenario_type": scenario_type,
-                "user_type": user_type,
+                "scenario_type": payload["scenario_type"],
+                "user_type": payload["user_type"],
                 "projection_months": projection_months,
-                "income": income,
-                "expenses": expenses,
-                "savings_goals": savings_goals,
-                "what_if_factors": what_if_factors
+                "income": payload["income"],
+                "expenses": payload["expenses"],
+                "savings_goals": payload["savings_goals"],
+                "what_if_factors": budget["what_if_factors"],
+                "resolution": budget["resolution"],
+                "start_date": payload.get("start_date"),
+                "opening_balance": payload.get("opening_balance", 0)
             },
             "chart_data": chart_data,
             "key_metrics": key_metrics,
@@ -125,6 +256,8 @@ def simulate_budget_optimization(
             "show_my_math": show_my_math
         }
     }
+    if daily_series is not None:
+        response["data"]["daily_series"] = daily_series
 
     return response
 
@@ -138,90 +271,143 @@ def simulate_debt_management(
     business_financials,
     growth_needs,
     proposed_financing,
-    reinvestment_rate
+    reinvestment_rate,
+    granularity="monthly"
 ):
-    # Unpack business financials
-    avg_monthly_revenue = business_financials.get("avg_monthly_revenue", 0)
-    avg_monthly_operating_expenses = business_financials.get("avg_monthly_operating_expenses", 0)
-    starting_cash = business_financials.get("current_cash_reserves", 0)
+    return simulate_debt_management_batch([{
+        "scenario_type": scenario_type,
+        "user_type": user_type,
+        "projection_period": projection_period,
+        "loans": loans,
+        "business_financials": business_financials,
+        "growth_needs": growth_needs,
+        "proposed_financing": proposed_financing,
+        "reinvestment_rate": reinvestment_rate,
+        "granularity": granularity
+    }])[0]
+
+
+def simulate_debt_management_batch(payloads: list) -> list:
+    """
+    Simulate many debt inputs (simulate_debt_management arguments) in one pass.
+
+    A loan that appears in several inputs, e.g. in variants of one business, is amortized
+    once, and inputs with the same horizon share one (inputs, months) grid of cash
+    positions. Each result is the one simulating its input alone gives.
+    """
+    loan_flows = {}
+    debts = [_debt_terms(payload, loan_flows) for payload in payloads]
+    cash_positions = [None] * len(payloads)
+
+    groups = {}
+    for index, payload in enumerate(payloads):
+        groups.setdefault(max(payload["projection_period"], 0), []).append(index)
+
+    # Net Cash Position = Starting Cash + Net Operating Cash Flow - Principal, on the monthly grid
+    for months, rows in groups.items():
+        periods = np.arange(months + 1, dtype=np.int64)
+        starting_cash = np.array([debts[i]["starting_cash"] for i in rows], dtype=np.int64)
+        monthly_change = np.array(
+            [debts[i]["net_operating_cash_flow"] - debts[i]["loan_principal_payments"] for i in rows], dtype=np.int64
+        )
+        grid = starting_cash[:, None] + periods * monthly_change[:, None]
+        for row, index in enumerate(rows):
+            cash_positions[index] = grid[row]
+
+    return [
+        _debt_result(payload, debt, cash)
+        for payload, debt, cash in zip(payloads, debts, cash_positions)
+    ]
 
-    # Unpack growth needs
-    capital_required = growth_needs.get("capital_required", 0)
-    expected_roi = growth_needs.get("expected_roi", 0)
+
+def _loan_flows(loan_flows: dict, principal: int, outstanding: int, monthly_rate: float, term: int) -> tuple:
+    # (payment, interest) of a loan in centavos, memoized in `loan_flows` across a batch
+    key = (principal, outstanding, monthly_rate, term)
+    if key not in loan_flows:
+        loan_flows[key] = (amortized_payment(*key), interest(outstanding, monthly_rate))
+    return loan_flows[key]
+
+
+def _debt_terms(payload: dict, loan_flows: dict) -> dict:
+    business_financials = payload["business_financials"]
+    proposed_financing = payload["proposed_financing"]
 
     # Unpack proposed financing
     proposed_loan_amount = proposed_financing.get("proposed_loan_amount", 0)
     proposed_interest_rate = proposed_financing.get("proposed_annual_interest_rate", 0)
     proposed_loan_term = proposed_financing.get("proposed_loan_term", 0)
 
-    # Prepare loan breakdowns
-    loan_payments = []
-    for loan in loans:
-        principal = loan.get("principal_amount", 0)
-        outstanding = loan.get("outstanding_balance", 0)
-        annual_rate = loan.get("annual_interest_rate", 0)
-        monthly_rate = annual_rate / 12 / 100
-        term = loan.get("remaining_term_months", 1)
-        # Amortization formula
-        if monthly_rate > 0 and term > 0:
-            payment = principal * (monthly_rate * (1 + monthly_rate) ** term) / ((1 + monthly_rate) ** term - 1)
-        else:
-            payment = outstanding / term if term else 0
-        loan_payments.append({
-            "loan_name": loan.get("loan_name", "Loan"),
-            "monthly_payment": payment,
-            "monthly_interest": outstanding * monthly_rate,
-            "monthly_principal": payment - (outstanding * monthly_rate)
-        })
+    # Loan payments in centavos; the principal portion is payment - interest
+    payments = []
+    for loan in payload["loans"]:
+        monthly_rate = loan.get("annual_interest_rate", 0) / 12 / 100
+        payments.append(_loan_flows(
+            loan_flows,
+            int(to_centavos(loan.get("principal_amount", 0))),
+            int(to_centavos(loan.get("outstanding_balance", 0))),
+            monthly_rate,
+            loan.get("remaining_term_months", 1)
+        ))
 
     # Proposed loan breakdown
     if proposed_loan_amount and proposed_loan_term:
         monthly_rate = proposed_interest_rate / 12 / 100
-        if monthly_rate > 0 and proposed_loan_term > 0:
-            proposed_payment = proposed_loan_amount * (monthly_rate * (1 + monthly_rate) ** proposed_loan_term) / ((1 + monthly_rate) ** proposed_loan_term - 1)
-        else:
-            proposed_payment = proposed_loan_amount / proposed_loan_term if proposed_loan_term else 0
-        loan_payments.append({
-            "loan_name": "Proposed Loan",
-            "monthly_payment": proposed_payment,
-            "monthly_interest": proposed_loan_amount * monthly_rate,
-            "monthly_principal": proposed_payment - (proposed_loan_amount * monthly_rate)
-        })
-
-    # Waterfall chart data
-    chart_data = []
-    cash_balance = starting_cash
-    for period in range(1, projection_period + 1):
-        # Calculate total loan payments for this period
-        total_loan_interest = sum(lp["monthly_interest"] for lp in loan_payments)
-        total_loan_principal = sum(lp["monthly_principal"] for lp in loan_payments)
-        total_loan_payment = sum(lp["monthly_payment"] for lp in loan_payments)
-
-        # Cash flows
-        cash_inflow = avg_monthly_revenue
-        cash_outflow = avg_monthly_operating_expenses + total_loan_interest
-        net_operating_cash_flow = cash_inflow - cash_outflow
-        net_cash_position = cash_balance + net_operating_cash_flow - total_loan_principal
-
-        chart_data.append({
-            "period": period,
-            "starting_cash": cash_balance,
-            "revenue": cash_inflow,
-            "operating_expenses": avg_monthly_operating_expenses,
-            "loan_interest_payments": total_loan_interest,
-            "loan_principal_payments": total_loan_principal,
-            "net_operating_cash_flow": net_operating_cash_flow,
-            "net_cash_position": net_cash_position
-        })
-
-        # Update cash balance for next period
-        cash_balance = net_cash_position
-        # Optionally add reinvestment logic here
-
-    # Key metrics
-    total_interest_paid = sum([c["loan_interest_payments"] for c in chart_data])
-    total_principal_paid = sum([c["loan_principal_payments"] for c in chart_data])
-    ending_cash = chart_data[-1]["net_cash_position"] if chart_data else starting_cash
+        proposed_amount = int(to_centavos(proposed_loan_amount))
+        payments.append(_loan_flows(loan_flows, proposed_amount, proposed_amount, monthly_rate, proposed_loan_term))
+
+    # Loan payments are level, so every period has the same flows
+    total_loan_interest = sum(loan_interest for _, loan_interest in payments)
+    total_loan_principal = sum(payment - loan_interest for payment, loan_interest in payments)
+    revenue = int(to_centavos(business_financials.get("avg_monthly_revenue", 0)))
+    operating_expenses = int(to_centavos(business_financials.get("avg_monthly_operating_expenses", 0)))
+    return {
+        "starting_cash": int(to_centavos(business_financials.get("current_cash_reserves", 0))),
+        "revenue": revenue,
+        "operating_expenses": operating_expenses,
+        "loan_interest_payments": total_loan_interest,
+        "loan_principal_payments": total_loan_principal,
+        "net_operating_cash_flow": revenue - operating_expenses - total_loan_interest
+    }
+
+
+def _debt_result(payload: dict, debt: dict, cash_positions) -> dict:
+    projection_period = payload["projection_period"]
+    granularity = payload.get("granularity", "monthly")
+    starting_cash = payload["business_financials"].get("current_cash_reserves", 0)
+
+    # Unpack growth needs
+    capital_required = payload["growth_needs"].get("capital_required", 0)
+    expected_roi = payload["growth_needs"].get("expected_roi", 0)
+
+    total_loan_interest = debt["loan_interest_payments"]
+    total_loan_principal = debt["loan_principal_payments"]
+    flows = {
+        "revenue": debt["revenue"],
+        "operating_expenses": debt["operating_expenses"],
+        "loan_interest_payments": total_loan_interest,
+        "loan_principal_payments": total_loan_principal,
+        "net_operating_cash_flow": debt["net_operating_cash_flow"]
+    }
+    months = max(projection_period, 0)
+    period_months = DEBT_PERIOD_MONTHS[granularity or "monthly"]
+    if period_months > 1:
+        chart_data = _aggregate_debt_periods(cash_positions, flows, period_months)
+    else:
+        chart_data = ChartSeries(
+            {
+                "period": np.arange(1, months + 1, dtype=np.int64),
+                "starting_cash": cash_positions[:-1],
+                "net_cash_position": cash_positions[1:]
+            },
+            constants=flows,
+            money=DEBT_CHART_FIELDS[1:],
+            fields=DEBT_CHART_FIELDS
+        )
+
+    # Key metrics, over every month whatever the reporting periods
+    total_interest_paid = to_pesos(total_loan_interest * months)
+    total_principal_paid = to_pesos(total_loan_principal * months)
+    ending_cash = to_pesos(cash_positions[-1]) if months else starting_cash
 
     key_metrics = {
         "total_interest_paid": total_interest_paid,
@@ -249,14 +435,15 @@ def simulate_debt_management(
         "status": "success",
         "data": {
             "inputs_received": {
-                "scenario_type": scenario_type,
-                "user_type": user_type,
+                "scenario_type": payload["scenario_type"],
+                "user_type": payload["user_type"],
                 "projection_period": projection_period,
-                "loans": loans,
-                "business_financials": business_financials,
-                "growth_needs": growth_needs,
-                "proposed_financing": proposed_financing,
-                "reinvestment_rate": reinvestment_rate
+                "loans": payload["loans"],
+                "business_financials": payload["business_financials"],
+                "growth_needs": payload["growth_needs"],
+                "proposed_financing": payload["proposed_financing"],
+                "reinvestment_rate": payload["reinvestment_rate"],
+                "granularity": granularity
             },
             "chart_data": chart_data,
             "key_metrics": key_metrics,
@@ -268,6 +455,75 @@ def simulate_debt_management(
     return response
 
 
+def _aggregate_debt_periods(cash_positions, flows: dict, period_months: int) -> ChartSeries:
+    """
+    Roll the monthly debt projection up into periods of `period_months` months.
+
+    Flows are summed over each period's months and the cash position is taken at the
+    period's start and end. The last period is shorter when the projection doesn't fill
+    it; end_month tells where each period stops.
+    """
+    months = len(cash_positions) - 1
+    starts = np.arange(0, months, period_months)
+    ends = np.minimum(starts + period_months, months)
+    sums = {
+        name: np.add.reduceat(np.full(months, value, dtype=np.int64), starts) if months else np.zeros(0, dtype=np.int64)
+        for name, value in flows.items()
+    }
+    return ChartSeries(
+        {
+            "period": np.arange(1, len(starts) + 1),
+            "starting_cash": cash_positions[starts],
+            **sums,
+            "net_cash_position": cash_positions[ends],
+            "end_month": ends
+        },
+        money=DEBT_CHART_FIELDS[1:],
+        fields=DEBT_AGGREGATED_CHART_FIELDS
+    )
+
+
+
+def project_wealth(
+    current_savings,
+    monthly_contribution,
+    annual_contribution_increase,
+    monthly_return,
+    inflation_rate,
+    years_to_goal
+) -> dict:
+    """
+    Nominal future value of the savings and of the contributions at the goal date, and
+    the inflation discount to real terms.
+
+    Every argument but years_to_goal may be an array of variants (as in the sensitivity
+    analysis or a batch); the results are arrays of one value per variant.
+    """
+    months_to_goal = years_to_goal * 12
+    current_savings, monthly_contribution, annual_contribution_increase, monthly_return, inflation_rate = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(value, dtype=float)) for value in
+          (current_savings, monthly_contribution, annual_contribution_increase, monthly_return, inflation_rate))
+    )
+
+    # Future Value of Initial Savings
+    FV_initial = current_savings * np.array([growth(r, months_to_goal) for r in monthly_return])
+
+    # Future Value of Contributions (growing annuity if annual increase): each month's
+    # contribution is compounded to the goal date and rounded to the centavo before summing
+    contribution_months = np.arange(max(years_to_goal, 0) * 12)
+    contribution_growth = growth_power_rows(annual_contribution_increase, max(years_to_goal, 0) + 1)
+    compounding = growth_power_rows(monthly_return, max(months_to_goal, 0) + 1)
+    contributions = monthly_contribution[:, None] * contribution_growth[:, contribution_months // 12]
+    FV_contributions = to_pesos(
+        to_centavos(contributions * compounding[:, months_to_goal - contribution_months]).sum(axis=1)
+    )
+
+    return {
+        "FV_initial": FV_initial,
+        "FV_contributions": FV_contributions,
+        "inflation_discount": np.array([discount(i, years_to_goal) for i in inflation_rate])
+    }
+
 
 def simulate_wealth_building(
     goal_name,
@@ -282,26 +538,96 @@ def simulate_wealth_building(
     risk_profile="Moderate",
     advisor_fee_percent=0
 ):
+    return simulate_wealth_building_batch([{
+        "goal_name": goal_name,
+        "current_age": current_age,
+        "target_age": target_age,
+        "target_amount": target_amount,
+        "current_savings": current_savings,
+        "monthly_contribution": monthly_contribution,
+        "annual_contribution_increase": annual_contribution_increase,
+        "expected_annual_return": expected_annual_return,
+        "inflation_rate": inflation_rate,
+        "risk_profile": risk_profile,
+        "advisor_fee_percent": advisor_fee_percent
+    }])[0]
+
+
+def simulate_wealth_building_batch(payloads: list) -> list:
+    """
+    Simulate many wealth-building inputs (simulate_wealth_building arguments) in one pass.
+
+    Inputs with the same years to their goal are projected together: project_wealth and
+    the month-by-month balances run on (inputs, months) grids. Each result is the one
+    simulating its input alone gives.
+    """
+    payloads = [{**WEALTH_DEFAULTS, **payload} for payload in payloads]
+    results = [None] * len(payloads)
+    groups = {}
+    for index, payload in enumerate(payloads):
+        groups.setdefault(payload["target_age"] - payload["current_age"], []).append(index)
+
+    for years_to_goal, rows in groups.items():
+        group = [payloads[i] for i in rows]
+
+        def column(name):
+            return np.array([payload[name] for payload in group], dtype=float)
+
+        monthly_returns = [(p["expected_annual_return"] - p["advisor_fee_percent"] / 100) / 12 for p in group]
+        projection = project_wealth(
+            column("current_savings"),
+            column("monthly_contribution"),
+            column("annual_contribution_increase"),
+            monthly_returns,
+            column("inflation_rate"),
+            years_to_goal
+        )
+
+        # Chart Data (stacked area): month-end balances in centavos, interest rounded every month.
+        # Each year's contributions step up by the annual increase, through the goal month.
+        steps = max(years_to_goal * 12 + 1, 0)
+        step_years = np.arange(steps) // 12
+        contribution_growth = growth_power_rows(column("annual_contribution_increase"), max(years_to_goal, 0) + 1)
+        deposits = to_centavos(column("monthly_contribution")[:, None] * contribution_growth[:, step_years])
+        starts = to_centavos(column("current_savings"))
+        if len(group) == 1:
+            # One account steps with plain ints, faster than a batch of one
+            balances = compound(int(starts[0]), monthly_returns[0], deposits[0])[None, :]
+        else:
+            balances = compound(starts, monthly_returns, deposits)
+        cumulative_deposits = np.concatenate(
+            [np.zeros((len(group), 1), dtype=np.int64), np.cumsum(deposits, axis=1)], axis=1
+        )
+        year_ends = np.minimum(np.arange(1, max(years_to_goal + 1, 0) + 1) * 12, steps)
+
+        for row, index in enumerate(rows):
+            results[index] = _wealth_result(
+                group[row],
+                monthly_returns[row],
+                {name: float(values[row]) for name, values in projection.items()},
+                cumulative_deposits[row, year_ends],
+                balances[row, year_ends]
+            )
+    return results
+
+
+def _wealth_result(payload: dict, monthly_return: float, projection: dict, contributions, balances) -> dict:
+    goal_name = payload["goal_name"]
+    current_age = payload["current_age"]
+    target_age = payload["target_age"]
+    target_amount = payload["target_amount"]
+    current_savings = payload["current_savings"]
+    monthly_contribution = payload["monthly_contribution"]
+    expected_annual_return = payload["expected_annual_return"]
     years_to_goal = target_age - current_age
     months_to_goal = years_to_goal * 12
-    monthly_return = (expected_annual_return - advisor_fee_percent / 100) / 12
-    inflation_adjustment = (1 + inflation_rate) ** years_to_goal
-
-    # Future Value of Initial Savings
-    FV_initial = current_savings * ((1 + monthly_return) ** months_to_goal)
-
-    # Future Value of Contributions (growing annuity if annual increase)
-    FV_contributions = 0
-    current_monthly_contribution = monthly_contribution
-    for year in range(years_to_goal):
-        for month in range(12):
-            months_remaining = months_to_goal - (year * 12 + month)
-            FV_contributions += current_monthly_contribution * ((1 + monthly_return) ** months_remaining)
-        current_monthly_contribution *= (1 + annual_contribution_increase)
+    FV_initial = projection["FV_initial"]
+    FV_contributions = projection["FV_contributions"]
+    inflation_discount = projection["inflation_discount"]
 
     total_projected_value_nominal = FV_initial + FV_contributions
-    projected_final_value_real = total_projected_value_nominal / inflation_adjustment
-    inflation_adjusted_target = target_amount / inflation_adjustment
+    projected_final_value_real = total_projected_value_nominal * inflation_discount
+    inflation_adjusted_target = target_amount * inflation_discount
     total_shortfall_real = inflation_adjusted_target - projected_final_value_real
 
     # Calculate required monthly contribution to hit the goal
@@ -310,7 +636,7 @@ def simulate_wealth_building(
         n = months_to_goal
         FV_goal = inflation_adjusted_target
         required_monthly_contribution = (
-            (FV_goal - FV_initial) * r / ((1 + r) ** n - 1)
+            (FV_goal - FV_initial) / annuity(r, n)
         ) if r > 0 and n > 0 else FV_goal / n if n > 0 else FV_goal
     except Exception:
         required_monthly_contribution = None
@@ -323,27 +649,17 @@ def simulate_wealth_building(
     except Exception:
         required_annual_return = expected_annual_return
 
-    # Chart Data (stacked area)
-    chart_data = []
-    cumulative_contributions = 0
-    cumulative_investment_growth = 0
-    current_monthly_contribution = monthly_contribution
-    total_value = current_savings
-    for year in range(years_to_goal + 1):
-        for month in range(12):
-            if year * 12 + month > months_to_goal:
-                break
-            cumulative_contributions += current_monthly_contribution
-            total_value = total_value * (1 + monthly_return) + current_monthly_contribution
-            cumulative_investment_growth = total_value - cumulative_contributions
-        chart_data.append({
-            "year": current_age + year,
-            "cumulative_contributions": round(cumulative_contributions, 2),
-            "cumulative_investment_growth": round(cumulative_investment_growth, 2),
-            "total_value": round(total_value, 2),
-            "inflation_adjusted_target": round(inflation_adjusted_target, 2)
-        })
-        current_monthly_contribution *= (1 + annual_contribution_increase)
+    chart_data = ChartSeries(
+        {
+            "year": current_age + np.arange(len(balances)),
+            "cumulative_contributions": contributions,
+            "cumulative_investment_growth": balances - contributions,
+            "total_value": balances
+        },
+        constants={"inflation_adjusted_target": round(inflation_adjusted_target, 2)},
+        money=WEALTH_CHART_FIELDS[1:4],
+        fields=WEALTH_CHART_FIELDS
+    )
 
     # Rule-based insight
     percent_achieved = (projected_final_value_real / inflation_adjusted_target * 100) if inflation_adjusted_target else 0
@@ -373,11 +689,11 @@ def simulate_wealth_building(
                 },
                 "contributions": {
                     "current_monthly_contribution": monthly_contribution,
-                    "annual_contribution_increase_percent": annual_contribution_increase
+                    "annual_contribution_increase_percent": payload["annual_contribution_increase"]
                 },
                 "investment_details": {
                     "expected_annual_return_percent": expected_annual_return,
-                    "inflation_rate_percent": inflation_rate
+                    "inflation_rate_percent": payload["inflation_rate"]
                 }
             },
             "chart_data": chart_data,
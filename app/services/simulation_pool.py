@@ -0,0 +1,115 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import app.config
+from app.services.factor_tables import warm_factor_tables
+from app.services.tracing import span
+
+# Large simulations hold the GIL long enough to starve every other request in the
+# worker, so anything above the cost threshold runs in a bounded pool of processes.
+# Cost is estimated as projection steps x scenarios.
+SIMULATION_POOL_WORKERS = int(os.getenv("SIMULATION_POOL_WORKERS", "2"))
+SIMULATION_INLINE_MAX_COST = int(os.getenv("SIMULATION_INLINE_MAX_COST", "20000"))
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+# Serializes pool startup; _pool_lock is only held to publish the pool, so stats
+# updates and pool_stats() never wait on worker spawn and warm-up
+_startup_lock = threading.Lock()
+_stats = {
+    "inline": 0,
+    "pooled": 0,
+    "pending": 0,
+    "peak_pending": 0,
+    "saturated_submissions": 0
+}
+
+
+def estimate_cost(horizon: int, scenarios: int = 1) -> int:
+    return max(horizon, 0) * max(scenarios, 1)
+
+
+def _warm_up():
+    # Importing the simulators in the child keeps the first real task fast
+    import app.services.simulation_logic  # noqa: F401
+    return os.getpid()
+
+
+def start_simulation_pool():
+    """Create the process pool and start every worker so no request pays the spawn cost."""
+    global _pool
+    if SIMULATION_POOL_WORKERS <= 0:
+        return None
+    with _startup_lock:
+        if _pool is None:
+            # spawn, not fork: the API process already runs threads that a fork would copy mid-flight
+            pool = ProcessPoolExecutor(
+                max_workers=SIMULATION_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                # Every worker has its own factor tables
+                initializer=warm_factor_tables
+            )
+            wait([pool.submit(_warm_up) for _ in range(SIMULATION_POOL_WORKERS)])
+            with _pool_lock:
+                _pool = pool
+            logger.info(f"Simulation process pool started with {SIMULATION_POOL_WORKERS} workers")
+    return _pool
+
+
+def shutdown_simulation_pool():
+    global _pool
+    with _startup_lock:
+        with _pool_lock:
+            pool, _pool = _pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _finished(_future):
+    with _pool_lock:
+        _stats["pending"] -= 1
+
+
+def run_simulation(simulate, cost: int, **kwargs):
+    """Run `simulate(**kwargs)` inline when cheap, otherwise in the process pool."""
+    inline = cost <= SIMULATION_INLINE_MAX_COST or SIMULATION_POOL_WORKERS <= 0
+    attributes = {"simulation.function": simulate.__name__, "simulation.cost": cost, "simulation.inline": inline}
+    with span(f"simulate {simulate.__name__}", attributes):
+        if inline:
+            with _pool_lock:
+                _stats["inline"] += 1
+            return simulate(**kwargs)
+        return _run_pooled(simulate, **kwargs)
+
+
+def _run_pooled(simulate, **kwargs):
+    pool = _pool or start_simulation_pool()
+    with _pool_lock:
+        # Every worker busy: the task waits in the pool queue, which is what we report as saturation
+        if _stats["pending"] >= SIMULATION_POOL_WORKERS:
+            _stats["saturated_submissions"] += 1
+        _stats["pooled"] += 1
+        _stats["pending"] += 1
+        _stats["peak_pending"] = max(_stats["peak_pending"], _stats["pending"])
+
+    future = pool.submit(simulate, **kwargs)
+    future.add_done_callback(_finished)
+    return future.result()
+
+
+def pool_stats() -> dict:
+    with _pool_lock:
+        stats = dict(_stats)
+    stats.update({
+        "workers": SIMULATION_POOL_WORKERS if _pool is not None else 0,
+        "inline_max_cost": SIMULATION_INLINE_MAX_COST,
+        "saturated": stats["pending"] >= SIMULATION_POOL_WORKERS > 0,
+        "utilization": round(min(stats["pending"], SIMULATION_POOL_WORKERS) / SIMULATION_POOL_WORKERS, 4)
+        if SIMULATION_POOL_WORKERS > 0 else 0
+    })
+    return stats
@@ -0,0 +1,93 @@
+from itertools import repeat
+
+import numpy as np
+
+from app.services.money import to_pesos
+
+# Row layout of each simulator's chart_data
+BUDGET_CHART_FIELDS = (
+    "month", "total_income", "fixed_expenses", "variable_expenses", "wants_expenses",
+    "net_cash_flow", "cumulative_savings", "cumulative_deficit"
+)
+BUDGET_DAILY_CHART_FIELDS = BUDGET_CHART_FIELDS + ("min_balance", "min_balance_date", "days_negative")
+DEBT_CHART_FIELDS = (
+    "period", "starting_cash", "revenue", "operating_expenses", "loan_interest_payments",
+    "loan_principal_payments", "net_operating_cash_flow", "net_cash_position"
+)
+DEBT_AGGREGATED_CHART_FIELDS = DEBT_CHART_FIELDS + ("end_month",)
+WEALTH_CHART_FIELDS = (
+    "year", "cumulative_contributions", "cumulative_investment_growth", "total_value", "inflation_adjusted_target"
+)
+
+
+class ChartSeries:
+    """
+    Column-backed chart_data of a simulation.
+
+    Each field is one NumPy array (money fields as int64 centavos) or a constant shared
+    by every period, so simulators and metrics work on whole columns and a result is a
+    handful of arrays instead of one dict per period. The list-of-row-dicts view the API
+    returns is built only when the result is serialized, and built once.
+    """
+
+    __slots__ = ("fields", "columns", "constants", "money", "_rows")
+
+    def __init__(self, columns: dict, constants: dict = None, money=(), fields=None):
+        self.columns = columns
+        self.constants = constants or {}
+        self.money = frozenset(money)
+        # Row key order, as the rows have always been shaped
+        self.fields = tuple(fields) if fields else tuple(columns) + tuple(self.constants)
+        self._rows = None
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getstate__(self):
+        # Ship only the arrays to other processes, not a materialized copy of the rows
+        return (self.fields, self.columns, self.constants, self.money)
+
+    def __setstate__(self, state):
+        self.fields, self.columns, self.constants, self.money = state
+        self._rows = None
+
+    def column(self, name: str) -> np.ndarray:
+        """A field as an array, in pesos for money fields."""
+        if name in self.columns:
+            values = self.columns[name]
+            return to_pesos(values) if name in self.money else values
+        value = self.constants[name]
+        return np.full(len(self), to_pesos(value) if name in self.money else value)
+
+    def take(self, indices) -> "ChartSeries":
+        """The selected periods as a new series."""
+        return ChartSeries(
+            {name: values[indices] for name, values in self.columns.items()},
+            self.constants,
+            self.money,
+            self.fields
+        )
+
+    def rows(self) -> list:
+        if self._rows is None:
+            values = [
+                self.column(name).tolist() if name in self.columns
+                else repeat(to_pesos(self.constants[name]) if name in self.money else self.constants[name], len(self))
+                for name in self.fields
+            ]
+            self._rows = [dict(zip(self.fields, row)) for row in zip(*values)]
+        return self._rows
+
+
+def serialize_result(result: dict) -> dict:
+    """A simulation response with its chart_data as the list of row dicts the API returns."""
+    data = result["data"]
+    chart_data = data.get("chart_data")
+    if not isinstance(chart_data, ChartSeries):
+        return result
+    return {**result, "data": {**data, "chart_data": chart_data.rows()}}
+
+
+def chart_rows(chart_data) -> list:
+    """Rows of chart_data whether it's a ChartSeries or already a list (e.g. loaded from the DB)."""
+    return chart_data.rows() if isinstance(chart_data, ChartSeries) else chart_data
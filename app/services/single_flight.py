@@ -0,0 +1,76 @@
+import json
+import hashlib
+import threading
+from concurrent.futures import Future
+
+
+def request_key(*parts) -> str:
+    """Canonical hash of a request: same route and same payload give the same key."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Run identical concurrent work once and hand every waiter the same result.
+
+    Calls are tracked as futures, so blocking callers (`do`) and callers that want
+    to wait with their own timeout (`submit`) share the same in-flight work.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key: str):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.executed += 1
+            return future, True
+
+    def _run(self, key: str, future: Future, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """Run `fn` in the calling thread unless identical work is already in flight."""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args, kwargs)
+        return future.result()
+
+    def submit(self, key: str, executor, fn, *args, **kwargs) -> Future:
+        """Like `do`, but runs the work on `executor` and returns the shared future."""
+        future, leader = self._join(key)
+        if leader:
+            executor.submit(self._run, key, future, fn, args, kwargs)
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": round(self.coalesced / total, 4) if total else 0
+            }
+
+
+simulation_flight = SingleFlight("simulation")
+llm_flight = SingleFlight("llm")
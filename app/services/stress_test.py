@@ -0,0 +1,171 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from fastapi import HTTPException, status
+
+import app.config
+from app.services.money import to_centavos, to_pesos, round_half_away
+from app.services.simulation_logic import simulate_debt_management
+from app.services.simulation_result import ChartSeries
+
+# Monte Carlo stress test of the debt-management cash flow. Revenue and operating expenses
+# are shocked every month on every path, as one (paths, periods) array each:
+#
+#   revenue  = avg revenue  * seasonality[month] * lognormal shock * (1 - drop while in a downturn)
+#   expenses = avg expenses * lognormal shock
+#
+# Revenue and expense shocks are correlated with each other, and downturns start at random
+# and last several months, so bad months cluster the way they do for a real MSME. Loan
+# payments come from simulate_debt_management and stay fixed. Flows are rounded to the
+# centavo and accumulated as int64, like the deterministic simulation.
+#
+# Paths are sampled a chunk at a time, so the shocks and flows (~100 bytes a cell) exist
+# for STRESS_TEST_CHUNK_CELLS cells at most; only the int64 cash positions and the
+# percentile pass over them (~30 bytes a cell) grow with the whole request.
+
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+# paths x periods above which a request is rejected
+STRESS_TEST_MAX_CELLS = int(os.getenv("STRESS_TEST_MAX_CELLS", "1000000"))
+# paths x periods sampled at once
+STRESS_TEST_CHUNK_CELLS = int(os.getenv("STRESS_TEST_CHUNK_CELLS", "250000"))
+# Stress tests running at once in this process; more are turned away with a 503
+STRESS_TEST_MAX_CONCURRENT = int(os.getenv("STRESS_TEST_MAX_CONCURRENT", "2"))
+
+_slots = threading.BoundedSemaphore(max(STRESS_TEST_MAX_CONCURRENT, 1))
+
+
+@contextmanager
+def stress_test_slot():
+    """Hold one of the STRESS_TEST_MAX_CONCURRENT slots, or reject the request if none is free."""
+    # Rejected rather than queued: a waiting request would hold a threadpool thread
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many stress tests are running. Please retry shortly.",
+            headers={"Retry-After": "1"}
+        )
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+def _downturns(rng, paths: int, periods: int, probability: float, months: int) -> np.ndarray:
+    """(paths, periods) mask of the months each path spends in a downturn."""
+    starts = (rng.random((paths, periods)) < probability).astype(np.int32)
+    # A month is in a downturn if one started within the last `months` months
+    started = np.cumsum(starts, axis=1)
+    before = np.zeros_like(started)
+    before[:, months:] = started[:, :-months]
+    return started > before
+
+
+def _shocks(rng, paths: int, periods: int, stress: dict) -> tuple:
+    """Mean-one lognormal revenue and expense multipliers with the requested correlation."""
+    rho = stress["revenue_expense_correlation"]
+    revenue_z = rng.standard_normal((paths, periods))
+    expense_z = rho * revenue_z + np.sqrt(1 - rho ** 2) * rng.standard_normal((paths, periods))
+
+    revenue_sigma = stress["revenue_volatility"]
+    expense_sigma = stress["expense_volatility"]
+    return (
+        np.exp(revenue_sigma * revenue_z - revenue_sigma ** 2 / 2),
+        np.exp(expense_sigma * expense_z - expense_sigma ** 2 / 2)
+    )
+
+
+def stress_test_debt_management(stress: dict, **payload) -> dict:
+    """
+    Simulate the debt scenario over many random revenue and expense paths.
+
+    `stress` holds the StressAssumptions fields, and `payload` the simulate_debt_management
+    arguments. Returns the probability of a cash-out, the distribution of each path's
+    worst month, and percentile bands of net_cash_position per period. Needs at least
+    one period.
+    """
+    base = simulate_debt_management(**payload)["data"]
+    flows = base["chart_data"].constants
+    periods = payload["projection_period"]
+    paths = stress["paths"]
+    financials = payload["business_financials"]
+
+    seasonality = np.ones(12)
+    if stress.get("seasonality"):
+        seasonality = np.asarray(stress["seasonality"], dtype=float)
+        seasonality = seasonality / seasonality.mean()
+    seasonality = seasonality[np.arange(periods) % 12]
+    debt_service = flows["loan_interest_payments"] + flows["loan_principal_payments"]
+    opening_cash = int(to_centavos(financials.get("current_cash_reserves", 0)))
+
+    rng = np.random.default_rng(stress.get("seed"))
+    cash = np.empty((paths, periods), dtype=np.int64)
+    chunk = max(STRESS_TEST_CHUNK_CELLS // periods, 1)
+    for start in range(0, paths, chunk):
+        rows = min(chunk, paths - start)
+        revenue_shock, expense_shock = _shocks(rng, rows, periods, stress)
+        revenue_factor = revenue_shock * seasonality
+        if stress["downturn_probability"] > 0:
+            downturns = _downturns(rng, rows, periods, stress["downturn_probability"], stress["downturn_months"])
+            revenue_factor *= np.where(downturns, 1 - stress["downturn_revenue_drop"], 1.0)
+
+        revenue = to_centavos(financials.get("avg_monthly_revenue", 0) * revenue_factor)
+        expenses = to_centavos(financials.get("avg_monthly_operating_expenses", 0) * expense_shock)
+        cash[start:start + rows] = opening_cash + np.cumsum(revenue - expenses - debt_service, axis=1)
+
+    # Cash-out: the path's net_cash_position is negative in at least one period
+    negative = cash < 0
+    ever_negative = np.logical_or.accumulate(negative, axis=1)
+    cash_out = ever_negative[:, -1]
+    first_negative = negative.argmax(axis=1)[cash_out] + 1
+
+    # Each path's worst month: the period of its lowest cash position
+    worst_index = cash.argmin(axis=1)
+    worst_cash = cash[np.arange(paths), worst_index]
+    worst_month_counts = np.bincount(worst_index, minlength=periods)
+
+    period_numbers = np.arange(1, periods + 1)
+    bands = round_half_away(np.percentile(cash, BAND_PERCENTILES, axis=0))
+    chart_data = ChartSeries(
+        {
+            "period": period_numbers,
+            **{f"p{p}": band for p, band in zip(BAND_PERCENTILES, bands)},
+            "deterministic": base["chart_data"].columns["net_cash_position"],
+            "probability_negative": np.round(ever_negative.mean(axis=0), 4)
+        },
+        money=[f"p{p}" for p in BAND_PERCENTILES] + ["deterministic"]
+    )
+
+    probability_cash_out = float(cash_out.mean())
+    worst_cash_bands = round_half_away(np.percentile(worst_cash, BAND_PERCENTILES))
+    key_metrics = {
+        "paths": paths,
+        "probability_cash_out": round(probability_cash_out, 4),
+        "median_first_negative_period": int(np.median(first_negative)) if first_negative.size else None,
+        "worst_cash_position": {f"p{p}": to_pesos(v) for p, v in zip(BAND_PERCENTILES, worst_cash_bands)},
+        "deterministic_ending_cash": base["key_metrics"]["ending_cash_position"]
+    }
+
+    worst_month = [
+        {"period": period, "probability": round(count / paths, 4)}
+        for period, count in zip(period_numbers.tolist(), worst_month_counts.tolist())
+        if count
+    ]
+
+    insight = (
+        f"Across {paths:,} simulated paths, cash runs out in {probability_cash_out:.1%} of them"
+        + (f", typically by period {key_metrics['median_first_negative_period']}. " if first_negative.size else ". ")
+        + f"In the worst 5% of paths the lowest cash position is ₱{key_metrics['worst_cash_position']['p5']:,.2f} or less."
+    )
+
+    return {
+        "status": "success",
+        "data": {
+            "inputs_received": {**payload, "stress": stress},
+            "chart_data": chart_data,
+            "worst_month_distribution": worst_month,
+            "key_metrics": key_metrics,
+            "insight": insight
+        }
+    }
@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+
+from opentelemetry.sdk.trace import SpanProcessor
+
+# Tail sampling for app.services.tracing, imported only when tracing is on: whether a
+# trace is kept is decided when its root span ends, so slow traces are never sampled out.
+
+
+def _ratio_hit(trace_id: int, rate: float) -> bool:
+    # Same rule as the SDK's TraceIdRatioBased sampler, so both modes keep the same traces
+    return trace_id & 0xFFFFFFFFFFFFFFFF < round(rate * 0xFFFFFFFFFFFFFFFF)
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Span processor that holds a trace's spans until its local root span ends, then
+    passes them on if the trace is in the sample or was slow, and drops them otherwise.
+
+    Spans that end after their root (e.g. an LLM call that outlived its request's
+    deadline) follow the decision already made for their trace.
+    """
+
+    def __init__(self, next_processor, sample_rate: float, slow_ms: float, max_pending: int):
+        self.next = next_processor
+        self.sample_rate = sample_rate
+        self.slow_ns = slow_ms * 1e6
+        self.max_pending = max_pending
+        self._pending = OrderedDict()
+        self._decided = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_local_root(self, span) -> bool:
+        return span.parent is None or span.parent.is_remote
+
+    def on_end(self, span):
+        trace_id = span.context.trace_id
+        with self._lock:
+            keep = self._decided.get(trace_id)
+            if keep is None and not self._is_local_root(span):
+                self._pending.setdefault(trace_id, []).append(span)
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                return
+            if keep is None:
+                keep = (
+                    _ratio_hit(trace_id, self.sample_rate)
+                    or span.end_time - span.start_time >= self.slow_ns
+                )
+                self._decided[trace_id] = keep
+                while len(self._decided) > self.max_pending:
+                    self._decided.popitem(last=False)
+            spans = self._pending.pop(trace_id, []) + [span]
+        if keep:
+            for finished in spans:
+                self.next.on_end(finished)
+
+    def shutdown(self):
+        self.next.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.next.force_flush(timeout_millis)
@@ -0,0 +1,279 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+
+from fastapi.routing import APIRoute
+from fastapi.exceptions import RequestValidationError
+
+import app.config
+
+# OpenTelemetry tracing of single requests: the HTTP request, its body validation, the
+# endpoint, every simulator call, every database statement and commit, and the LLM token
+# count and generation. Spans are written as OpenTelemetry JSON, one per line, to stdout
+# (TRACING_EXPORTER=console) or to TRACING_FILE (TRACING_EXPORTER=file), so a slow request
+# can be profiled without a collector. Off by default; the SDK is only imported when on.
+#
+# TRACING_SAMPLE_RATE keeps that fraction of traces, decided by trace id. With
+# TRACING_SLOW_MS set, every trace is recorded and also kept whenever its root span took
+# at least that long, so tail latency is always captured whatever the sample rate.
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+TRACING_SLOW_MS = float(os.getenv("TRACING_SLOW_MS", "0"))
+# Traces waiting for their root span to finish, when slow traces are kept
+TRACING_MAX_PENDING_TRACES = int(os.getenv("TRACING_MAX_PENDING_TRACES", "1000"))
+# Statements are cut to this many characters in db spans
+TRACING_MAX_STATEMENT_CHARS = 1000
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+_provider = None
+
+
+def _span_to_json(span) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+def _exporter():
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if TRACING_EXPORTER == "console":
+        return ConsoleSpanExporter(out=sys.stdout, formatter=_span_to_json)
+    if TRACING_EXPORTER == "file":
+        return ConsoleSpanExporter(out=open(TRACING_FILE, "a", encoding="utf-8"), formatter=_span_to_json)
+    raise ValueError(f"Unknown TRACING_EXPORTER {TRACING_EXPORTER!r}; use none, console or file")
+
+
+def setup_tracing(app=None):
+    """Start exporting spans when TRACING_EXPORTER is set; instrument `app` and the database."""
+    global _tracer, _provider
+    if TRACING_EXPORTER in ("", "none") or _tracer is not None:
+        return None
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased, ALWAYS_ON
+        from app.services.trace_sampling import TailSamplingProcessor
+    except ImportError:
+        raise RuntimeError("Tracing needs the OpenTelemetry SDK (pip install opentelemetry-sdk)")
+
+    processor = BatchSpanProcessor(_exporter())
+    if TRACING_SLOW_MS > 0:
+        # Record everything; the processor decides once it knows how long the trace took
+        sampler = ParentBased(ALWAYS_ON)
+        processor = TailSamplingProcessor(processor, TRACING_SAMPLE_RATE, TRACING_SLOW_MS, TRACING_MAX_PENDING_TRACES)
+    else:
+        sampler = ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATE))
+
+    _provider = TracerProvider(sampler=sampler, resource=Resource.create({"service.name": "confisense-api"}))
+    _provider.add_span_processor(processor)
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("app")
+
+    from app.db.session import engine
+    instrument_database(engine)
+    if app is not None:
+        app.middleware("http")(_trace_request)
+    logger.info(
+        f"Tracing to {TRACING_FILE if TRACING_EXPORTER == 'file' else TRACING_EXPORTER} "
+        f"(sample rate {TRACING_SAMPLE_RATE}, slow traces >= {TRACING_SLOW_MS} ms)"
+    )
+    return _provider
+
+
+def shutdown_tracing():
+    """Flush spans still queued for export."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+        _tracer = None
+
+
+@contextmanager
+def span(name: str, attributes: dict = None):
+    """Child span of the current one (or a new trace) while tracing is on; does nothing otherwise."""
+    if _tracer is None:
+        yield None
+        return
+    if attributes:
+        attributes = {k: v for k, v in attributes.items() if v is not None}
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def set_attributes(current, attributes: dict):
+    """Set attributes on a span from span(); ignores the None it yields when tracing is off."""
+    if current is not None:
+        current.set_attributes({k: v for k, v in attributes.items() if v is not None})
+
+
+# HTTP requests
+
+async def _trace_request(request, call_next):
+    from opentelemetry import trace
+    from opentelemetry.propagate import extract, inject
+
+    method = request.method
+    # An incoming W3C traceparent header continues the caller's trace
+    with _tracer.start_as_current_span(
+        f"{method} {request.url.path}",
+        context=extract(request.headers),
+        kind=trace.SpanKind.SERVER,
+        attributes={"http.request.method": method, "url.path": request.url.path}
+    ) as current:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            # The route template groups requests for the same endpoint, unlike the path
+            current.update_name(f"{method} {route.path}")
+            current.set_attribute("http.route", route.path)
+        current.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            current.set_status(trace.StatusCode.ERROR)
+        headers = {}
+        inject(headers)
+        response.headers.update(headers)
+        return response
+
+
+# Pydantic validation and the endpoint, through the routers' route_class
+
+# When FastAPI started parsing and validating the current request
+_validation_started = contextvars.ContextVar("validation_started", default=None)
+
+
+def _validation_span(status_message: str = None):
+    from opentelemetry import trace
+
+    validated = _tracer.start_span("validate request", start_time=_validation_started.get())
+    if status_message:
+        validated.set_status(trace.StatusCode.ERROR, status_message)
+    validated.end()
+
+
+def _traced_endpoint(endpoint):
+    """Wrap an endpoint so it records the validation that preceded it, then its own span."""
+    name = f"endpoint {endpoint.__name__}"
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def traced(*args, **kwargs):
+            if _tracer is None:
+                return await endpoint(*args, **kwargs)
+            _validation_span()
+            with _tracer.start_as_current_span(name):
+                return await endpoint(*args, **kwargs)
+    else:
+        # Stays a plain function, so FastAPI still runs it in the threadpool
+        @functools.wraps(endpoint)
+        def traced(*args, **kwargs):
+            if _tracer is None:
+                return endpoint(*args, **kwargs)
+            _validation_span()
+            with _tracer.start_as_current_span(name):
+                return endpoint(*args, **kwargs)
+    return traced
+
+
+class TracedRoute(APIRoute):
+    """
+    APIRoute that traces request validation and the endpoint while tracing is on.
+
+    FastAPI parses and validates the body and parameters before calling the endpoint;
+    that stretch is recorded as a "validate request" span, and failed validation as
+    an errored one.
+    """
+
+    def get_route_handler(self):
+        self.dependant.call = _traced_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            if _tracer is None:
+                return await handler(request)
+            _validation_started.set(time.time_ns())
+            try:
+                return await handler(request)
+            except RequestValidationError as e:
+                _validation_span(f"{len(e.errors())} validation errors")
+                raise
+
+        return traced_handler
+
+
+# Database statements and commits
+
+def instrument_database(engine):
+    """
+    Trace every statement run through `engine` and every session commit.
+
+    Only statements issued inside a traced operation get a span, so startup and
+    other untraced work stay out of the export.
+    """
+    from sqlalchemy import event
+    from sqlmodel import Session
+    from opentelemetry import trace, context
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        if not trace.get_current_span().get_span_context().is_valid:
+            return
+        conn.info.setdefault("trace_spans", []).append(_tracer.start_span(
+            "db " + statement.split(None, 1)[0].upper() if statement else "db",
+            kind=trace.SpanKind.CLIENT,
+            attributes={
+                "db.system": system,
+                "db.statement": statement[:TRACING_MAX_STATEMENT_CHARS],
+                "db.executemany": executemany
+            }
+        ))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            current = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                current.set_attribute("db.rows_affected", cursor.rowcount)
+            current.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            current = spans.pop()
+            current.record_exception(exception_context.original_exception)
+            current.set_status(trace.StatusCode.ERROR)
+            current.end()
+
+    # A commit's span is made current so the flush statements it runs nest under it
+    @event.listens_for(Session, "before_commit")
+    def _before_commit(session):
+        if not trace.get_current_span().get_span_context().is_valid:
+            return
+        commit = _tracer.start_span("db commit", kind=trace.SpanKind.CLIENT, attributes={"db.system": system})
+        session.info["trace_commit"] = (commit, context.attach(trace.set_span_in_context(commit)))
+
+    def _end_commit(session, failed: bool):
+        commit, token = session.info.pop("trace_commit", (None, None))
+        if commit is None:
+            return
+        context.detach(token)
+        if failed:
+            commit.set_status(trace.StatusCode.ERROR, "rolled back")
+        commit.end()
+
+    event.listen(Session, "after_commit", lambda session: _end_commit(session, False))
+    event.listen(Session, "after_rollback", lambda session: _end_commit(session, True))
@@ -14,6 +14,8 @@ let currentScenarioEndpoint = ''; // API endpoint for simulation
 let fields = []; // DOM input elements (for current scenario)
 let fieldValues = {}; // Store current input values
 let formulas = [];
+let lastSavedScenario = null; // { endpoint, id } of the saved scenario the chart on screen shows
+let lastSimulation = null; // { endpoint, body } of the request behind the chart on screen
 
 const field = (id, label, category, min, step, def, type='number') => ({id, label, category, min, step, default: def, type});
 
@@ -273,24 +275,53 @@ const buildRequestBody = (flatData) => {
     return body;
 };
 
+// Long projections are downsampled server-side so charts stay fast to draw
+const MAX_CHART_POINTS = 240;
+
+// Recent simulation results by request, revalidated with their ETag: unchanged inputs
+// come back as an empty 304 instead of a full re-simulation
+const SIMULATION_CACHE_SIZE = 20;
+const simulationCache = new Map();
+
 async function runSimulation(endpoint, params) {
     const requestBody = buildRequestBody(params); // Prepare request payload
+    // The saved report no longer matches the screen once the inputs are simulated again
+    lastSavedScenario = null;
 
     try {
+        const url = `http://127.0.0.1:8000/simulate${endpoint}?max_points=${MAX_CHART_POINTS}`;
+        const body = JSON.stringify(requestBody); // Pass scenario parameters to backend
+        const cached = simulationCache.get(url + body);
+
         // Send a POST request to the FastAPI backend
-        const response = await fetch(`http://127.0.0.1:8000/simulate${endpoint}`, {
+        const response = await fetch(url, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json', // Ensure backend interprets body as JSON
+                ...(cached ? { 'If-None-Match': cached.etag } : {})
             },
-            body: JSON.stringify(requestBody) // Pass scenario parameters to backend
+            body
         });
 
-        // Throw error if request didn't succeed
-        if (!response.ok) throw new Error('Request failed');
-
         // Parse backend JSON response (contains simulation results)
-        const result = await response.json();
+        let result;
+        if (response.status === 304 && cached) {
+            result = cached.result;
+        } else {
+            // Throw error if request didn't succeed
+            if (!response.ok) throw new Error('Request failed');
+            result = await response.json();
+
+            const etag = response.headers.get('ETag');
+            if (etag) {
+                simulationCache.delete(url + body);
+                simulationCache.set(url + body, { etag, result });
+                if (simulationCache.size > SIMULATION_CACHE_SIZE) {
+                    simulationCache.delete(simulationCache.keys().next().value);
+                }
+            }
+        }
+
         const chartData = result.data.chart_data;
         const inputsReceived = result.data.inputs_received;
         const insight = result.data.insight;
@@ -300,14 +331,15 @@ async function runSimulation(endpoint, params) {
         console.log('Simulation successful:', result);
 
         addChartData(chartData);
-        saveToDatabase(endpoint, requestBody);
+        lastSimulation = { endpoint, body };
+        saveToDatabase(endpoint, body);
 
     } catch (err) {
         console.error('Error fetching simulation:', err);
     }
 }
 
-async function saveToDatabase(endpoint, requestBody) {
+async function saveToDatabase(endpoint, body) {
     try {
         // Send a POST request to the FastAPI backend
         const response = await fetch(`http://127.0.0.1:8000${endpoint}/save`, {
@@ -315,12 +347,19 @@ async function saveToDatabase(endpoint, requestBody) {
             headers: {
                 'Content-Type': 'application/json' // Ensure backend interprets body as JSON
             },
-            body: JSON.stringify(requestBody) // Pass scenario parameters to backend
+            body // Pass scenario parameters to backend
         });
 
         // Throw error if request didn't succeed
         if (!response.ok) throw new Error('Request failed');
 
+        // Remember the stored scenario so its report can be rendered server-side, unless
+        // another simulation replaced the chart while it was being saved
+        const saved = await response.json();
+        if (lastSimulation && lastSimulation.endpoint === endpoint && lastSimulation.body === body) {
+            lastSavedScenario = { endpoint, id: saved.id };
+        }
+
         console.log('Data saved successfully.');
 
     } catch (err) {
@@ -527,8 +566,30 @@ document.getElementById('math-btn').addEventListener('click', async (event) => {
     showMessage(`Formulas Used<br><br>${formulas.join('<br><br>')}` ,'math-msg-box');
 });
 
-document.getElementById('download-btn').addEventListener('click', function() {
+// Download the server-rendered PDF report of the last saved scenario
+async function downloadReport(scenario) {
+    const response = await fetch(`http://127.0.0.1:8000/export${scenario.endpoint}/${scenario.id}?format=pdf`);
+    if (!response.ok) throw new Error('Export failed');
+
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(await response.blob());
+    link.download = `report-${scenario.id}.pdf`;
+    link.click();
+    // Revoking right after click() can cancel the download before the browser reads the blob
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+}
+
+document.getElementById('download-btn').addEventListener('click', async function() {
     try {
+        if (lastSavedScenario && lastSavedScenario.endpoint === currentScenarioEndpoint) {
+            try {
+                await downloadReport(lastSavedScenario);
+                return;
+            } catch (error) {
+                // Fall back to building the report in the browser
+                console.error("Server report export failed:", error);
+            }
+        }
         exportChart();
     }
     catch (error) {
@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Set before anything imports app.config: the suite runs on its own throwaway SQLite
+# database (load_dotenv doesn't override variables that are already set) and simulates
+# inline instead of spawning the process pool
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='confisense-tests-'), 'test.db')}"
+os.environ["SIMULATION_POOL_WORKERS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.db.base import init_db
+
+    init_db()
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.session import get_session
+from app.models.background_job_model import BackgroundJobModel
+from app.models.wealth_building_model import WealthBuildingModel
+from app.services.background_jobs import get_completed_result, set_job_status
+from app.services.http_cache import scenario_version
+
+
+@pytest.fixture
+def scenario(database):
+    with get_session() as session:
+        scenario = WealthBuildingModel(
+            goal_name="Retirement",
+            current_age=30,
+            target_age=60,
+            target_amount=5000000,
+            current_savings=100000,
+            monthly_contribution=10000
+        )
+        session.add(scenario)
+        session.commit()
+        session.refresh(scenario)
+        return scenario
+
+
+def complete_job(scenario, job_type: str, result: dict) -> int:
+    with get_session() as session:
+        job = BackgroundJobModel(job_type=job_type, scenario_type="wealth-building", scenario_id=scenario.id)
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    set_job_status(job_id, "completed", result=result, version=scenario_version(scenario))
+    return job_id
+
+
+def resimulate(scenario):
+    # What a save or re-simulation does to the row: a new revision
+    with get_session() as session:
+        row = session.get(WealthBuildingModel, scenario.id)
+        row.updated_at = (row.updated_at or row.created_at) + timedelta(seconds=1)
+        session.add(row)
+        session.commit()
+        session.refresh(row)
+        return row
+
+
+def test_result_for_current_revision_is_served(scenario):
+    complete_job(scenario, "ai_explanation", {"explanation_text": "current"})
+
+    result = get_completed_result("wealth-building", scenario.id, "ai_explanation", scenario_version(scenario))
+
+    assert result == {"explanation_text": "current"}
+
+
+def test_result_for_older_revision_is_ignored(scenario):
+    complete_job(scenario, "ai_explanation", {"explanation_text": "about the old numbers"})
+
+    updated = resimulate(scenario)
+
+    assert scenario_version(updated) != scenario_version(scenario)
+    assert get_completed_result("wealth-building", scenario.id, "ai_explanation", scenario_version(updated)) is None
+
+
+def test_newest_result_for_the_revision_wins(scenario):
+    complete_job(scenario, "ai_suggestions", {"suggestions_text": "first"})
+    updated = resimulate(scenario)
+    complete_job(updated, "ai_suggestions", {"suggestions_text": "regenerated"})
+
+    version = scenario_version(updated)
+
+    assert get_completed_result("wealth-building", scenario.id, "ai_suggestions", version) == {"suggestions_text": "regenerated"}
+    assert get_completed_result("wealth-building", scenario.id, "ai_explanation", version) is None
+
+
+def test_unfinished_job_is_not_served(scenario):
+    with get_session() as session:
+        job = BackgroundJobModel(
+            job_type="ai_explanation",
+            scenario_type="wealth-building",
+            scenario_id=scenario.id,
+            status="running",
+            scenario_version=scenario_version(scenario),
+            result={"progress": "half"},
+            updated_at=datetime.utcnow()
+        )
+        session.add(job)
+        session.commit()
+
+    assert get_completed_result("wealth-building", scenario.id, "ai_explanation", scenario_version(scenario)) is None
@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.comparison import VariantError, compare_scenarios
+
+DEBT = {
+    "projection_period": 24,
+    "loans": [{
+        "loan_name": "Bank",
+        "principal_amount": 200000,
+        "outstanding_balance": 150000,
+        "annual_interest_rate": 12,
+        "monthly_payment": 9000,
+        "remaining_term_months": 24
+    }],
+    "business_financials": {
+        "avg_monthly_revenue": 120000,
+        "avg_monthly_operating_expenses": 95000,
+        "current_cash_reserves": 30000
+    },
+    "growth_needs": {"capital_required": 100000, "expected_roi": 15},
+    "proposed_financing": {"proposed_loan_amount": 100000, "proposed_annual_interest_rate": 10, "proposed_loan_term": 36}
+}
+
+
+@pytest.mark.parametrize("base, changes", [
+    ({}, {"granularity": "annual"}),
+    ({"granularity": "quarterly"}, {"granularity": "monthly"}),
+    ({"granularity": "annual"}, {"granularity": "quarterly", "projection_period": 36})
+])
+def test_mixed_granularities_are_rejected(base, changes):
+    with pytest.raises(VariantError) as raised:
+        compare_scenarios("debt-management", {**DEBT, **base}, [("other", changes)])
+
+    assert raised.value.label == "other"
+    assert [error["loc"] for error in raised.value.errors] == [["granularity"]]
+
+
+def test_same_granularity_lines_up_by_period():
+    base = {**DEBT, "granularity": "quarterly"}
+
+    result = compare_scenarios("debt-management", base, [("longer", {"projection_period": 36})])
+
+    # 24 and 36 months are 8 and 12 quarters
+    aligned = result["aligned_series"]
+    assert aligned["x"] == list(range(1, 13))
+    cash = aligned["series"]["net_cash_position"]
+    assert None not in cash["longer"]
+    assert None not in cash["base"][:8]
+    assert cash["base"][8:] == [None] * 4
+
+
+def test_route_reports_the_variant_and_field():
+    response = TestClient(app).post("/compare/debt-management", json={
+        "base": DEBT,
+        "overrides": [{"label": "yearly", "changes": {"granularity": "annual"}}]
+    })
+
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert detail["variant"] == "yearly"
+    assert detail["errors"][0]["loc"] == ["granularity"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app.services.downsampling import (
+    MIN_CHART_POINTS,
+    downsample_chart_data,
+    downsample_result,
+    downsample_series
+)
+from app.services.simulation_result import ChartSeries
+
+
+def wealth_chart(seed: int, points: int = 500) -> ChartSeries:
+    # Random walks, so the extremes of the kept series rarely fall on LTTB's own picks
+    rng = np.random.default_rng(seed)
+    return ChartSeries(
+        {
+            "year": np.arange(points),
+            "total_value": np.cumsum(rng.normal(0, 1000, points)).round(),
+            "cumulative_investment_growth": np.cumsum(rng.normal(0, 1000, points)).round()
+        },
+        fields=("year", "total_value", "cumulative_investment_growth")
+    )
+
+
+def extremes(chart: ChartSeries) -> set:
+    kept = set()
+    for field in ("total_value", "cumulative_investment_growth"):
+        values = chart.column(field)
+        kept.update((int(values.argmin()), int(values.argmax())))
+    return kept
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("max_points", [MIN_CHART_POINTS, 11, 25, 100])
+def test_never_more_than_max_points(seed, max_points):
+    chart = wealth_chart(seed)
+
+    downsampled = downsample_chart_data("wealth-building", chart, max_points)
+
+    assert len(downsampled) <= max_points
+    years = downsampled.column("year").tolist()
+    assert years == sorted(years)
+    assert {0, len(chart) - 1} <= set(years)
+    assert extremes(chart) <= set(years)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_row_dicts_are_bounded_like_columns(seed):
+    chart = wealth_chart(seed)
+
+    columns = downsample_chart_data("wealth-building", chart, MIN_CHART_POINTS)
+    rows = downsample_chart_data("wealth-building", chart.rows(), MIN_CHART_POINTS)
+
+    assert rows == columns.rows()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_daily_series_is_bounded(seed):
+    balance = np.cumsum(np.random.default_rng(seed).normal(0, 500, 3000)).round().tolist()
+    series = {"date": list(range(len(balance))), "balance": balance}
+
+    downsampled = downsample_series(series, "balance", MIN_CHART_POINTS)
+
+    assert len(downsampled["balance"]) <= MIN_CHART_POINTS
+    assert {min(balance), max(balance)} <= set(downsampled["balance"])
+
+
+def test_result_reports_points_returned():
+    chart = wealth_chart(0)
+
+    result = downsample_result("wealth-building", {"status": "success", "data": {"chart_data": chart}}, 20)
+
+    assert result["data"]["chart_points"] == {"original": len(chart), "returned": len(result["data"]["chart_data"])}
+    assert result["data"]["chart_points"]["returned"] <= 20
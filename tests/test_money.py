@@ -0,0 +1,216 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.schemas.budget_optimization_schema import BudgetOptimizationInput
+from app.schemas.debt_management_schema import DebtManagementInput
+from app.schemas.wealth_building_schema import WealthBuildingInput
+from app.services.money import amortized_payment, spread, to_centavos, to_pesos
+from app.services.simulation_logic import (
+    simulate_budget_optimization,
+    simulate_debt_management,
+    simulate_wealth_building
+)
+from app.services.simulation_result import serialize_result
+
+# The centavo kernel must agree with the original float engine: each period's amounts to
+# within a few centavos of rounding, and running totals to within a centavo or two per
+# period elapsed. The baselines below are the float loops the engine started from.
+PERIOD_TOLERANCE = 0.03
+RUNNING_TOLERANCE_PER_PERIOD = 0.02
+
+
+def baseline_budget_rows(payload):
+    income = payload["income"]["monthly_gross_income"] + payload["income"]["other_monthly_income"]
+    expenses = payload["expenses"]
+    fixed = sum(expenses["fixed_needs"].values())
+    variable = sum(expenses["variable_needs"].values())
+    wants = sum(expenses["wants_discretionary"].values())
+    savings = payload["savings_goals"]["target_monthly_savings"]
+    factors = payload["what_if_factors"]
+
+    rows, cumulative_savings, cumulative_deficit = [], 0, 0
+    for month in range(1, payload["projection_months"] + 1):
+        if month > 1:
+            income *= 1 + factors["income_growth_rate"]
+            wants *= 1 - factors["wants_reduction_rate"]
+            savings *= 1 + factors["savings_increase_rate"]
+        net = income - fixed - variable - wants - savings
+        if net >= 0:
+            cumulative_savings += net
+        else:
+            cumulative_deficit -= net
+        rows.append({
+            "total_income": income,
+            "wants_expenses": wants,
+            "net_cash_flow": net,
+            "cumulative_savings": cumulative_savings,
+            "cumulative_deficit": cumulative_deficit
+        })
+    return rows
+
+
+def baseline_debt_rows(payload):
+    interest, principal = 0, 0
+    loans = [
+        (loan["principal_amount"], loan["outstanding_balance"], loan["annual_interest_rate"] / 12 / 100, loan["remaining_term_months"])
+        for loan in payload["loans"]
+    ]
+    proposed = payload["proposed_financing"]
+    if proposed["proposed_loan_amount"] and proposed["proposed_loan_term"]:
+        amount = proposed["proposed_loan_amount"]
+        loans.append((amount, amount, proposed["proposed_annual_interest_rate"] / 12 / 100, proposed["proposed_loan_term"]))
+    for amount, outstanding, rate, term in loans:
+        if rate > 0 and term > 0:
+            payment = amount * (rate * (1 + rate) ** term) / ((1 + rate) ** term - 1)
+        else:
+            payment = outstanding / term if term else 0
+        interest += outstanding * rate
+        principal += payment - outstanding * rate
+
+    financials = payload["business_financials"]
+    cash = financials["current_cash_reserves"]
+    rows = []
+    for _ in range(payload["projection_period"]):
+        net_operating = financials["avg_monthly_revenue"] - financials["avg_monthly_operating_expenses"] - interest
+        cash = cash + net_operating - principal
+        rows.append({
+            "loan_interest_payments": interest,
+            "loan_principal_payments": principal,
+            "net_operating_cash_flow": net_operating,
+            "net_cash_position": cash
+        })
+    return rows
+
+
+def baseline_wealth_values(payload):
+    rate = (payload["expected_annual_return"] - payload["advisor_fee_percent"] / 100) / 12
+    months = (payload["target_age"] - payload["current_age"]) * 12
+    contribution, value, contributed, rows = payload["monthly_contribution"], payload["current_savings"], 0, []
+    for year in range(months // 12 + 1):
+        for month in range(12):
+            if year * 12 + month > months:
+                break
+            contributed += contribution
+            value = value * (1 + rate) + contribution
+        rows.append({"cumulative_contributions": contributed, "total_value": value})
+        contribution *= 1 + payload["annual_contribution_increase"]
+    return rows
+
+
+def assert_close(rows, baseline, period_fields, running_fields):
+    assert len(rows) == len(baseline)
+    for period, (row, expected) in enumerate(zip(rows, baseline), start=1):
+        for field in period_fields:
+            assert row[field] == pytest.approx(expected[field], abs=PERIOD_TOLERANCE), (period, field)
+        for field in running_fields:
+            assert row[field] == pytest.approx(expected[field], abs=RUNNING_TOLERANCE_PER_PERIOD * period), (period, field)
+
+
+def money(rng, low, high):
+    return round(rng.uniform(low, high), 2)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_budget_matches_float_baseline(seed):
+    rng = random.Random(seed)
+    payload = BudgetOptimizationInput.model_validate({
+        "projection_months": rng.randint(1, 600),
+        "income": {"monthly_gross_income": money(rng, 1e4, 2e5), "other_monthly_income": money(rng, 0, 2e4)},
+        "expenses": {
+            "fixed_needs": {"rent": money(rng, 0, 5e4)},
+            "variable_needs": {"household_supplies": money(rng, 0, 2e4)},
+            "wants_discretionary": {"dining_out": money(rng, 0, 3e4), "shopping_leisure": money(rng, 0, 1e4)}
+        },
+        "savings_goals": {"target_monthly_savings": money(rng, 0, 3e4), "emergency_fund_target": 1e5},
+        "what_if_factors": {
+            "income_growth_rate": rng.choice([0, 0.003, 0.01]),
+            "wants_reduction_rate": rng.choice([0, 0.01]),
+            "savings_increase_rate": rng.choice([0, 0.005])
+        }
+    }).model_dump()
+
+    rows = serialize_result(simulate_budget_optimization(**payload))["data"]["chart_data"]
+
+    assert_close(
+        rows, baseline_budget_rows(payload),
+        ("total_income", "wants_expenses", "net_cash_flow"), ("cumulative_savings", "cumulative_deficit")
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_debt_matches_float_baseline(seed):
+    rng = random.Random(seed)
+    loans = []
+    for index in range(rng.randint(1, 3)):
+        principal = money(rng, 1e4, 1e6)
+        loans.append({
+            "loan_name": f"Loan {index}",
+            "principal_amount": principal,
+            "outstanding_balance": round(principal * rng.uniform(0.2, 1), 2),
+            "annual_interest_rate": rng.choice([0, 6, 12.5]),
+            "monthly_payment": 0,
+            "remaining_term_months": rng.randint(1, 120)
+        })
+    payload = DebtManagementInput.model_validate({
+        "projection_period": rng.randint(1, 360),
+        "loans": loans,
+        "business_financials": {
+            "avg_monthly_revenue": money(rng, 5e4, 5e5),
+            "avg_monthly_operating_expenses": money(rng, 3e4, 4e5),
+            "current_cash_reserves": money(rng, 0, 1e5)
+        },
+        "growth_needs": {"capital_required": 0, "expected_roi": 0},
+        "proposed_financing": {
+            "proposed_loan_amount": rng.choice([0, 50000.5]),
+            "proposed_annual_interest_rate": 9,
+            "proposed_loan_term": 24
+        }
+    }).model_dump()
+
+    rows = serialize_result(simulate_debt_management(**payload))["data"]["chart_data"]
+
+    assert_close(
+        rows, baseline_debt_rows(payload),
+        ("loan_interest_payments", "loan_principal_payments", "net_operating_cash_flow"), ("net_cash_position",)
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_wealth_matches_float_baseline(seed):
+    rng = random.Random(seed)
+    payload = WealthBuildingInput.model_validate({
+        "goal_name": "Retirement",
+        "current_age": 30,
+        "target_age": 30 + rng.randint(1, 40),
+        "target_amount": money(rng, 1e5, 1e7),
+        "current_savings": money(rng, 0, 1e6),
+        "monthly_contribution": money(rng, 0, 3e4),
+        "annual_contribution_increase": rng.choice([0, 0.05]),
+        "expected_annual_return": rng.choice([0.02, 0.07])
+    }).model_dump()
+
+    rows = serialize_result(simulate_wealth_building(**payload))["data"]["chart_data"]
+
+    # Rows are yearly: the running tolerance is per month elapsed
+    baseline = baseline_wealth_values(payload)
+    assert len(rows) == len(baseline)
+    for year, (row, expected) in enumerate(zip(rows, baseline), start=1):
+        for field in ("cumulative_contributions", "total_value"):
+            assert row[field] == pytest.approx(expected[field], abs=RUNNING_TOLERANCE_PER_PERIOD * 12 * year), (year, field)
+
+
+def test_spread_pieces_add_back_up():
+    amounts = to_centavos([1000.01, 333.33, 0.07])
+    days = np.arange(1, 32)
+    pieces = spread(amounts[:, None], days / 31, (days - 1) / 31)
+
+    assert pieces.sum(axis=1).tolist() == amounts.tolist()
+
+
+def test_amortized_payment_is_whole_centavos():
+    payment = amortized_payment(int(to_centavos(250000)), int(to_centavos(250000)), 0.01, 36)
+
+    assert isinstance(payment, int)
+    assert to_pesos(payment) == pytest.approx(8303.58, abs=0.01)